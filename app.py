@@ -4,6 +4,8 @@ import joblib
 import plotly.graph_objects as go
 from dataclasses import dataclass
 from pathlib import Path
+from server.services.inference import FusedInference
+from server.services.risk_factors import risk_factor_table
 
 
 @dataclass
@@ -28,10 +30,24 @@ class AppConfig:
 
     LOW_RISK_THRESHOLD: float = 30.0
     HIGH_RISK_THRESHOLD: float = 70.0
+    # Grid points per swept feature in the what-if view (squared for two features)
+    SENSITIVITY_STEPS: int = 60
 
 
 config = AppConfig()
 
+# Features in PatientData.to_array() column order: (label, FEATURE_RANGES key)
+SWEEP_FEATURES = {
+    'pregnancies': ('Number of Pregnancies', 'pregnancies'),
+    'glucose': ('Glucose Level (mg/dL)', 'glucose'),
+    'blood_pressure': ('Blood Pressure (mm Hg)', 'blood_pressure'),
+    'skin_thickness': ('Skin Thickness (mm)', 'skin_thickness'),
+    'insulin': ('Insulin Level (uU/mL)', 'insulin'),
+    'bmi': ('BMI (kg/m2)', 'bmi'),
+    'diabetes_pedigree_function': ('Diabetes Pedigree Function', 'dpf'),
+    'age': ('Age (years)', 'age'),
+}
+
 
 @dataclass
 class PatientData:
@@ -75,6 +91,7 @@ class ModelManager:
         self.scaler_path = Path(scaler_path)
         self.model = None
         self.scaler = None
+        self.inference = None
     
     def load(self) -> bool:
         try:
@@ -82,31 +99,22 @@ class ModelManager:
                 return False
             self.model = joblib.load(self.model_path)
             self.scaler = joblib.load(self.scaler_path)
+            self.inference = FusedInference(self.model, self.scaler)
             return True
         except Exception as e:
             st.error(f"Error loading model: {str(e)}")
             return False
     
     def predict(self, patient_data: PatientData):
-        if self.model is None or self.scaler is None:
+        if self.inference is None:
             return None
         
         try:
-            # Prepare and scale input
-            input_array = patient_data.to_array()
-            input_scaled = self.scaler.transform(input_array)
-            
-            # Get prediction and probabilities
-            prediction = self.model.predict(input_scaled)[0]
-            
-            try:
-                probabilities = self.model.predict_proba(input_scaled)[0]
-                prob_negative = probabilities[0] * 100
-                prob_positive = probabilities[1] * 100
-            except AttributeError:
-                # Model doesn't support probability
-                prob_positive = 100.0 if prediction == 1 else 0.0
-                prob_negative = 100.0 - prob_positive
+            # Scale and score in one fused pass; the label is the argmax
+            predictions, probabilities = self.inference(patient_data.to_array())
+            prediction = predictions[0]
+            prob_negative = probabilities[0, 0] * 100
+            prob_positive = probabilities[0, 1] * 100
             
             return PredictionResult(
                 prediction=int(prediction),
@@ -116,6 +124,11 @@ class ModelManager:
         except Exception as e:
             st.error(f"Prediction error: {str(e)}")
             return None
+    
+    def predict_probabilities(self, input_array: np.ndarray) -> np.ndarray:
+        """Diabetic probability (%) for every row of a feature matrix, in one batched call"""
+        _, probabilities = self.inference(input_array)
+        return probabilities[:, 1] * 100
 
 
 @st.cache_resource
@@ -217,6 +230,95 @@ def render_sidebar_inputs() -> PatientData:
     )
 
 
+def sweep_values(feature: str, steps: int) -> np.ndarray:
+    feature_range = config.FEATURE_RANGES[SWEEP_FEATURES[feature][1]]
+    values = np.linspace(feature_range['min'], feature_range['max'], steps)
+    if isinstance(feature_range['step'], int):
+        values = np.unique(np.round(values))
+    return values
+
+
+@st.cache_data(show_spinner=False)
+def compute_sensitivity(base: tuple, features: tuple, steps: int):
+    """Probability curve (one feature) or surface (two features) around `base`
+
+    The whole grid is scored in a single batched call; results are cached per
+    base vector, so rerenders with unchanged inputs do no model work.
+    """
+    columns = [list(SWEEP_FEATURES).index(feature) for feature in features]
+    axes = [sweep_values(feature, steps) for feature in features]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    grid = np.tile(np.asarray(base, dtype=np.float64), (mesh[0].size, 1))
+    for column, values in zip(columns, mesh):
+        grid[:, column] = values.ravel()
+    probabilities = get_model_manager().predict_probabilities(grid)
+    return axes, probabilities.reshape(mesh[0].shape)
+
+
+def render_sensitivity_curve(feature: str, values: np.ndarray, probabilities: np.ndarray,
+                             current: float) -> go.Figure:
+    fig = go.Figure(go.Scatter(x=values, y=probabilities, mode='lines', line={'color': 'darkblue', 'width': 3}))
+    fig.add_hrect(y0=0, y1=config.LOW_RISK_THRESHOLD, fillcolor='#2ecc71', opacity=0.15, line_width=0)
+    fig.add_hrect(y0=config.LOW_RISK_THRESHOLD, y1=config.HIGH_RISK_THRESHOLD,
+                  fillcolor='#f1c40f', opacity=0.15, line_width=0)
+    fig.add_hrect(y0=config.HIGH_RISK_THRESHOLD, y1=100, fillcolor='#e74c3c', opacity=0.15, line_width=0)
+    fig.add_vline(x=current, line_dash='dash', annotation_text='Current')
+    fig.update_layout(
+        height=400,
+        xaxis_title=SWEEP_FEATURES[feature][0],
+        yaxis_title='Diabetic Probability (%)',
+        yaxis_range=[0, 100],
+        margin=dict(l=20, r=20, t=30, b=20),
+    )
+    return fig
+
+
+def render_sensitivity_surface(features: tuple, axes: list, probabilities: np.ndarray) -> go.Figure:
+    fig = go.Figure(go.Surface(
+        x=axes[1], y=axes[0], z=probabilities,
+        cmin=0, cmax=100,
+        colorscale=[[0, '#2ecc71'], [0.5, '#f1c40f'], [1, '#e74c3c']],
+        colorbar={'title': '%'},
+    ))
+    fig.update_layout(
+        height=550,
+        scene={
+            'xaxis_title': SWEEP_FEATURES[features[1]][0],
+            'yaxis_title': SWEEP_FEATURES[features[0]][0],
+            'zaxis_title': 'Diabetic Probability (%)',
+            'zaxis': {'range': [0, 100]},
+        },
+        margin=dict(l=0, r=0, t=30, b=0),
+    )
+    return fig
+
+
+def render_sensitivity_view(patient_data: PatientData):
+    st.markdown("---")
+    st.subheader("What-if Sensitivity")
+    features = st.multiselect(
+        'Features to vary (one for a curve, two for a surface)',
+        options=list(SWEEP_FEATURES),
+        default=['glucose'],
+        max_selections=2,
+        format_func=lambda feature: SWEEP_FEATURES[feature][0]
+    )
+    if not features:
+        st.info("Select one or two features to see how the predicted risk changes.", icon=":material/tune:")
+        return
+    
+    base = tuple(patient_data.to_array()[0].tolist())
+    axes, probabilities = compute_sensitivity(base, tuple(features), config.SENSITIVITY_STEPS)
+    if len(features) == 1:
+        current = base[list(SWEEP_FEATURES).index(features[0])]
+        st.plotly_chart(render_sensitivity_curve(features[0], axes[0], probabilities, current),
+                        use_container_width=True)
+    else:
+        st.plotly_chart(render_sensitivity_surface(tuple(features), axes, probabilities),
+                        use_container_width=True)
+    st.caption("All other inputs are held at the values entered in the sidebar.")
+
+
 def render_risk_gauge(probability: float) -> go.Figure:
     fig = go.Figure(go.Indicator(
         mode="gauge+number",
@@ -251,36 +353,8 @@ def render_risk_gauge(probability: float) -> go.Figure:
 
 
 def analyze_risk_factors(patient_data: PatientData):
-    risk_factors = []
-    positive_factors = []
-    
-    if patient_data.glucose > 125:
-        risk_factors.append("High Glucose Level (>125 mg/dL) - Indicates potential diabetes")
-    elif patient_data.glucose < 100:
-        positive_factors.append("Normal Glucose Level (<100 mg/dL)")
-    
-    if patient_data.bmi >= 30:
-        risk_factors.append("Obesity (BMI >= 30) - Significantly increases diabetes risk")
-    elif patient_data.bmi >= 25:
-        risk_factors.append("Overweight (BMI 25-29.9) - Moderate risk factor")
-    elif 18.5 <= patient_data.bmi <= 24.9:
-        positive_factors.append("Healthy BMI (18.5-24.9 kg/m2)")
-    
-    if patient_data.age >= 45:
-        risk_factors.append("Age Factor (>= 45 years) - Increased risk with age")
-    
-    if patient_data.blood_pressure > 80:
-        risk_factors.append("Elevated Blood Pressure (>80 mm Hg)")
-    elif 60 <= patient_data.blood_pressure <= 80:
-        positive_factors.append("Normal Blood Pressure (60-80 mm Hg)")
-    
-    if patient_data.diabetes_pedigree_function > 0.5:
-        risk_factors.append("Genetic Predisposition (DPF >0.5) - Family history indicates higher risk")
-    
-    if patient_data.insulin > 200:
-        risk_factors.append("Elevated Insulin (>200 uU/mL) - May indicate insulin resistance")
-    
-    return risk_factors, positive_factors
+    # Same rule table the API uses for ?include_risk_factors=true
+    return risk_factor_table.describe(patient_data.to_array())
 
 
 def render_prediction_results(result: PredictionResult, patient_data: PatientData):
@@ -399,6 +473,8 @@ def main():
     else:
         render_landing_page()
     
+    render_sensitivity_view(patient_data)
+    
 
     
 
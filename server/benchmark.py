@@ -0,0 +1,282 @@
+"""Benchmarks for the inference path and the HTTP stack.
+
+Synthetic patients are sampled column by column from the empirical
+distributions in AI/diabetes.csv (clipped to the PatientInput bounds), so
+the model sees realistic inputs. Results are written as JSON so runs can be
+compared; `--baseline` fails the run when latency or throughput regress.
+
+Usage (from the repository root):
+    python -m server.cli bench -o results.json
+    python -m server.cli bench --skip-http --baseline results.json
+"""
+import contextlib
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .config import config
+from .schemas.diabetes import PatientInput
+from .services.bulk import feature_columns
+from .services.prediction_service import FEATURE_NAMES, PredictionService
+from .services.registry import parse_model_specs
+from .services.validation import field_bounds
+
+SERVER_DIR = Path(__file__).parent
+DATASET_PATH = SERVER_DIR / "AI" / "diabetes.csv"
+DEFAULT_BATCH_SIZES = (1, 8, 64, 512, 4096)
+PERCENTILES = (50, 95, 99)
+# Relative change beyond which a compared metric counts as a regression
+DEFAULT_TOLERANCE = 0.2
+
+
+class PatientGenerator:
+    """Samples synthetic feature rows from the per-column distributions of the training data"""
+
+    def __init__(self, dataset_path: Path = DATASET_PATH, seed: int = 0):
+        with open(dataset_path, encoding="utf-8") as handle:
+            header = handle.readline().strip().split(",")
+        self.columns = np.loadtxt(
+            dataset_path, delimiter=",", skiprows=1, usecols=feature_columns(header), ndmin=2,
+        )
+        self.bounds = field_bounds()
+        self.rng = np.random.default_rng(seed)
+
+    def matrix(self, n_rows: int) -> np.ndarray:
+        """N x 8 matrix; each column is drawn independently from its empirical distribution"""
+        picks = self.rng.integers(0, len(self.columns), size=(n_rows, len(FEATURE_NAMES)))
+        matrix = np.take_along_axis(self.columns, picks, axis=0)
+        # The CSV encodes missing values as 0, which some schema bounds reject
+        return np.clip(matrix, self.bounds[0], self.bounds[1])
+
+    def patients(self, n_rows: int) -> List[PatientInput]:
+        return [PatientInput(**dict(zip(FEATURE_NAMES, row))) for row in self.matrix(n_rows).tolist()]
+
+
+def _summarize(seconds: Sequence[float]) -> dict:
+    """Latency distribution in milliseconds"""
+    ms = np.asarray(seconds) * 1000
+    summary = {f"p{p}_ms": float(np.percentile(ms, p)) for p in PERCENTILES}
+    summary.update(mean_ms=float(ms.mean()), max_ms=float(ms.max()), samples=len(ms))
+    return summary
+
+
+def _load_service(version: str, engine: str) -> PredictionService:
+    spec = parse_model_specs(config.MODEL_VERSIONS)[version]
+    # Keep load messages off stdout, which may carry the results
+    with contextlib.redirect_stdout(sys.stderr):
+        return PredictionService(model_path=spec.model_path, scaler_path=spec.scaler_path, engine=engine)
+
+
+def bench_load(version: str, engine: str, repeats: int = 3) -> dict:
+    """Model + scaler load time; the first load also pays for importing sklearn"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _load_service(version, engine)
+        timings.append(time.perf_counter() - start)
+    return {
+        "first_seconds": timings[0],
+        "median_seconds": float(np.median(timings)),
+        "repeats": repeats,
+    }
+
+
+def bench_single_row(service: PredictionService, generator: PatientGenerator,
+                     iterations: int = 1000, warmup: int = 50) -> dict:
+    """Latency of PredictionService.predict for one patient at a time"""
+    patients = generator.patients(iterations + warmup)
+    for patient in patients[:warmup]:
+        service.predict(patient)
+    timings = []
+    for patient in patients[warmup:]:
+        start = time.perf_counter()
+        service.predict(patient)
+        timings.append(time.perf_counter() - start)
+    return _summarize(timings)
+
+
+def bench_batches(service: PredictionService, generator: PatientGenerator,
+                  batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES, min_seconds: float = 1.0) -> List[dict]:
+    """Rows/sec of PredictionService.predict_batch at each batch size"""
+    results = []
+    for batch_size in batch_sizes:
+        patients = generator.patients(batch_size)
+        service.predict_batch(patients)
+        timings = []
+        started = time.perf_counter()
+        while not timings or time.perf_counter() - started < min_seconds:
+            start = time.perf_counter()
+            service.predict_batch(patients)
+            timings.append(time.perf_counter() - start)
+        results.append({
+            "batch_size": batch_size,
+            "rows_per_second": batch_size * len(timings) / sum(timings),
+            **_summarize(timings),
+        })
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(connection: http.client.HTTPConnection, path: str) -> int:
+    connection.request("GET", path)
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def bench_http(generator: PatientGenerator, engine: str, requests: int = 1000,
+               warmup: int = 50, startup_timeout: float = 120.0) -> dict:
+    """End-to-end /api/diabetes/predict latency against a local uvicorn"""
+    port = _free_port()
+    # The cache is disabled so every request exercises the model
+    env = {**os.environ, "DIABETES_CACHE_MAX_SIZE": "0", "DIABETES_INFERENCE_ENGINE": engine}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR.parent, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        started = time.perf_counter()
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            if time.perf_counter() - started > startup_timeout:
+                raise RuntimeError("uvicorn did not become ready in time")
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                if _get(connection, "/api/diabetes/health/ready") == 200:
+                    break
+                connection.close()
+            except OSError:
+                pass
+            time.sleep(0.1)
+        ready_seconds = time.perf_counter() - started
+
+        bodies = [
+            json.dumps(dict(zip(FEATURE_NAMES, row)))
+            for row in generator.matrix(requests + warmup).tolist()
+        ]
+        headers = {"Content-Type": "application/json"}
+        timings = []
+        errors = 0
+        for index, body in enumerate(bodies):
+            start = time.perf_counter()
+            connection.request("POST", "/api/diabetes/predict", body, headers)
+            response = connection.getresponse()
+            response.read()
+            if index >= warmup:
+                timings.append(time.perf_counter() - start)
+                errors += response.status != 200
+        connection.close()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    return {"ready_seconds": ready_seconds, "errors": errors, **_summarize(timings)}
+
+
+def _environment() -> dict:
+    import sklearn
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def run(version: str, engine: str, iterations: int = 1000, batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+        http_requests: int = 1000, skip_http: bool = False, seed: int = 0) -> dict:
+    """Run every benchmark and return the results document"""
+    generator = PatientGenerator(seed=seed)
+    load = bench_load(version, engine)
+    service = _load_service(version, engine)
+    results = {
+        "environment": _environment(),
+        "model_version": service.model_version,
+        "engine": engine,
+        "load": load,
+        "single_row": bench_single_row(service, generator, iterations),
+        "batch": bench_batches(service, generator, batch_sizes),
+        "http": None if skip_http else bench_http(generator, engine, http_requests),
+    }
+    return results
+
+
+def _metrics(results: dict) -> Dict[str, tuple]:
+    """Comparable metrics as name -> (value, higher_is_better)"""
+    metrics = {"load.median_seconds": (results["load"]["median_seconds"], False)}
+    for p in PERCENTILES:
+        metrics[f"single_row.p{p}_ms"] = (results["single_row"][f"p{p}_ms"], False)
+        if results.get("http"):
+            metrics[f"http.p{p}_ms"] = (results["http"][f"p{p}_ms"], False)
+    for batch in results["batch"]:
+        metrics[f"batch.{batch['batch_size']}.rows_per_second"] = (batch["rows_per_second"], True)
+    return metrics
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[dict]:
+    """Per-metric relative change against a baseline run, flagging regressions"""
+    current = _metrics(results)
+    rows = []
+    for name, (before, higher_is_better) in _metrics(baseline).items():
+        if name not in current or not before:
+            continue
+        after = current[name][0]
+        change = (after - before) / before
+        worse = -change if higher_is_better else change
+        rows.append({
+            "metric": name,
+            "baseline": before,
+            "current": after,
+            "change": change,
+            "regression": worse > tolerance,
+        })
+    return rows
+
+
+def main(args) -> int:
+    """Entry point for `python -m server.cli bench`"""
+    results = run(
+        version=args.model_version,
+        engine=args.engine,
+        iterations=args.iterations,
+        batch_sizes=args.batch_sizes,
+        http_requests=args.http_requests,
+        skip_http=args.skip_http,
+        seed=args.seed,
+    )
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        results["comparison"] = compare(results, baseline, args.tolerance)
+        regressions = [row for row in results["comparison"] if row["regression"]]
+
+    document = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(document)
+    else:
+        Path(args.output).write_text(document + "\n")
+        print(f"✓ Benchmark results written to {args.output}", file=sys.stderr)
+
+    for row in regressions:
+        print(f"✗ {row['metric']} regressed {row['change']:+.1%} "
+              f"({row['baseline']:.4g} -> {row['current']:.4g})", file=sys.stderr)
+    return 1 if regressions else 0
@@ -0,0 +1,309 @@
+"""Offline batch scoring.
+
+Scores large CSV / NDJSON / Parquet files with the same preprocessing and
+inference path as the HTTP API (RowChunker -> PredictionService.score_matrix
+-> format_chunk), so offline and online scores are identical.
+
+Usage (from the repository root):
+    python -m server.cli score server/AI/diabetes.csv -o scores.csv --workers 4
+    python -m server.cli bench -o results.json
+    python -m server.cli train --version v3
+    python -m server.cli export --model-version v2 -o server/aiModels/diabetes_model_v2.forest
+    python -m server.cli verify server/aiModels/diabetes_model_v2.forest
+    python -m server.cli reduce --model-version v2 --trees 25 --max-depth 6
+    python -m server.cli replay audit.db --model-version v3 -o rescored.csv
+"""
+import argparse
+import contextlib
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+from .config import config
+from .services.registry import parse_model_specs
+
+
+def _input_format(path: str, requested: str) -> str:
+    if requested != "auto":
+        return requested
+    suffix = Path(path).suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    return "csv"
+
+
+def _output_format(path: str, requested: str) -> str:
+    if requested != "auto":
+        return requested
+    return "ndjson" if Path(path).suffix.lower() in (".ndjson", ".jsonl", ".json") else "csv"
+
+
+def _load_service(version: str, engine: str, explain: bool = False):
+    from .services.prediction_service import PredictionService
+
+    specs = parse_model_specs(config.MODEL_VERSIONS)
+    if version not in specs:
+        raise SystemExit(f"Unknown model version '{version}'. Available: {', '.join(specs)}")
+    spec = specs[version]
+    # Keep load messages off stdout, which may carry the scores
+    with contextlib.redirect_stdout(sys.stderr):
+        return PredictionService(model_path=spec.model_path, scaler_path=spec.scaler_path, engine=engine,
+                                 explain=explain)
+
+
+def score(args: argparse.Namespace) -> int:
+    from .services import bulk
+    from .services.workers import InferencePool
+
+    input_format = _input_format(args.input, args.input_format)
+    output_format = _output_format(args.output, args.output_format)
+    service = _load_service(args.model_version, args.engine)
+
+    if input_format == "parquet":
+        chunks = bulk.iter_parquet_chunks(args.input, args.chunk_size)
+    else:
+        chunks = bulk.iter_file_chunks(args.input, input_format, args.chunk_size)
+
+    validator = bulk.RowValidator(args.invalid_rows)
+    pool = InferencePool(args.workers).start({args.model_version: service}) if args.workers > 0 else None
+    # At most this many chunks are parsed but not yet written, bounding memory
+    max_in_flight = max(1, 2 * args.workers)
+    pending = deque()
+    rows = 0
+    started = time.perf_counter()
+
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        if output_format == "csv":
+            output.write(bulk.csv_header())
+
+        def write_oldest() -> None:
+            nonlocal rows
+            first_row, row_indices, result = pending.popleft()
+            scores = result.result() if pool is not None else result
+            output.write(bulk.format_chunk(scores, first_row, output_format, row_indices))
+            rows += len(scores.predictions)
+
+        first_row = 0
+        for matrix in chunks:
+            valid, row_indices = validator.check(matrix, first_row)
+            if pool is not None:
+                pending.append((first_row, row_indices, pool.submit(args.model_version, valid)))
+            else:
+                pending.append((first_row, row_indices, service.score_matrix(valid)))
+            first_row += len(matrix)
+            while len(pending) >= max_in_flight:
+                write_oldest()
+        while pending:
+            write_oldest()
+    except bulk.BulkInputError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"✓ Scored {rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec) with model {service.model_version}",
+          file=sys.stderr)
+    if validator.skipped:
+        errors = validator.report()["errors"]
+        print(f"⚠ Skipped {validator.skipped} invalid rows: "
+              + "; ".join(f"{error['constraint']} ({error['count']} rows)" for error in errors.values()),
+              file=sys.stderr)
+    return 0
+
+
+def bench(args: argparse.Namespace) -> int:
+    from . import benchmark
+
+    return benchmark.main(args)
+
+
+def train(args: argparse.Namespace) -> int:
+    from . import training
+
+    return training.main(args)
+
+
+def export(args: argparse.Namespace) -> int:
+    import numpy as np
+    from .services.artifacts import export_forest, load_forest
+
+    service = _load_service(args.model_version, "forest", explain=True)
+    output = Path(args.output) if args.output else Path(service.model_path).with_suffix(".forest")
+    export_forest(output, service.inference, service.preprocessor, service.explainer, source={
+        "model_version": service.model_version,
+        "model_path": str(service.model_path),
+        "scaler_path": str(service.scaler_path) if service.scaler_path else None,
+    })
+
+    # Round-trip check: the mapped artifact must score exactly like the source model
+    forest, preprocessor, _, _ = load_forest(output, verify=True)
+    probe = service._synthetic_inputs(1024)
+    if preprocessor is not None:
+        probe = preprocessor.transform(probe)
+    deviation = float(np.max(np.abs(forest.predict_proba(probe) - service.inference.predict_proba(probe))))
+    if deviation > 0:
+        print(f"✗ Exported artifact deviates from {service.model_version} by {deviation:.3g}", file=sys.stderr)
+        return 1
+    size = sum(path.stat().st_size for path in output.iterdir())
+    print(f"✓ Exported {service.model_version} to {output} ({size / 1e6:.1f} MB)", file=sys.stderr)
+    return 0
+
+
+def verify(args: argparse.Namespace) -> int:
+    """Check every file of an exported artifact against its recorded SHA-256"""
+    from .services.artifacts import ArtifactError, load_forest
+
+    try:
+        _, _, _, manifest = load_forest(Path(args.artifact), verify=True)
+    except ArtifactError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    print(f"✓ {args.artifact}: {len(manifest['arrays'])} arrays match their checksums", file=sys.stderr)
+    return 0
+
+
+def reduce(args: argparse.Namespace) -> int:
+    from . import fast_tier
+
+    return fast_tier.main(args, _load_service(args.model_version, "forest"))
+
+
+def replay(args: argparse.Namespace) -> int:
+    """Re-score logged predictions with another model and compare"""
+    import numpy as np
+    from .services.audit import iter_audit
+    from .services.prediction_service import RISK_LEVELS
+
+    if not Path(args.audit_log).exists():
+        print(f"✗ Audit log not found: {args.audit_log}", file=sys.stderr)
+        return 1
+    service = _load_service(args.model_version, args.engine)
+    rows = changed = 0
+    total_shift = 0.0
+    started = time.perf_counter()
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        output.write("id,recorded_at,model_version,probability_positive,risk_level,"
+                     "new_probability_positive,new_risk_level\n")
+        for chunk in iter_audit(args.audit_log, args.chunk_size, args.since_id, args.version):
+            scores = service.score_matrix(chunk.features)
+            levels = [RISK_LEVELS[code].value for code in scores.risk_codes.tolist()]
+            output.write("".join(
+                f"{row_id},{recorded_at!r},{model_version},{old!r},{old_level},{new!r},{new_level}\n"
+                for row_id, recorded_at, model_version, old, old_level, new, new_level in zip(
+                    chunk.ids.tolist(), chunk.recorded_at.tolist(), chunk.model_versions,
+                    chunk.probability_positive.tolist(), chunk.risk_levels,
+                    scores.probability_positive.tolist(), levels,
+                )
+            ))
+            rows += len(levels)
+            changed += sum(old != new for old, new in zip(chunk.risk_levels, levels))
+            total_shift += float(np.abs(scores.probability_positive - chunk.probability_positive).sum())
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✓ Re-scored {rows} logged predictions in {elapsed:.2f}s with model {service.model_version}",
+          file=sys.stderr)
+    if rows:
+        print(f"✓ Risk level changed for {changed} ({changed / rows:.1%}); "
+              f"mean probability shift {total_shift / rows:.2f} points", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m server.cli", description="Diabetes prediction tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score_parser = commands.add_parser("score", help="Score a CSV, NDJSON or Parquet file offline")
+    score_parser.add_argument("input", help="Input file (CSV, NDJSON, or Parquet with pyarrow installed)")
+    score_parser.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout (default)")
+    score_parser.add_argument("--input-format", choices=("auto", "csv", "ndjson", "parquet"), default="auto")
+    score_parser.add_argument("--output-format", choices=("auto", "csv", "ndjson"), default="auto")
+    score_parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per vectorized pass")
+    score_parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = score in-process)")
+    score_parser.add_argument("--invalid-rows", choices=("skip", "reject"), default="skip",
+                              help="Leave rows outside the API's field bounds out (reported on stderr), "
+                                   "or stop at the first one")
+    score_parser.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION)
+    score_parser.add_argument("--engine", default=config.INFERENCE_ENGINE, help="Inference engine: fused or forest")
+    score_parser.set_defaults(handler=score)
+
+    bench_parser = commands.add_parser("bench", help="Benchmark inference latency, throughput and the HTTP stack")
+    bench_parser.add_argument("-o", "--output", default="-", help="JSON results file, '-' for stdout (default)")
+    bench_parser.add_argument("--iterations", type=int, default=1000, help="Single-row predictions to time")
+    bench_parser.add_argument("--batch-sizes", type=lambda text: [int(size) for size in text.split(",")],
+                              default=[1, 8, 64, 512, 4096], help="Comma-separated batch sizes")
+    bench_parser.add_argument("--http-requests", type=int, default=1000, help="Requests sent to /predict")
+    bench_parser.add_argument("--skip-http", action="store_true", help="Do not start uvicorn")
+    bench_parser.add_argument("--baseline", help="Earlier results file to compare against")
+    bench_parser.add_argument("--tolerance", type=float, default=0.2,
+                              help="Relative slowdown reported as a regression (default 0.2)")
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION)
+    bench_parser.add_argument("--engine", default=config.INFERENCE_ENGINE, help="Inference engine: fused or forest")
+    bench_parser.set_defaults(handler=bench)
+
+    train_parser = commands.add_parser("train", help="Train and export a versioned model pipeline")
+    train_parser.add_argument("--version", help="Artifact version, e.g. v3 (default: a timestamp)")
+    train_parser.add_argument("--data", default=str(Path(__file__).parent / "AI" / "diabetes.csv"),
+                              help="Training CSV with an Outcome column")
+    train_parser.add_argument("--output-dir", default=str(Path(__file__).parent / "aiModels"))
+    train_parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel search jobs (-1 = all cores)")
+    train_parser.add_argument("--cv", type=int, default=5, help="Cross-validation folds")
+    train_parser.add_argument("--cache-dir", default=None, help="Preprocessing cache (default: system temp dir)")
+    train_parser.add_argument("--no-cache", action="store_true", help="Refit preprocessing for every candidate")
+    train_parser.add_argument("--force", action="store_true", help="Overwrite an existing version")
+    train_parser.set_defaults(handler=train)
+
+    export_parser = commands.add_parser("export", help="Export a model version as a memory-mappable array artifact")
+    export_parser.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION)
+    export_parser.add_argument("-o", "--output", help="Artifact directory (default: next to the model, .forest)")
+    export_parser.set_defaults(handler=export)
+
+    verify_parser = commands.add_parser("verify", help="Verify an exported artifact against its checksums")
+    verify_parser.add_argument("artifact", help="Artifact directory")
+    verify_parser.set_defaults(handler=verify)
+
+    reduce_parser = commands.add_parser("reduce", help="Derive a smaller fast-tier forest and report what it costs")
+    reduce_parser.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION)
+    reduce_parser.add_argument("--trees", type=int, help="Keep the first N trees (default: sweep)")
+    reduce_parser.add_argument("--max-depth", type=int, help="Cut trees off at this depth (default: sweep)")
+    reduce_parser.add_argument("--float64", action="store_true", help="Keep float64 thresholds")
+    reduce_parser.add_argument("--data", default=str(Path(__file__).parent / "AI" / "diabetes.csv"),
+                               help="Labelled CSV to measure accuracy and ROC-AUC on")
+    reduce_parser.add_argument("-o", "--output", help="JSON report file, '-' for stdout")
+    reduce_parser.add_argument("--export", help="Write the reduced forest as an artifact directory")
+    reduce_parser.set_defaults(handler=reduce)
+
+    replay_parser = commands.add_parser("replay", help="Re-score the prediction audit log with a model version")
+    replay_parser.add_argument("audit_log", help="SQLite audit database (DIABETES_AUDIT_LOG)")
+    replay_parser.add_argument("-o", "--output", default="-", help="CSV output file, '-' for stdout (default)")
+    replay_parser.add_argument("--model-version", default=config.DEFAULT_MODEL_VERSION, help="Model to re-score with")
+    replay_parser.add_argument("--engine", default=config.INFERENCE_ENGINE, help="Inference engine: fused or forest")
+    replay_parser.add_argument("--version", help="Only replay predictions originally served by this version")
+    replay_parser.add_argument("--since-id", type=int, default=0, help="Only replay records after this id")
+    replay_parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per vectorized pass")
+    replay_parser.set_defaults(handler=replay)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import os
+from dataclasses import dataclass, fields
+
+
+ENV_PREFIX = "DIABETES_"
+
+
+def _parse(raw: str, field_type):
+    if field_type is bool:
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    return field_type(raw)
+
+
+@dataclass
+class ServerConfig:
+    """Server settings; each field can be overridden with a DIABETES_<NAME> env variable"""
+    INFERENCE_ENGINE: str = "fused"
+    # Compare a non-sklearn engine against predict_proba on synthetic rows at every load
+    # (parity is covered by tests/test_forest_engine.py; this guards custom artifacts)
+    PARITY_CHECK: bool = False
+
+    # Served model versions as version=model_path:scaler_path pairs (paths relative to server/)
+    MODEL_VERSIONS: str = (
+        "v1=aiModels/diabetes_model.pkl:aiModels/scaler_svm.pkl,"
+        "v2=aiModels/diabetes_model_v2.pkl:aiModels/scaler_rf_v2.pkl"
+    )
+    DEFAULT_MODEL_VERSION: str = "v2"
+    # Runtime reloads may only load artifacts from MODEL_VERSIONS or inside this
+    # directory (relative to server/), since loading a pickle can execute code
+    MODEL_DIR: str = "aiModels"
+    # Bearer token for admin endpoints (model reload); empty disables them
+    ADMIN_TOKEN: str = ""
+    # Requests opting into the fast tier (?tier=fast) are served by version + suffix,
+    # e.g. v2-fast, a reduced forest exported with `python -m server.cli reduce`
+    FAST_TIER_SUFFIX: str = "-fast"
+
+    # Micro-batching of concurrent /predict calls
+    BATCH_MAX_SIZE: int = 64
+    BATCH_MAX_WAIT_US: int = 500
+
+    # Inference worker processes forked after the model loads (0 = score in-process).
+    # The HTTP server stays a single uvicorn process; workers share its model pages.
+    INFERENCE_WORKERS: int = 0
+
+    # Prediction cache (CACHE_MAX_SIZE=0 disables it, CACHE_TTL_SECONDS=0 never expires)
+    CACHE_MAX_SIZE: int = 10000
+    CACHE_TTL_SECONDS: float = 0.0
+
+    # Write /predict and /predict/batch responses from pre-encoded JSON fragments
+    # instead of re-validating and serializing PredictionOutput through FastAPI
+    FAST_RESPONSES: bool = True
+
+    # Precompute per-node path contributions at load time so ?explain=true is cheap.
+    # Off by default: it adds to every cold start; ?explain=true answers 400 until enabled
+    EXPLANATIONS: bool = False
+
+    # Input/probability drift against the training data, reported by /drift
+    # (DRIFT_BASELINE is relative to server/, like the model paths). Off by default:
+    # it adds bookkeeping to every scored row; /drift answers 404 until enabled
+    DRIFT_MONITORING: bool = False
+    DRIFT_BASELINE: str = "AI/diabetes.csv"
+    DRIFT_BINS: int = 10
+    DRIFT_MIN_ROWS: int = 100
+
+    # Admission control for /api/diabetes/predict*: requests beyond MAX_CONCURRENT
+    # wait (up to QUEUE_TIMEOUT) in a queue of MAX_QUEUE, otherwise 429/503 with
+    # Retry-After. ADMISSION_MAX_CONCURRENT=0 disables it.
+    ADMISSION_MAX_CONCURRENT: int = 64
+    ADMISSION_MAX_QUEUE: int = 256
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 1.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Prediction audit log: SQLite database path (empty = disabled), written in
+    # batches by a background thread. When AUDIT_QUEUE_MAX_ROWS rows are waiting,
+    # AUDIT_FULL_POLICY "drop" discards new records, "reject" answers 503.
+    AUDIT_LOG: str = ""
+    AUDIT_QUEUE_MAX_ROWS: int = 100000
+    AUDIT_BATCH_ROWS: int = 5000
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.5
+    AUDIT_FULL_POLICY: str = "drop"
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        overrides = {}
+        for field in fields(cls):
+            raw = os.environ.get(ENV_PREFIX + field.name)
+            if raw is not None:
+                overrides[field.name] = _parse(raw, field.type)
+        return cls(**overrides)
+
+
+config = ServerConfig.from_env()
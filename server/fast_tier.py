@@ -0,0 +1,169 @@
+"""Fast-tier models derived from a served random forest.
+
+Latency-bound clients (e.g. triage kiosks) can opt into a smaller forest:
+the first N trees of a served version, cut off at a maximum depth, with
+float32 thresholds. Each candidate is scored on the training CSV and timed
+against the full model, so the accuracy/AUC given up can be weighed against
+the speedup before one is exported as a memory-mapped artifact.
+
+Usage (from the repository root):
+    python -m server.cli reduce --model-version v2
+    python -m server.cli reduce --model-version v2 --trees 25 --max-depth 6 \\
+        --export server/aiModels/diabetes_model_v2_fast.forest
+    DIABETES_MODEL_VERSIONS="...,v2-fast=aiModels/diabetes_model_v2_fast.forest" uvicorn server.main:app
+
+Requests then opt in with ?tier=fast or an `X-Model-Tier: fast` header.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+# Candidates tried when neither --trees nor --max-depth is given
+SWEEP_TREES = (10, 25, 50, 100)
+SWEEP_DEPTHS = (4, 6, 8)
+SINGLE_ROW_ITERATIONS = 200
+BATCH_ROWS = 4096
+REPEATS = 3
+
+
+def evaluate(engine, X: np.ndarray, y: np.ndarray) -> dict:
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    predictions, probabilities = engine(X)
+    return {
+        "accuracy": accuracy_score(y, predictions),
+        "roc_auc": roc_auc_score(y, probabilities[:, 1]),
+    }
+
+
+def time_engine(engine, X: np.ndarray, iterations: int = SINGLE_ROW_ITERATIONS,
+                batch_rows: int = BATCH_ROWS, repeats: int = REPEATS) -> dict:
+    """Single-row latency and batch throughput of `engine` on rows of X (best of `repeats`)"""
+    rows = [X[i % len(X)][None, :] for i in range(iterations)]
+    batch = X[np.arange(batch_rows) % len(X)]
+    engine(batch)
+    single_row = batch_seconds = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for row in rows:
+            engine(row)
+        single_row = min(single_row, (time.perf_counter() - start) / iterations)
+        start = time.perf_counter()
+        engine(batch)
+        batch_seconds = min(batch_seconds, time.perf_counter() - start)
+    return {"single_row_us": single_row * 1e6, "batch_rows_per_sec": batch_rows / batch_seconds}
+
+
+def candidates(trees: Optional[int], max_depth: Optional[int]) -> Iterable[Tuple[Optional[int], Optional[int]]]:
+    if trees is None and max_depth is None:
+        return [(n_trees, depth) for n_trees in SWEEP_TREES for depth in SWEEP_DEPTHS]
+    return [(trees, max_depth)]
+
+
+def _array_forest(service):
+    from .services.forest_engine import ArrayForest
+
+    if isinstance(service.inference, ArrayForest):
+        return service.inference
+    return ArrayForest.from_sklearn(service.model, service.scaler)
+
+
+def compare(service, X: np.ndarray, y: np.ndarray, tiers, threshold_dtype=np.float32) -> dict:
+    """Metrics and timings of the full forest and every reduced (trees, depth) candidate
+
+    Both run on the array engine, so the speedup is what the reduction buys.
+    """
+    X = service._preprocess(X)
+    forest = _array_forest(service)
+    baseline = {
+        "trees": forest.n_trees,
+        "max_depth": forest.max_depth,
+        "nodes": len(forest.feature),
+        **evaluate(forest, X, y),
+        **time_engine(forest, X),
+    }
+    results = []
+    for n_trees, depth in tiers:
+        reduced = forest.reduced(n_trees, depth, threshold_dtype)
+        result = {
+            "trees": reduced.n_trees,
+            "max_depth": reduced.max_depth,
+            "nodes": len(reduced.feature),
+            **evaluate(reduced, X, y),
+            **time_engine(reduced, X),
+        }
+        result["accuracy_loss"] = baseline["accuracy"] - result["accuracy"]
+        result["roc_auc_loss"] = baseline["roc_auc"] - result["roc_auc"]
+        result["single_row_speedup"] = baseline["single_row_us"] / result["single_row_us"]
+        result["batch_speedup"] = result["batch_rows_per_sec"] / baseline["batch_rows_per_sec"]
+        results.append(result)
+    return {
+        "model_version": service.model_version,
+        "rows": len(y),
+        "threshold_dtype": np.dtype(threshold_dtype).name,
+        "baseline": baseline,
+        "candidates": results,
+    }
+
+
+def _print_table(report: dict) -> None:
+    baseline = report["baseline"]
+    print(f"{report['model_version']} on {report['rows']} rows: "
+          f"{baseline['trees']} trees, depth {baseline['max_depth']}, accuracy {baseline['accuracy']:.4f}, "
+          f"ROC-AUC {baseline['roc_auc']:.4f}, {baseline['single_row_us']:.0f}us/row", file=sys.stderr)
+    print(f"{'trees':>6} {'depth':>6} {'nodes':>7} {'accuracy':>9} {'Δacc':>8} {'auc':>7} {'Δauc':>8} "
+          f"{'us/row':>7} {'speedup':>8} {'batch x':>8}", file=sys.stderr)
+    for result in report["candidates"]:
+        print(f"{result['trees']:>6} {result['max_depth']:>6} {result['nodes']:>7} {result['accuracy']:>9.4f} "
+              f"{-result['accuracy_loss']:>+8.4f} {result['roc_auc']:>7.4f} {-result['roc_auc_loss']:>+8.4f} "
+              f"{result['single_row_us']:>7.0f} {result['single_row_speedup']:>7.2f}x "
+              f"{result['batch_speedup']:>7.2f}x", file=sys.stderr)
+
+
+def export(service, path: Path, n_trees: Optional[int], max_depth: Optional[int],
+           threshold_dtype=np.float32, metrics: Optional[dict] = None) -> dict:
+    """Write the reduced forest as an artifact that any model version spec can point at"""
+    from .services.artifacts import export_forest
+    from .services.explain import PathExplainer
+
+    reduced = _array_forest(service).reduced(n_trees, max_depth, threshold_dtype)
+    return export_forest(path, reduced, service.preprocessor, PathExplainer(reduced), source={
+        "model_version": service.model_version,
+        "model_path": str(service.model_path),
+        "tier": "fast",
+        "trees": reduced.n_trees,
+        "max_depth": reduced.max_depth,
+        "threshold_dtype": np.dtype(threshold_dtype).name,
+        "metrics": metrics or {},
+    })
+
+
+def main(args, service) -> int:
+    """Entry point for `python -m server.cli reduce`"""
+    from .training import load_dataset
+
+    if args.export and args.trees is None and args.max_depth is None:
+        print("✗ --export needs --trees and/or --max-depth", file=sys.stderr)
+        return 1
+    threshold_dtype = np.float64 if args.float64 else np.float32
+    X, y = load_dataset(Path(args.data))
+    report = compare(service, X, y, candidates(args.trees, args.max_depth), threshold_dtype)
+    _print_table(report)
+
+    if args.output:
+        text = json.dumps(report, indent=2) + "\n"
+        if args.output == "-":
+            sys.stdout.write(text)
+        else:
+            Path(args.output).write_text(text)
+    if args.export:
+        result = report["candidates"][0]
+        export(service, Path(args.export), args.trees, args.max_depth, threshold_dtype, metrics={
+            name: result[name] for name in ("accuracy", "roc_auc", "accuracy_loss", "roc_auc_loss")
+        })
+        print(f"✓ Fast tier exported to {args.export}", file=sys.stderr)
+    return 0
@@ -1,9 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routes.diabetes import router as diabetes_router
+from fastapi.responses import PlainTextResponse
+from .config import config
+from .routes.diabetes import admission, router as diabetes_router, serving
+from .services import metrics
+from .services.admission import AdmissionMiddleware, DeadlineMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm up in the background so the port binds immediately;
+    # /api/diabetes/health/ready reports when the models can serve traffic
+    startup = asyncio.create_task(serving.start())
+    yield
+    startup.cancel()
+    await serving.stop()
+
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Shed prediction load before bodies are parsed; added before CORS so
+# rejections still carry CORS headers
+if config.ADMISSION_MAX_CONCURRENT > 0:
+    app.add_middleware(AdmissionMiddleware, controller=admission, path_prefix="/api/diabetes/predict")
+# X-Request-Timeout-Ms deadlines, with or without admission control (outside it,
+# so queued requests see their deadline)
+app.add_middleware(DeadlineMiddleware, path_prefix="/api/diabetes/predict")
 
 # Configure CORS for React frontend
 app.add_middleware(
@@ -40,6 +65,12 @@ async def health():
     return {"status": "ok", "service": "diabetes-prediction-api"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text-format latency histograms and counters"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,21 +1,167 @@
-from fastapi import APIRouter, HTTPException, status
-from ..schemas.diabetes import PatientInput, PredictionOutput
-from ..services.prediction_service import PredictionService
+import hmac
+import time
+from collections import Counter
+from typing import Mapping, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from ..config import config
+from ..schemas.diabetes import (
+    BatchPredictionInput,
+    BatchPredictionOutput,
+    ModelReloadRequest,
+    PatientInput,
+    PredictionOutput,
+)
+from ..services import metrics
+from ..services.admission import AdmissionController, DeadlineExceeded, check_deadline, current_deadline
+from ..services.registry import ModelEntry, ModelPathError, ModelReloadConflict
+from ..services.serving import ServingState
+from .instrumentation import RequestTiming, TimedRoute, accepts, request_timing
 
-router = APIRouter(tags=["Diabetes Prediction"])
+router = APIRouter(tags=["Diabetes Prediction"], route_class=TimedRoute)
 
-# Initialize prediction service
-try:
-    prediction_service = PredictionService()
-except Exception as e:
-    print(f"Warning: Failed to initialize prediction service: {e}")
-    prediction_service = None
+MODEL_TIERS = ("full", "fast")
+# What /predict/batch does with rows failing validation
+INVALID_ROW_POLICIES = ("reject", "skip")
+
+# Binary batch formats (see services/columnar.py); JSON stays the default
+MATRIX_MEDIA_TYPE = "application/vnd.diabetes.matrix"
+SCORES_MEDIA_TYPE = "application/vnd.diabetes.scores"
+
+# Populated by the application lifespan (see server/main.py)
+serving = ServingState(config)
+# Gates /predict* via AdmissionMiddleware (see server/main.py)
+admission = AdmissionController(
+    max_concurrent=config.ADMISSION_MAX_CONCURRENT,
+    max_queue=config.ADMISSION_MAX_QUEUE,
+    queue_timeout=config.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    retry_after=config.ADMISSION_RETRY_AFTER_SECONDS,
+)
+
+
+def _require_ready() -> None:
+    if not serving.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prediction service is not available"
+        )
+
+
+def select_model(
+    model_version: Optional[str] = Query(default=None, description="Model version to use (defaults to the server default)"),
+    x_model_version: Optional[str] = Header(default=None, description="Model version to use; the query parameter takes precedence"),
+    tier: Optional[str] = Query(default=None, description="'fast' for the reduced fast-tier model of the selected version"),
+    x_model_tier: Optional[str] = Header(default=None, description="Model tier to use; the query parameter takes precedence"),
+) -> ModelEntry:
+    """Resolve the model version (and tier) requested via query parameters or X-Model-* headers"""
+    _require_ready()
+    version = model_version or x_model_version
+    tier = tier or x_model_tier or "full"
+    if tier not in MODEL_TIERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"tier must be one of: {', '.join(MODEL_TIERS)}"
+        )
+    if tier == "fast":
+        base_version = version or serving.registry.default_version
+        version = base_version + config.FAST_TIER_SUFFIX
+        if serving.registry.get(version) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No fast tier is deployed for model version '{base_version}' "
+                       f"(expected a '{version}' model version)"
+            )
+    entry = serving.registry.get(version)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown model version '{version}'. Available: {', '.join(serving.registry.versions())}"
+        )
+    return entry
+
+
+def require_admin(
+    authorization: Optional[str] = Header(default=None, description="Bearer <DIABETES_ADMIN_TOKEN>"),
+) -> None:
+    """Gate admin endpoints; they are disabled unless an admin token is configured"""
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled; set DIABETES_ADMIN_TOKEN to enable them"
+        )
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), config.ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing admin token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def _check_explainable(model: ModelEntry, explain: bool) -> None:
+    if explain and model.service.explainer is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Explanations are not enabled for model version '{model.spec.version}'"
+        )
+
+
+def _count_predictions(model: ModelEntry, counts: Mapping[str, int]) -> None:
+    """Add served predictions to the per risk level counters"""
+    for risk_level, count in counts.items():
+        if count:
+            metrics.PREDICTIONS.labels(model.spec.version, model.service.model_version, risk_level).inc(count)
+
+
+def _audit(route: str, model: ModelEntry, inputs, outputs, timing: Optional[RequestTiming] = None,
+           latency: Optional[float] = None, block: bool = False) -> None:
+    """Queue served predictions for the audit log, if enabled
+
+    Raises 503 when the log is full under the reject policy; block=True
+    (for threadpool callers) waits for room instead.
+    """
+    if serving.audit is None:
+        return
+    from ..services.audit import AuditQueueFull
+
+    if timing is not None:
+        latency = time.perf_counter() - timing.started
+    try:
+        serving.audit.record(route, model.spec.version, model.service.model_version, latency,
+                             inputs, outputs, block=block)
+    except AuditQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+
+
+@router.get("/health/live", response_model=dict)
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {
+        "status": "alive",
+        "service": "diabetes-prediction"
+    }
+
+
+@router.get("/health/ready", response_model=dict)
+async def readiness():
+    """Readiness probe: models loaded and warmed up, with load and warm-up timings"""
+    health = serving.health()
+    if not serving.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=health)
+    return health
 
 
 @router.get("/health", response_model=dict)
 async def health_check():
     """Check if the prediction service is healthy"""
-    if prediction_service is None or prediction_service.model is None:
+    if not serving.ready:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Prediction service is not available. Models not loaded."
@@ -23,12 +169,19 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "diabetes-prediction",
-        "models_loaded": True
+        "models_loaded": True,
+        "model_version": serving.registry.get().service.model_version
     }
 
 
-@router.post("/predict", response_model=PredictionOutput, status_code=status.HTTP_200_OK)
-async def predict_diabetes(patient_data: PatientInput):
+@router.post("/predict", response_model=PredictionOutput, response_model_exclude_none=True,
+             status_code=status.HTTP_200_OK)
+async def predict_diabetes(
+    patient_data: PatientInput,
+    include_risk_factors: bool = Query(default=False, description="Add the matched risk factors to the prediction"),
+    explain: bool = Query(default=False, description="Add per-feature contributions to the prediction"),
+    model: ModelEntry = Depends(select_model),
+):
     """
     Predict diabetes risk for a patient based on health metrics
     
@@ -41,17 +194,141 @@ async def predict_diabetes(patient_data: PatientInput):
     - **diabetes_pedigree_function**: Diabetes Pedigree Function (0-2.5)
     - **age**: Age in years (1-100)
     
-    Returns prediction with probabilities and risk level.
+    Returns prediction with probabilities and risk level. Select a model version
+    with `?model_version=` or the `X-Model-Version` header, and the reduced
+    fast-tier model with `?tier=fast` or `X-Model-Tier: fast`; add
+    `?include_risk_factors=true` to list the risk factors found in the inputs
+    and `?explain=true` for the percentage points each feature contributed.
+    With an `X-Request-Timeout-Ms` header the request is dropped (504) rather
+    than scored once that budget is spent.
     """
-    if prediction_service is None:
+    timing = request_timing()
+    timing.validated()
+    _check_explainable(model, explain)
+    try:
+        check_deadline()
+        # Cache hits skip the batch queue, scaling and inference entirely
+        result = model.service.lookup(patient_data)
+        if result is None:
+            result = await model.batcher.submit(patient_data, current_deadline())
+        if include_risk_factors:
+            result = model.service.with_risk_factors([patient_data], [result])[0]
+        if explain:
+            result = model.service.with_explanations([patient_data], [result])[0]
+        _audit("/predict", model, [patient_data], [result], timing)
+        metrics.PREDICTIONS.labels(model.spec.version, model.service.model_version, result.risk_level.value).inc()
+        timing.done()
+        if config.FAST_RESPONSES:
+            return Response(model.service.encode_output(result), media_type="application/json")
+        return result
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except RuntimeError as e:
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Prediction service is not available"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Prediction failed: {str(e)}"
         )
-    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error: {str(e)}"
+        )
+
+
+def _wants_scores(accept: Optional[str], include_risk_factors: bool, explain: bool) -> bool:
+    """Whether to answer with the binary scores format instead of JSON"""
+    if SCORES_MEDIA_TYPE not in (accept or ""):
+        return False
+    if include_risk_factors or explain:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="Risk factors and explanations are only available as JSON"
+        )
+    return True
+
+
+def _check_invalid_rows(invalid_rows: str) -> None:
+    if invalid_rows not in INVALID_ROW_POLICIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"invalid_rows must be one of: {', '.join(INVALID_ROW_POLICIES)}"
+        )
+
+
+def _score_batch(model: ModelEntry, matrix, timing: RequestTiming, include_risk_factors: bool, explain: bool,
+                 invalid_rows: str, wants_scores: bool, fast_response: bool, deadline: Optional[float]) -> Response:
+    """Validate, score, count, audit and encode a batch (runs in the threadpool)"""
+    import numpy as np
+    from ..services import columnar
+    from ..services.prediction_service import RISK_LEVELS
+    from ..services.validation import validate_matrix
+
+    checked = validate_matrix(matrix)
+    skipped = None
+    if checked.invalid_rows:
+        if invalid_rows == "reject":
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail={
+                    "message": f"{checked.invalid_rows} of {len(matrix)} rows failed validation; "
+                               f"send ?invalid_rows=skip to score the others",
+                    **checked.report(),
+                },
+            )
+        skipped = checked
+        matrix = matrix[checked.valid]
+    timing.validated()
+    service = model.service
+    check_deadline(deadline)
+    if wants_scores:
+        scores = service.score_matrix(matrix)
+        _audit("/predict/batch", model, matrix, scores, timing)
+        counts = np.bincount(scores.risk_codes, minlength=len(RISK_LEVELS))
+        _count_predictions(model, {level.value: count for level, count in zip(RISK_LEVELS, counts.tolist())})
+        timing.done()
+        if skipped is None:
+            return Response(columnar.encode_scores(scores), media_type=SCORES_MEDIA_TYPE)
+        return Response(columnar.encode_scores(scores, skipped.valid), media_type=SCORES_MEDIA_TYPE,
+                        headers={"X-Skipped-Rows": str(skipped.invalid_rows)})
+    predictions = service.predict_batch(matrix)
+    if include_risk_factors and predictions:
+        predictions = service.with_risk_factors(matrix, predictions)
+    if explain and predictions:
+        predictions = service.with_explanations(matrix, predictions)
+    _audit("/predict/batch", model, matrix, predictions, timing)
+    _count_predictions(model, Counter(prediction.risk_level.value for prediction in predictions))
+    timing.done()
+    extra = {}
+    if skipped is not None:
+        extra = {"skipped_rows": np.flatnonzero(~skipped.valid).tolist(), "errors": skipped.report()["errors"]}
+    if fast_response:
+        body = service.encode_batch(predictions, extra)
+    else:
+        output = BatchPredictionOutput(count=len(predictions), predictions=predictions, **extra)
+        body = output.model_dump_json(exclude_none=True)
+    return Response(body, media_type="application/json")
+
+
+async def _predict_batch_matrix(model: ModelEntry, matrix, timing: RequestTiming, include_risk_factors: bool,
+                                explain: bool, invalid_rows: str, wants_scores: bool,
+                                fast_response: bool = True) -> Response:
+    """Validate and score a batch given as an N x 8 feature matrix
+
+    All rows are checked against the PatientInput bounds at once. Invalid
+    rows fail the batch with 422, or with invalid_rows=skip are left out and
+    reported next to the predictions for the others. Everything from
+    validation to the encoded body runs in one threadpool call, so large
+    batches do not hold up the event loop.
+    """
     try:
-        result = prediction_service.predict(patient_data)
-        return result
+        return await run_in_threadpool(_score_batch, model, matrix, timing, include_risk_factors, explain,
+                                       invalid_rows, wants_scores, fast_response, current_deadline())
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -64,11 +341,360 @@ async def predict_diabetes(patient_data: PatientInput):
         )
 
 
+async def predict_diabetes_batch_matrix(request: Request) -> Response:
+    """/predict/batch for `application/vnd.diabetes.matrix` bodies
+
+    The body is viewed as the feature matrix without per-row parsing or
+    PatientInput objects, and scored in one pass.
+    """
+    from ..services import columnar
+
+    timing = request_timing()
+    params, headers = request.query_params, request.headers
+    model = select_model(params.get("model_version"), headers.get("x-model-version"),
+                         params.get("tier"), headers.get("x-model-tier"))
+    flags = {name: params.get(name, "").lower() in ("1", "true", "yes", "on")
+             for name in ("include_risk_factors", "explain")}
+    invalid_rows = params.get("invalid_rows", "reject")
+    _check_explainable(model, flags["explain"])
+    _check_invalid_rows(invalid_rows)
+    wants_scores = _wants_scores(headers.get("accept"), **flags)
+    try:
+        matrix = columnar.decode_matrix(await request.body())
+    except columnar.ColumnarFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not len(matrix):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Matrix has no rows")
+    return await _predict_batch_matrix(model, matrix, timing, invalid_rows=invalid_rows,
+                                       wants_scores=wants_scores, **flags)
+
+
+# The JSON body is parsed by the endpoint itself (see validation.parse_batch),
+# so document it explicitly; PatientInput is registered through /predict
+_BATCH_INPUT_SCHEMA = BatchPredictionInput.model_json_schema(ref_template="#/components/schemas/{model}")
+_BATCH_INPUT_SCHEMA.pop("$defs", None)
+
+
+@router.post("/predict/batch", response_model=BatchPredictionOutput, response_model_exclude_none=True,
+             status_code=status.HTTP_200_OK, openapi_extra={
+                 "requestBody": {"required": True, "content": {
+                     "application/json": {"schema": _BATCH_INPUT_SCHEMA},
+                     MATRIX_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+                 }},
+                 "responses": {"200": {"content": {SCORES_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}}}},
+             })
+@accepts(MATRIX_MEDIA_TYPE, predict_diabetes_batch_matrix)
+async def predict_diabetes_batch(
+    request: Request,
+    include_risk_factors: bool = Query(default=False, description="Add the matched risk factors to each prediction"),
+    explain: bool = Query(default=False, description="Add per-feature contributions to each prediction"),
+    invalid_rows: str = Query(default="reject", description="reject: fail the batch with 422 if any row is invalid; "
+                                                            "skip: score only the valid rows"),
+    accept: Optional[str] = Header(default=None, description=f"{SCORES_MEDIA_TYPE} for binary column-wise results"),
+    model: ModelEntry = Depends(select_model),
+):
+    """
+    Predict diabetes risk for many patients in one request
+    
+    All patients are scaled and scored together in a single vectorized pass.
+    Predictions are returned in the same order as `patients`. With
+    `?include_risk_factors=true` the risk factor rules, and with `?explain=true`
+    the per-feature contributions, are computed for the whole batch at once.
+
+    Field values are checked against the PatientInput bounds for the whole
+    batch at once. By default any invalid row fails the request with 422,
+    listing the failing row indices per field; with `?invalid_rows=skip` the
+    valid rows are scored and the others reported in `skipped_rows` and
+    `errors`.
+
+    High-volume clients can send the features as a binary matrix
+    (`Content-Type: application/vnd.diabetes.matrix`) and/or ask for binary
+    column-wise results (`Accept: application/vnd.diabetes.scores`); the
+    format is described in `server/services/columnar.py`.
+    """
+    from ..services.validation import parse_batch
+
+    timing = request_timing()
+    _check_explainable(model, explain)
+    _check_invalid_rows(invalid_rows)
+    wants_scores = _wants_scores(accept, include_risk_factors, explain)
+    try:
+        matrix = await run_in_threadpool(parse_batch, await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)])
+    return await _predict_batch_matrix(model, matrix, timing, include_risk_factors, explain, invalid_rows,
+                                       wants_scores, fast_response=config.FAST_RESPONSES)
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse for generators that are still reading the request body
+
+    The base class may listen for client disconnects by consuming `receive()`
+    concurrently, which would swallow the upload. Here the generator owns the
+    receive channel; a disconnect surfaces through `request.stream()`.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/predict/stream")
+async def predict_diabetes_stream(
+    request: Request,
+    input_format: Optional[str] = Query(default=None, description="csv or ndjson; defaults from Content-Type"),
+    output_format: str = Query(default="ndjson", description="ndjson or csv"),
+    chunk_size: int = Query(default=10000, ge=1, le=100000, description="Rows scored per vectorized pass"),
+    invalid_rows: str = Query(default="skip", description="skip: leave invalid rows out and report them in a "
+                                                          "trailer; reject: end the stream with an error at the "
+                                                          "first invalid row"),
+    model: ModelEntry = Depends(select_model),
+):
+    """
+    Score a CSV or NDJSON upload of any size, streaming results back as they are ready
+    
+    The body is read as a stream and parsed in fixed-size chunks; each chunk is
+    scored with one vectorized pass, so memory stays flat regardless of file size.
+    CSV headers may use the training names (e.g. `BloodPressure`) or the API names.
+    Each output row carries its 0-based input `row` index.
+
+    Rows are checked against the PatientInput bounds as in /predict/batch. By
+    default invalid rows are left out of the results and reported per field in
+    a trailer line at the end; with `?invalid_rows=reject` a chunk with an
+    invalid row ends the stream with an error trailer instead.
+    """
+    import numpy as np
+    from ..services import bulk
+    from ..services.prediction_service import RISK_LEVELS
+    
+    input_format = input_format or bulk.detect_input_format(request.headers.get("content-type"))
+    if input_format not in bulk.INPUT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or set input_format"
+        )
+    if output_format not in bulk.OUTPUT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"output_format must be one of: {', '.join(bulk.OUTPUT_FORMATS)}"
+        )
+    _check_invalid_rows(invalid_rows)
+    chunker = bulk.RowChunker(input_format, chunk_size)
+    validator = bulk.RowValidator(invalid_rows)
+    service = model.service
+    deadline = current_deadline()
+    
+    def score_chunk(matrix, first_row: int) -> bytes:
+        check_deadline(deadline)
+        matrix, rows = validator.check(matrix, first_row)
+        if not len(matrix):
+            return b""
+        started = time.perf_counter()
+        scores = service.score_matrix(matrix)
+        _audit("/predict/stream", model, matrix, scores, latency=time.perf_counter() - started, block=True)
+        counts = np.bincount(scores.risk_codes, minlength=len(RISK_LEVELS))
+        _count_predictions(model, {level.value: count for level, count in zip(RISK_LEVELS, counts.tolist())})
+        return bulk.format_chunk(scores, first_row, output_format, rows)
+    
+    async def results():
+        if output_format == "csv":
+            yield bulk.csv_header()
+        first_row = 0
+        try:
+            async for data in request.stream():
+                for matrix in await run_in_threadpool(list, chunker.feed(data)):
+                    yield await run_in_threadpool(score_chunk, matrix, first_row)
+                    first_row += len(matrix)
+            for matrix in chunker.close():
+                yield await run_in_threadpool(score_chunk, matrix, first_row)
+                first_row += len(matrix)
+            if validator.skipped:
+                yield bulk.format_skipped(validator.report(), output_format)
+        except bulk.InvalidRowsError as e:
+            yield bulk.format_error(str(e), output_format, e.report)
+        except (bulk.BulkInputError, DeadlineExceeded) as e:
+            yield bulk.format_error(str(e), output_format)
+    
+    media_type = "text/csv" if output_format == "csv" else "application/x-ndjson"
+    return UploadStreamingResponse(results(), media_type=media_type)
+
+
+@router.post("/predict/cohort", response_model=dict)
+async def predict_diabetes_cohort(
+    request: Request,
+    input_format: Optional[str] = Query(default=None, description="csv or ndjson; defaults from Content-Type"),
+    chunk_size: int = Query(default=10000, ge=1, le=100000, description="Rows scored per vectorized pass"),
+    bins: int = Query(default=20, ge=1, le=100, description="Probability histogram bins over 0-100%"),
+    age_bands: str = Query(default="30,40,50,60,70", description="Comma-separated lower bounds of the age bands after the first"),
+    invalid_rows: str = Query(default="skip", description="skip: aggregate only the valid rows; "
+                                                          "reject: fail with 422 if any row is invalid"),
+    model: ModelEntry = Depends(select_model),
+):
+    """
+    Risk-stratify a CSV or NDJSON cohort upload, returning aggregates only
+
+    The upload is parsed and scored in chunks like /predict/stream, but no
+    per-row results are kept: each chunk is folded into counts per risk level,
+    mean probabilities, fixed-bin probability histograms and a breakdown by
+    age band. Memory and response size do not depend on the cohort size.
+
+    Rows are checked against the PatientInput bounds as in /predict/batch.
+    By default invalid rows are left out and counted in `invalid_rows` and
+    `errors`; with `?invalid_rows=reject` they fail the request with 422.
+    """
+    import numpy as np
+    from ..services import bulk
+    from ..services.cohort import CohortAggregator, parse_age_bands
+    from ..services.prediction_service import RISK_LEVELS
+
+    input_format = input_format or bulk.detect_input_format(request.headers.get("content-type"))
+    if input_format not in bulk.INPUT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or set input_format"
+        )
+    try:
+        aggregator = CohortAggregator(bins, parse_age_bands(age_bands))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    _check_invalid_rows(invalid_rows)
+    chunker = bulk.RowChunker(input_format, chunk_size)
+    validator = bulk.RowValidator(invalid_rows)
+    service = model.service
+    deadline = current_deadline()
+
+    def score_chunk(matrix, first_row: int) -> None:
+        check_deadline(deadline)
+        matrix, _ = validator.check(matrix, first_row)
+        if not len(matrix):
+            return
+        started = time.perf_counter()
+        scores = service.score_matrix(matrix)
+        _audit("/predict/cohort", model, matrix, scores, latency=time.perf_counter() - started, block=True)
+        aggregator.add(matrix, scores)
+        counts = np.bincount(scores.risk_codes, minlength=len(RISK_LEVELS))
+        _count_predictions(model, {level.value: count for level, count in zip(RISK_LEVELS, counts.tolist())})
+
+    first_row = 0
+    try:
+        async for data in request.stream():
+            for matrix in await run_in_threadpool(list, chunker.feed(data)):
+                await run_in_threadpool(score_chunk, matrix, first_row)
+                first_row += len(matrix)
+        for matrix in chunker.close():
+            await run_in_threadpool(score_chunk, matrix, first_row)
+            first_row += len(matrix)
+    except bulk.InvalidRowsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail={"message": f"{e}; omit invalid_rows=reject to aggregate the others", **e.report},
+        )
+    except bulk.BulkInputError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+
+    summary = {"model_version": model.spec.version, **aggregator.summary()}
+    if validator.skipped:
+        report = validator.report()
+        summary.update(invalid_rows=report["invalid_rows"], errors=report["errors"])
+    return summary
+
+
+@router.get("/stats", response_model=dict)
+async def get_stats():
+    """Runtime statistics: micro-batching, prediction cache and worker processes"""
+    return {
+        "batchers": {
+            version: entry.batcher.stats() for version, entry in serving.registry.entries().items()
+        },
+        "cache": serving.cache.stats() if serving.cache is not None else None,
+        "inference_workers": serving.pool.pids if serving.pool is not None else [],
+        "audit": serving.audit.stats() if serving.audit is not None else None,
+        "admission": admission.stats() if config.ADMISSION_MAX_CONCURRENT > 0 else None,
+    }
+
+
+def _drift_monitor(model: ModelEntry):
+    if model.service.drift is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Drift monitoring is disabled"
+        )
+    return model.service.drift
+
+
+@router.get("/drift", response_model=dict)
+async def get_drift(model: ModelEntry = Depends(select_model)):
+    """
+    Compare live inputs and predicted probabilities with the training data
+
+    Every scored row (including cache hits) is binned on the decile edges of
+    the training CSV; predicted probabilities use fixed 10% bins against the
+    model's own scores on that CSV. Reports PSI and a binned KS statistic per
+    feature and for the probability, with an overall status of `stable`,
+    `moderate` (PSI >= 0.1), `significant` (PSI >= 0.25) or `insufficient_data`.
+    """
+    monitor = _drift_monitor(model)
+    report = await run_in_threadpool(monitor.report, config.DRIFT_MIN_ROWS)
+    return {"version": model.spec.version, "model_version": model.service.model_version, **report}
+
+
+@router.post("/drift/reset", response_model=dict)
+async def reset_drift(model: ModelEntry = Depends(select_model)):
+    """Clear the live histograms to start a new observation window"""
+    _drift_monitor(model).reset()
+    return {"version": model.spec.version, "status": "reset"}
+
+
+@router.get("/models", response_model=dict)
+async def list_models():
+    """List loaded model versions and the default version"""
+    _require_ready()
+    return serving.registry.describe()
+
+
+@router.post("/models/{version}/reload", response_model=dict, dependencies=[Depends(require_admin)])
+async def reload_model(version: str, request: Optional[ModelReloadRequest] = None):
+    """
+    Load a new artifact for a model version and hot-swap it without downtime
+    
+    Loading and warm-up run off the event loop; in-flight requests finish on the
+    previous model. Unknown versions are added when a model_path is given (an exported
+    pipeline needs no scaler_path). Paths must be configured in MODEL_VERSIONS or lie
+    inside server/aiModels. Requires `Authorization: Bearer <DIABETES_ADMIN_TOKEN>`;
+    without a configured token the endpoint is disabled.
+
+    With inference workers enabled (`DIABETES_INFERENCE_WORKERS` > 0) only
+    memory-mapped artifacts from `python -m server.cli export` can be
+    reloaded, since the running workers map them without re-forking; other
+    models are refused with 409.
+    """
+    _require_ready()
+    request = request or ModelReloadRequest()
+    try:
+        entry = await serving.reload(version, request.model_path, request.scaler_path)
+    except ModelPathError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ModelReloadConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Reload failed: {str(e)}"
+        )
+    return entry.describe()
+
+
 @router.get("/info", response_model=dict)
-async def get_model_info():
+async def get_model_info(model: ModelEntry = Depends(select_model)):
     """Get information about the model and expected input ranges"""
     return {
-        "model": "Random Forest Classifier (v2)",
+        "model": f"{type(model.service.model).__name__} ({model.spec.version})",
+        "model_version": model.service.model_version,
         "features": [
             {"name": "pregnancies", "min": 0, "max": 20, "unit": "count"},
             {"name": "glucose", "min": 0, "max": 200, "unit": "mg/dL"},
@@ -0,0 +1,89 @@
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+from ..services import metrics
+
+
+class RequestTiming:
+    """Stage boundaries of one request, filled in by the route and its endpoint"""
+
+    __slots__ = ("started", "handled")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.handled: Optional[float] = None
+
+    def validated(self) -> None:
+        """Call first thing in the endpoint: body parsing, validation and dependencies are done"""
+        metrics.VALIDATION.observe(time.perf_counter() - self.started)
+
+    def done(self) -> None:
+        """Call just before returning: what follows is response validation and serialization"""
+        self.handled = time.perf_counter()
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def request_timing() -> RequestTiming:
+    """Timing for the request being handled (a detached one outside TimedRoute)"""
+    return _current.get() or RequestTiming()
+
+
+def accepts(media_type: str, handler: Callable[[Request], Awaitable[Response]]):
+    """Serve request bodies of `media_type` with `handler(request)` instead of the endpoint
+
+    Apply below the route decorator; TimedRoute dispatches on Content-Type,
+    so the endpoint's own (JSON) body parsing and validation are skipped.
+    """
+    def decorate(endpoint):
+        endpoint.__dict__.setdefault("alternate_bodies", {})[media_type] = handler
+        return endpoint
+    return decorate
+
+
+def _media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that records request latency, error counts and the serialization stage"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        alternates = getattr(self.endpoint, "alternate_bodies", {})
+        duration = metrics.REQUEST_DURATION.labels(self.path_format)
+        route = self.path_format
+
+        async def timed_handler(request: Request) -> Response:
+            timing = RequestTiming()
+            token = _current.set(timing)
+            status_code = 500
+            try:
+                target = handler
+                if alternates:
+                    target = alternates.get(_media_type(request.headers.get("content-type")), handler)
+                response = await target(request)
+                status_code = response.status_code
+                return response
+            except HTTPException as e:
+                status_code = e.status_code
+                raise
+            except RequestValidationError:
+                status_code = 422
+                raise
+            finally:
+                _current.reset(token)
+                finished = time.perf_counter()
+                duration.observe(finished - timing.started)
+                if timing.handled is not None:
+                    metrics.SERIALIZATION.observe(finished - timing.handled)
+                if status_code >= 400:
+                    metrics.ERRORS.labels(route, status_code).inc()
+
+        return timed_handler
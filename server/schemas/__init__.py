@@ -1,3 +1,23 @@
-from .diabetes import PatientInput, PredictionOutput, RiskLevel
+from .diabetes import (
+    BatchPredictionInput,
+    BatchPredictionOutput,
+    Explanation,
+    ModelReloadRequest,
+    PatientInput,
+    PredictionOutput,
+    RiskFactor,
+    RiskFactorKind,
+    RiskLevel,
+)
 
-__all__ = ["PatientInput", "PredictionOutput", "RiskLevel"]
+__all__ = [
+    "BatchPredictionInput",
+    "BatchPredictionOutput",
+    "Explanation",
+    "ModelReloadRequest",
+    "PatientInput",
+    "PredictionOutput",
+    "RiskFactor",
+    "RiskFactorKind",
+    "RiskLevel",
+]
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from enum import Enum
 
 
@@ -33,6 +34,25 @@ class PatientInput(BaseModel):
         }
 
 
+class RiskFactorKind(str, Enum):
+    RISK = "RISK"
+    POSITIVE = "POSITIVE"
+
+
+class RiskFactor(BaseModel):
+    code: str = Field(description="Stable identifier of the rule, e.g. high_glucose")
+    kind: RiskFactorKind = Field(description="RISK for a risk factor, POSITIVE for a healthy indicator")
+    description: str = Field(description="Human-readable explanation")
+
+
+class Explanation(BaseModel):
+    base_probability: float = Field(description="Average probability of having diabetes before looking at any feature (%)")
+    contributions: Dict[str, float] = Field(
+        description="Percentage points each feature adds to probability_positive; "
+                    "base_probability plus all contributions equals probability_positive"
+    )
+
+
 class PredictionOutput(BaseModel):
     prediction: int = Field(description="0 = Non-Diabetic, 1 = Diabetic")
     is_diabetic: bool = Field(description="Whether the patient is predicted to be diabetic")
@@ -40,6 +60,14 @@ class PredictionOutput(BaseModel):
     probability_positive: float = Field(description="Probability of having diabetes (%)")
     risk_level: RiskLevel = Field(description="Risk level: LOW, MODERATE, or HIGH")
     message: str = Field(description="Human-readable prediction message")
+    risk_factors: Optional[List[RiskFactor]] = Field(
+        default=None,
+        description="Risk factors and healthy indicators found in the inputs (only with include_risk_factors=true)"
+    )
+    explanation: Optional[Explanation] = Field(
+        default=None,
+        description="Per-feature contributions to the prediction (only with explain=true; the server needs DIABETES_EXPLANATIONS=1)"
+    )
 
     class Config:
         json_schema_extra = {
@@ -52,3 +80,29 @@ class PredictionOutput(BaseModel):
                 "message": "Low risk - Patient is not predicted to be diabetic"
             }
         }
+
+
+class BatchPredictionInput(BaseModel):
+    patients: List[PatientInput] = Field(min_length=1, description="Patients to score, in order")
+
+
+class FieldErrors(BaseModel):
+    constraint: str = Field(description="Schema constraint the values failed, e.g. 0 <= glucose <= 200")
+    count: int = Field(description="Number of rows failing it")
+    rows: List[int] = Field(description="0-based input row indices (the first 1000)")
+
+
+class BatchPredictionOutput(BaseModel):
+    count: int = Field(description="Number of predictions returned")
+    predictions: List[PredictionOutput] = Field(description="Predictions in the same order as the input patients")
+    skipped_rows: Optional[List[int]] = Field(
+        default=None,
+        description="Input rows left out because they failed validation (invalid_rows=skip); "
+                    "predictions follow the remaining rows in order"
+    )
+    errors: Optional[Dict[str, FieldErrors]] = Field(default=None, description="Validation failures of the skipped rows per field")
+
+
+class ModelReloadRequest(BaseModel):
+    model_path: Optional[str] = Field(default=None, description="Model artifact path relative to server/, inside aiModels/; defaults to the current one")
+    scaler_path: Optional[str] = Field(default=None, description="Scaler artifact path relative to server/, inside aiModels/; defaults to the current one")
@@ -1,3 +1,17 @@
-from .prediction_service import PredictionService
+import importlib
 
-__all__ = ["PredictionService"]
+# Submodules are imported on first attribute access, so importing the routes
+# does not pull in NumPy/joblib/sklearn before the application lifespan runs
+_EXPORTS = {
+    "MicroBatcher": ".batcher",
+    "PredictionService": ".prediction_service",
+    "ServingState": ".serving",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+
+from . import metrics
+
+# Client time budget for the whole request, in milliseconds from arrival
+DEADLINE_HEADER = b"x-request-timeout-ms"
+
+ADMITTED = metrics.ADMISSIONS.labels("admitted")
+QUEUE_FULL = metrics.ADMISSIONS.labels("queue_full")
+QUEUE_TIMEOUT = metrics.ADMISSIONS.labels("queue_timeout")
+EXPIRED = metrics.ADMISSIONS.labels("expired")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The client's deadline passed before the work started"""
+
+
+class AdmissionRejected(Exception):
+    """Raised by `AdmissionController.acquire` when a request is shed"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def current_deadline() -> Optional[float]:
+    """`time.monotonic()` deadline of the request being handled, if the client sent one"""
+    return _deadline.get()
+
+
+def check_deadline(deadline: Optional[float] = None) -> None:
+    """Raise DeadlineExceeded if the (current request's) deadline has passed"""
+    deadline = deadline if deadline is not None else _deadline.get()
+    if deadline is not None and time.monotonic() >= deadline:
+        EXPIRED.inc()
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+class AdmissionController:
+    """Bounds in-flight prediction requests and the queue waiting for a slot.
+
+    Up to `max_concurrent` requests run at once; the next `max_queue` wait
+    (first come, first served) for at most `queue_timeout` seconds or until
+    their own deadline. Anything beyond that is rejected immediately with
+    429, and a request that waited too long with 503, both carrying
+    Retry-After, so the server never accumulates work that clients have
+    already given up on.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int = 0, queue_timeout: float = 1.0,
+                 retry_after: int = 1):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self._waiters = deque()
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    async def acquire(self, deadline: Optional[float] = None) -> None:
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self._admit()
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            QUEUE_FULL.inc()
+            raise AdmissionRejected(429, "Too many prediction requests in flight", self.retry_after)
+
+        timeout = self.queue_timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # `release` hands its slot over by resolving the waiter
+            await asyncio.wait_for(waiter, max(timeout, 0))
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            if deadline is not None and time.monotonic() >= deadline:
+                EXPIRED.inc()
+                raise AdmissionRejected(504, "Request deadline exceeded while queued")
+            self.rejected_timeout += 1
+            QUEUE_TIMEOUT.inc()
+            raise AdmissionRejected(503, "Prediction service is overloaded", self.retry_after)
+        except BaseException:
+            # e.g. the client disconnected; give back a slot that was already handed over
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._forget(waiter)
+            raise
+        self._admit()
+
+    def _admit(self) -> None:
+        self.admitted += 1
+        ADMITTED.inc()
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+class DeadlineMiddleware:
+    """ASGI middleware reading the `X-Request-Timeout-Ms` header on paths under `path_prefix`
+
+    The request's deadline is then available to AdmissionMiddleware and the
+    endpoint through `current_deadline()` / `check_deadline()`. Installed
+    whether or not admission control is enabled.
+    """
+
+    def __init__(self, app, path_prefix: str):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        deadline = None
+        for name, value in scope["headers"]:
+            if name == DEADLINE_HEADER:
+                try:
+                    deadline = time.monotonic() + float(value) / 1000
+                except ValueError:
+                    await _reject(send, 400, "X-Request-Timeout-Ms must be a number of milliseconds")
+                    return
+                break
+        try:
+            check_deadline(deadline)
+        except DeadlineExceeded as e:
+            await _reject(send, 504, str(e))
+            return
+
+        token = _deadline.set(deadline)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to paths under `path_prefix`
+
+    Runs before the body is read or validated, so shed requests cost almost
+    nothing. Other routes (health checks, metrics, model info) bypass it and
+    are never queued behind prediction traffic. Queued requests give up at
+    their deadline; install it inside DeadlineMiddleware.
+    """
+
+    def __init__(self, app, controller: AdmissionController, path_prefix: str):
+        self.app = app
+        self.controller = controller
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(current_deadline())
+        except AdmissionRejected as e:
+            await _reject(send, e.status_code, e.detail, e.retry_after)
+            return
+
+        try:
+            # Returns only once the response (streaming ones included) is fully sent
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: Optional[int] = None) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(retry_after).encode()))
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .explain import PathExplainer
+from .forest_engine import ArrayForest
+
+FORMAT = "diabetes-forest"
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+SUFFIX = ".forest"
+
+# ArrayForest attributes stored as one .npy file each
+FOREST_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "children", "mean", "scale")
+
+
+class ArtifactError(ValueError):
+    """Raised when an exported artifact is malformed or fails its checksum"""
+
+
+class ZeroImputation:
+    """Zero -> training median replacement, as fitted by ZeroMedianImputer
+
+    Kept free of sklearn so memory-mapped artifacts load without importing it.
+    """
+
+    def __init__(self, columns, medians):
+        self.columns = list(columns)
+        self.medians = np.asarray(medians, dtype=np.float64)
+
+    def transform(self, input_array: np.ndarray) -> np.ndarray:
+        input_array = np.array(input_array, dtype=np.float64)
+        values = input_array[:, self.columns]
+        input_array[:, self.columns] = np.where(values == 0, self.medians, values)
+        return input_array
+
+
+def is_artifact(path: Path) -> bool:
+    return Path(path).is_dir() and (Path(path) / MANIFEST).exists()
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_forest(path: Path, forest: ArrayForest, preprocessor=None,
+                  explainer: Optional[PathExplainer] = None, source: Optional[dict] = None) -> dict:
+    """Write `forest` (plus zero imputation and path contributions) as a flat array directory
+
+    Every array is a plain .npy file listed in manifest.json with its dtype,
+    shape, size and SHA-256, so loading needs no pickle and can memory-map each file.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    arrays: Dict[str, np.ndarray] = {
+        name: getattr(forest, "_children" if name == "children" else name) for name in FOREST_ARRAYS
+    }
+    if explainer is not None:
+        arrays["contributions"] = explainer.contributions
+
+    manifest = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "source": source or {},
+        "n_features": forest.n_features,
+        "max_depth": forest.max_depth,
+        "classes": forest.classes.tolist(),
+        "preprocessing": None,
+        "arrays": {},
+    }
+    if preprocessor is not None:
+        steps = getattr(preprocessor, "steps", None) or [(None, preprocessor)]
+        if len(steps) != 1 or not hasattr(steps[0][1], "medians_"):
+            raise ArtifactError("Only zero-median imputation can be exported ahead of the scaler")
+        imputer = steps[0][1]
+        manifest["preprocessing"] = {
+            "zero_median": {"columns": list(imputer.columns), "medians": imputer.medians_.tolist()}
+        }
+
+    for name, array in arrays.items():
+        if array is None:
+            continue
+        file_path = path / f"{name}.npy"
+        np.save(file_path, np.ascontiguousarray(array), allow_pickle=False)
+        manifest["arrays"][name] = {
+            "file": file_path.name,
+            "dtype": str(array.dtype),
+            "shape": list(array.shape),
+            "bytes": file_path.stat().st_size,
+            "sha256": _sha256(file_path),
+        }
+    (path / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def load_forest(path: Path, verify: bool = False,
+                mmap_mode: Optional[str] = "r") -> Tuple[ArrayForest, Optional[ZeroImputation],
+                                                         Optional[PathExplainer], dict]:
+    """Memory-map an exported artifact: (forest, preprocessor, explainer, manifest)
+
+    Arrays are opened read-only with `mmap_mode`, so loading does no parsing
+    and every process that maps the same files shares their pages. Only file
+    sizes are checked against the manifest, which catches truncated copies
+    without reading any data; verify=True (export, `cli verify`) also hashes
+    every file against its recorded SHA-256.
+    """
+    path = Path(path)
+    try:
+        manifest = json.loads((path / MANIFEST).read_text())
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Cannot read {path / MANIFEST}: {e}")
+    if manifest.get("format") != FORMAT or manifest.get("format_version") != FORMAT_VERSION:
+        raise ArtifactError(
+            f"Unsupported artifact format {manifest.get('format')!r} v{manifest.get('format_version')}"
+        )
+
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        file_path = path / entry["file"]
+        try:
+            size = file_path.stat().st_size
+        except OSError as e:
+            raise ArtifactError(f"Cannot read {file_path}: {e}")
+        if "bytes" in entry and size != entry["bytes"]:
+            raise ArtifactError(f"{file_path} is {size} bytes, the manifest records {entry['bytes']}")
+        if verify and _sha256(file_path) != entry["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {file_path}")
+        array = np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+        if str(array.dtype) != entry["dtype"] or list(array.shape) != entry["shape"]:
+            raise ArtifactError(f"{file_path} does not match the manifest")
+        arrays[name] = array
+
+    forest = ArrayForest(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        left=arrays["left"],
+        right=arrays["right"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        max_depth=manifest["max_depth"],
+        classes=np.asarray(manifest["classes"]),
+        mean=arrays.get("mean"),
+        scale=arrays.get("scale"),
+        n_features=manifest["n_features"],
+        children=arrays.get("children"),
+    )
+    preprocessing = manifest.get("preprocessing") or {}
+    preprocessor = ZeroImputation(**preprocessing["zero_median"]) if "zero_median" in preprocessing else None
+    explainer = None
+    if "contributions" in arrays:
+        explainer = PathExplainer(forest, contributions=arrays["contributions"])
+    return forest, preprocessor, explainer, manifest
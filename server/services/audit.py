@@ -0,0 +1,240 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from operator import attrgetter
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from . import metrics
+from .prediction_service import FEATURE_NAMES, RISK_LEVELS, Scores
+
+logger = logging.getLogger(__name__)
+
+FULL_POLICIES = ("drop", "reject")
+
+_COLUMNS = (
+    "recorded_at", "route", "version", "model_version", "latency_ms",
+    *FEATURE_NAMES, "prediction", "probability_positive", "risk_level",
+)
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    route TEXT NOT NULL,
+    version TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    latency_ms REAL,
+    {", ".join(f"{name} REAL NOT NULL" for name in FEATURE_NAMES)},
+    prediction INTEGER NOT NULL,
+    probability_positive REAL NOT NULL,
+    risk_level TEXT NOT NULL
+)
+"""
+_INSERT = f"INSERT INTO predictions ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+_get_features = attrgetter(*FEATURE_NAMES)
+_get_outputs = attrgetter("prediction", "probability_positive", "risk_level")
+
+WRITTEN = metrics.AUDIT_RECORDS.labels("written")
+DROPPED = metrics.AUDIT_RECORDS.labels("dropped")
+REJECTED = metrics.AUDIT_RECORDS.labels("rejected")
+FAILED = metrics.AUDIT_RECORDS.labels("failed")
+
+
+class AuditQueueFull(RuntimeError):
+    """Raised by `AuditLog.record` under the reject policy when the queue is full"""
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Open (and create) an audit database in WAL mode, so readers never block the writer"""
+    connection = sqlite3.connect(str(path), check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute(_SCHEMA)
+    connection.commit()
+    return connection
+
+
+def _rows(item: tuple) -> list:
+    """Expand one queued request into database rows"""
+    recorded_at, route, version, model_version, latency_ms, inputs, outputs = item
+    if isinstance(inputs, np.ndarray):
+        features = inputs.tolist()
+    else:
+        features = [_get_features(patient) for patient in inputs]
+    if isinstance(outputs, Scores):
+        levels = [RISK_LEVELS[code].value for code in outputs.risk_codes.tolist()]
+        results = zip(outputs.predictions.tolist(), outputs.probability_positive.tolist(), levels)
+    else:
+        results = ((prediction, probability, level.value)
+                   for prediction, probability, level in map(_get_outputs, outputs))
+    prefix = (recorded_at, route, version, model_version, latency_ms)
+    return [(*prefix, *row, *result) for row, result in zip(features, results)]
+
+
+class AuditLog:
+    """Append-only prediction log written in batches by a background thread.
+
+    `record` only appends the request's inputs and outputs (as they are, no
+    conversion) to an in-memory queue; the writer thread turns them into rows
+    and inserts them with one transaction per batch, so request latency never
+    includes disk I/O. At most `max_queue_rows` rows wait in memory. When the
+    queue is full the `drop` policy discards the record and the `reject`
+    policy raises `AuditQueueFull` (or, with block=True, waits for room);
+    every outcome is counted in `diabetes_audit_records_total`.
+    """
+
+    def __init__(self, path: Path, max_queue_rows: int = 100000, batch_rows: int = 5000,
+                 flush_interval: float = 0.5, full_policy: str = "drop"):
+        if full_policy not in FULL_POLICIES:
+            raise ValueError(f"full_policy must be one of: {', '.join(FULL_POLICIES)}")
+        self.path = Path(path)
+        self.max_queue_rows = max_queue_rows
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.full_policy = full_policy
+        self._queue = deque()
+        self._queued_rows = 0
+        self._condition = threading.Condition()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.batches = 0
+
+    def start(self) -> "AuditLog":
+        # Create the database up front so a bad path fails startup, not the first flush
+        connect(self.path).close()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def record(self, route: str, version: str, model_version: str, latency: Optional[float],
+               inputs: Union[np.ndarray, Sequence], outputs: Union[Scores, Sequence],
+               block: bool = False) -> bool:
+        """Queue one request's rows; returns False if they were dropped
+
+        `inputs` is an N x 8 matrix or PatientInput objects, `outputs` the
+        matching `Scores` or PredictionOutput objects. `latency` is in seconds.
+        """
+        n_rows = len(inputs)
+        item = (time.time(), route, version, model_version,
+                latency * 1000 if latency is not None else None, inputs, outputs)
+        with self._condition:
+            if self._queued_rows + n_rows > self.max_queue_rows:
+                if self.full_policy == "drop":
+                    self.dropped += n_rows
+                    DROPPED.inc(n_rows)
+                    return False
+                if not block:
+                    self.rejected += n_rows
+                    REJECTED.inc(n_rows)
+                    raise AuditQueueFull("Prediction audit log is falling behind")
+                # Never wait for more room than the queue can ever have
+                self._condition.wait_for(
+                    lambda: self._queued_rows + n_rows <= max(self.max_queue_rows, n_rows) or self._closing
+                )
+            self._queue.append(item)
+            self._queued_rows += n_rows
+            if self._queued_rows >= self.batch_rows:
+                self._condition.notify_all()
+        return True
+
+    def _run(self) -> None:
+        connection = connect(self.path)
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._queued_rows >= self.batch_rows or self._closing,
+                        timeout=self.flush_interval,
+                    )
+                    items = list(self._queue)
+                    self._queue.clear()
+                    self._queued_rows = 0
+                    closing = self._closing
+                    # Wake producers waiting for room
+                    self._condition.notify_all()
+                if items:
+                    self._write(connection, items)
+                if closing:
+                    return
+        finally:
+            connection.close()
+
+    def _write(self, connection: sqlite3.Connection, items: list) -> None:
+        rows = [row for item in items for row in _rows(item)]
+        try:
+            with connection:
+                connection.executemany(_INSERT, rows)
+        except Exception:
+            FAILED.inc(len(rows))
+            logger.exception("Failed to write %d audit records to %s", len(rows), self.path)
+            return
+        self.written += len(rows)
+        self.batches += 1
+        WRITTEN.inc(len(rows))
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Flush everything queued and stop the writer"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "full_policy": self.full_policy,
+            "queued_rows": self._queued_rows,
+            "max_queue_rows": self.max_queue_rows,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "batches": self.batches,
+        }
+
+
+class AuditChunk(NamedTuple):
+    """A block of logged predictions, column-wise"""
+    ids: np.ndarray
+    recorded_at: np.ndarray
+    model_versions: list
+    features: np.ndarray
+    probability_positive: np.ndarray
+    risk_levels: list
+
+
+def iter_audit(path: Path, chunk_size: int = 50000, since_id: int = 0,
+               version: Optional[str] = None) -> Iterator[AuditChunk]:
+    """Read logged predictions in id order, `chunk_size` rows at a time"""
+    connection = connect(Path(path))
+    columns = ", ".join(("id", "recorded_at", "model_version", *FEATURE_NAMES, "probability_positive", "risk_level"))
+    query = f"SELECT {columns} FROM predictions WHERE id > ?"
+    if version is not None:
+        query += " AND version = ?"
+    query += " ORDER BY id LIMIT ?"
+    try:
+        while True:
+            params = (since_id, version, chunk_size) if version is not None else (since_id, chunk_size)
+            rows = connection.execute(query, params).fetchall()
+            if not rows:
+                return
+            ids, recorded_at, model_versions, *features, probability, levels = zip(*rows)
+            yield AuditChunk(
+                ids=np.array(ids, dtype=np.int64),
+                recorded_at=np.array(recorded_at, dtype=np.float64),
+                model_versions=list(model_versions),
+                features=np.column_stack(features).astype(np.float64),
+                probability_positive=np.array(probability, dtype=np.float64),
+                risk_levels=list(levels),
+            )
+            since_id = ids[-1]
+    finally:
+        connection.close()
@@ -0,0 +1,170 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from .admission import DeadlineExceeded
+
+
+# Upper bounds (inclusive) of the queueing-delay histogram buckets, in microseconds
+DELAY_BUCKETS_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+
+class MicroBatcher:
+    """Collects concurrent requests into batches scored off the event loop.
+
+    Callers `await submit(item)`. A background task takes the first queued
+    item, keeps collecting until `max_batch_size` items are queued or
+    `max_wait_us` has passed, then runs `score_fn(items)` once in an executor
+    and resolves each caller's future with its own result. While a batch is
+    being scored, new requests accumulate and form the next batch. Up to
+    `max_concurrent_batches` batches are scored at the same time, e.g. one per
+    inference worker process. Items whose deadline passed while queued are
+    failed with DeadlineExceeded instead of being scored.
+    """
+
+    def __init__(self, score_fn: Callable[[Sequence[Any]], List[Any]],
+                 max_batch_size: int = 64, max_wait_us: int = 500, executor=None,
+                 max_concurrent_batches: int = 1):
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_us) / 1_000_000
+        self.executor = executor
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatching: Set[asyncio.Task] = set()
+        self._idle = True
+
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.expired = 0
+        self.batch_sizes: Dict[int, int] = {}
+        self.delay_buckets = [0] * (len(DELAY_BUCKETS_US) + 1)
+        self.delay_total = 0.0
+        self.delay_max = 0.0
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, item: Any, deadline: Optional[float] = None) -> Any:
+        """Queue one item and wait for its result
+
+        `deadline` is a `time.monotonic()` value after which the item is dropped.
+        """
+        self._ensure_running()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future, time.perf_counter(), deadline))
+        return await future
+
+    async def _collect(self) -> list:
+        queue = self._queue
+        self._idle = True
+        batch = [await queue.get()]
+        self._idle = False
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            # Wait for a free slot first so the next batch keeps filling meanwhile
+            await self._slots.acquire()
+            batch = await self._collect()
+            batch = [entry for entry in batch if not entry[1].done() and not self._expired(entry)]
+            if not batch:
+                self._slots.release()
+                continue
+            self._record(batch)
+            task = self._loop.create_task(self._dispatch(batch))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    def _expired(self, entry: tuple) -> bool:
+        _, future, _, deadline = entry
+        if deadline is None or time.monotonic() < deadline:
+            return False
+        self.expired += 1
+        future.set_exception(DeadlineExceeded("Request deadline exceeded"))
+        return True
+
+    async def _dispatch(self, batch: list) -> None:
+        items = [item for item, _, _, _ in batch]
+        try:
+            results = await self._loop.run_in_executor(self.executor, self.score_fn, items)
+        except Exception as e:
+            self.errors += 1
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for (_, future, _, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Finish queued and in-flight batches, then stop the background task"""
+        task = self._task
+        if task is None or task.done():
+            return
+        while not (self._idle and self._queue.empty() and not self._dispatching):
+            await asyncio.sleep(max(self.max_wait, 0.001))
+        task.cancel()
+
+    def _record(self, batch: list) -> None:
+        now = time.perf_counter()
+        size = len(batch)
+        self.batches += 1
+        self.items += size
+        self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+        for _, _, enqueued, _ in batch:
+            delay = now - enqueued
+            self.delay_total += delay
+            self.delay_max = max(self.delay_max, delay)
+            delay_us = delay * 1_000_000
+            for index, bound in enumerate(DELAY_BUCKETS_US):
+                if delay_us <= bound:
+                    break
+            else:
+                index = len(DELAY_BUCKETS_US)
+            self.delay_buckets[index] += 1
+
+    def stats(self) -> dict:
+        """Batch-size distribution and queueing-delay summary"""
+        labels = [f"<={bound}" for bound in DELAY_BUCKETS_US] + [f">{DELAY_BUCKETS_US[-1]}"]
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_us": int(self.max_wait * 1_000_000),
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+            "expired": self.expired,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "queue_delay_us": {
+                "mean": self.delay_total / self.items * 1_000_000 if self.items else 0.0,
+                "max": self.delay_max * 1_000_000,
+                "histogram": dict(zip(labels, self.delay_buckets)),
+            },
+        }
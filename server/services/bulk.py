@@ -0,0 +1,278 @@
+import json
+import re
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .prediction_service import FEATURE_NAMES, RISK_LEVELS, Scores
+from .validation import CONSTRAINTS, MAX_REPORTED_ROWS, validate_matrix
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+
+INPUT_FORMATS = ("csv", "ndjson")
+OUTPUT_FORMATS = ("ndjson", "csv")
+INVALID_ROW_POLICIES = ("reject", "skip")
+DEFAULT_CHUNK_SIZE = 10000
+# Longest accepted input line; a feature row is well under 1 KiB
+MAX_LINE_BYTES = 64 * 1024
+
+OUTPUT_COLUMNS = ("row", "prediction", "probability_positive", "risk_level")
+
+
+class BulkInputError(ValueError):
+    """Raised when an uploaded file cannot be parsed into feature rows"""
+
+
+class InvalidRowsError(BulkInputError):
+    """Raised by RowValidator when a chunk has rows outside the PatientInput bounds"""
+
+    # Row indices per field quoted in the message; `report` has the full list
+    MAX_QUOTED_ROWS = 10
+
+    def __init__(self, report: dict, first_row: int):
+        self.report = report
+        fields = []
+        for error in report["errors"].values():
+            rows = ", ".join(str(row) for row in error["rows"][:self.MAX_QUOTED_ROWS])
+            more = ", ..." if error["count"] > self.MAX_QUOTED_ROWS else ""
+            fields.append(f"{error['constraint']} (rows {rows}{more})")
+        last_row = first_row + report["rows"] - 1
+        super().__init__(
+            f"{report['invalid_rows']} invalid rows in rows {first_row}-{last_row}: {'; '.join(fields)}"
+        )
+
+
+def _normalize(name: str) -> str:
+    # "BloodPressure", "blood_pressure" and "blood pressure" all become "bloodpressure"
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+_FEATURE_KEYS = {_normalize(name): index for index, name in enumerate(FEATURE_NAMES)}
+
+
+def feature_columns(names: Sequence[str]) -> List[int]:
+    """Positions of the 8 model features within `names` (CSV header or JSON keys)"""
+    positions = {}
+    for position, name in enumerate(names):
+        index = _FEATURE_KEYS.get(_normalize(name))
+        if index is not None:
+            positions.setdefault(index, position)
+    missing = [FEATURE_NAMES[index] for index in range(len(FEATURE_NAMES)) if index not in positions]
+    if missing:
+        raise BulkInputError(f"Missing feature columns: {', '.join(missing)}")
+    return [positions[index] for index in range(len(FEATURE_NAMES))]
+
+
+class RowChunker:
+    """Incremental CSV / NDJSON parser yielding fixed-size N x 8 feature matrices.
+
+    Bytes are fed as they arrive; complete lines are buffered until
+    `chunk_size` rows are available and then parsed in one vectorized call, so
+    memory stays bounded by one chunk no matter how large the input is. CSV
+    headers may use the training CSV names (`BloodPressure`) or the API names
+    (`blood_pressure`); extra columns such as `Outcome` are ignored. Values
+    are not range-checked here; see RowValidator. Lines longer than
+    MAX_LINE_BYTES raise BulkInputError, so an upload without newlines cannot
+    grow the buffer without bound.
+    """
+
+    def __init__(self, input_format: str = "csv", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if input_format not in INPUT_FORMATS:
+            raise BulkInputError(f"Unsupported input format '{input_format}'. Expected one of: {', '.join(INPUT_FORMATS)}")
+        self.input_format = input_format
+        self.chunk_size = max(1, chunk_size)
+        self.rows_parsed = 0
+        self._partial = b""
+        self._lines: List[bytes] = []
+        self._columns: Optional[List[int]] = None
+        self._keys: Optional[List[str]] = None
+
+    def feed(self, data: bytes) -> Iterator[np.ndarray]:
+        """Consume a block of bytes and yield every complete chunk"""
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        for line in lines:
+            yield from self._add_line(line)
+        self._check_length(self._partial)
+
+    def close(self) -> Iterator[np.ndarray]:
+        """Flush the trailing line and the last (possibly short) chunk"""
+        if self._partial:
+            yield from self._add_line(self._partial)
+            self._partial = b""
+        if self._lines:
+            yield self._parse(self._lines)
+            self._lines = []
+
+    def _check_length(self, line: bytes) -> None:
+        if len(line) > MAX_LINE_BYTES:
+            raise BulkInputError(
+                f"Row {self.rows_parsed + len(self._lines)} is longer than {MAX_LINE_BYTES} bytes; "
+                f"rows must be separated by newlines"
+            )
+
+    def _add_line(self, line: bytes) -> Iterator[np.ndarray]:
+        self._check_length(line)
+        line = line.strip()
+        if not line:
+            return
+        if self.input_format == "csv" and self._columns is None:
+            header = line.decode("utf-8-sig").split(",")
+            self._columns = feature_columns([name.strip().strip('"') for name in header])
+            return
+        self._lines.append(line)
+        if len(self._lines) >= self.chunk_size:
+            lines, self._lines = self._lines, []
+            yield self._parse(lines)
+
+    def _parse(self, lines: List[bytes]) -> np.ndarray:
+        try:
+            if self.input_format == "csv":
+                matrix = np.loadtxt(
+                    [line.decode("utf-8") for line in lines],
+                    delimiter=",", usecols=self._columns, ndmin=2, dtype=np.float64,
+                )
+            else:
+                matrix = self._parse_ndjson(lines)
+        except BulkInputError:
+            raise
+        except Exception as e:
+            raise BulkInputError(
+                f"Could not parse rows {self.rows_parsed}-{self.rows_parsed + len(lines) - 1}: {e}"
+            )
+        self.rows_parsed += len(matrix)
+        return matrix
+
+    def _parse_ndjson(self, lines: List[bytes]) -> np.ndarray:
+        records = [_loads(line) for line in lines]
+        if self._keys is None:
+            names = list(records[0])
+            self._keys = [names[position] for position in feature_columns(names)]
+        keys = self._keys
+        return np.array([[record[key] for key in keys] for record in records], dtype=np.float64)
+
+
+def iter_file_chunks(path: str, input_format: str = "csv", chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     block_size: int = 1 << 20) -> Iterator[np.ndarray]:
+    """Read a CSV/NDJSON file in blocks and yield feature matrices of `chunk_size` rows"""
+    chunker = RowChunker(input_format, chunk_size)
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            yield from chunker.feed(block)
+    yield from chunker.close()
+
+
+def iter_parquet_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Yield feature matrices from a Parquet file (requires pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise BulkInputError("Reading Parquet files requires pyarrow")
+    parquet_file = pq.ParquetFile(path)
+    names = parquet_file.schema_arrow.names
+    columns = [names[position] for position in feature_columns(names)]
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        yield np.column_stack([
+            batch.column(name).to_numpy(zero_copy_only=False) for name in columns
+        ]).astype(np.float64)
+
+
+class RowValidator:
+    """Applies an invalid_rows policy to parsed chunks, like /predict/batch does to a batch.
+
+    Each chunk is checked with `validate_matrix` (NaN and infinite values
+    fail the range check of their field). With "reject" the first chunk
+    holding an invalid row raises InvalidRowsError; with "skip" invalid rows
+    are dropped and tallied per field for `report`.
+    """
+
+    def __init__(self, invalid_rows: str = "skip"):
+        if invalid_rows not in INVALID_ROW_POLICIES:
+            raise BulkInputError(f"invalid_rows must be one of: {', '.join(INVALID_ROW_POLICIES)}")
+        self.invalid_rows = invalid_rows
+        self.rows = 0
+        self.skipped = 0
+        self._counts: Dict[str, int] = {}
+        self._rows: Dict[str, List[int]] = {}
+
+    def check(self, matrix: np.ndarray, first_row: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """The valid rows of a chunk, and their input row indices (None when all rows are valid)"""
+        checked = validate_matrix(matrix)
+        self.rows += len(matrix)
+        if not checked.invalid_rows:
+            return matrix, None
+        if self.invalid_rows == "reject":
+            raise InvalidRowsError(checked.report(first_row=first_row), first_row)
+        self.skipped += checked.invalid_rows
+        for name, rows in checked.errors.items():
+            self._counts[name] = self._counts.get(name, 0) + len(rows)
+            kept = self._rows.setdefault(name, [])
+            kept.extend((rows[:MAX_REPORTED_ROWS - len(kept)] + first_row).tolist())
+        return matrix[checked.valid], np.flatnonzero(checked.valid) + first_row
+
+    def report(self) -> dict:
+        """Skipped rows so far, in the shape of `MatrixValidation.report`"""
+        return {
+            "rows": self.rows,
+            "invalid_rows": self.skipped,
+            "errors": {
+                name: {"constraint": CONSTRAINTS[name], "count": self._counts[name], "rows": self._rows[name]}
+                for name in FEATURE_NAMES if name in self._counts
+            },
+        }
+
+
+def format_chunk(scores: Scores, first_row: int, output_format: str = "ndjson",
+                 rows: Optional[np.ndarray] = None) -> bytes:
+    """Encode one scored chunk as NDJSON lines or CSV rows (without header)
+
+    Rows are numbered from `first_row`, or taken from `rows` when some input
+    rows were skipped.
+    """
+    rows = range(first_row, first_row + len(scores.predictions)) if rows is None else rows.tolist()
+    levels = [RISK_LEVELS[code].value for code in scores.risk_codes.tolist()]
+    columns = zip(rows, scores.predictions.tolist(), scores.probability_positive.tolist(), levels)
+    if output_format == "csv":
+        lines = [f"{row},{prediction},{probability!r},{level}\n" for row, prediction, probability, level in columns]
+    else:
+        lines = [
+            f'{{"row":{row},"prediction":{prediction},"probability_positive":{probability!r},"risk_level":"{level}"}}\n'
+            for row, prediction, probability, level in columns
+        ]
+    return "".join(lines).encode("utf-8")
+
+
+def csv_header() -> bytes:
+    return (",".join(OUTPUT_COLUMNS) + "\n").encode("utf-8")
+
+
+def format_error(message: str, output_format: str = "ndjson", details: Optional[dict] = None) -> bytes:
+    """Trailer written when the upload turns out to be malformed mid-stream
+
+    NDJSON trailers also carry `details` (e.g. an InvalidRowsError report).
+    """
+    if output_format == "csv":
+        return f"# error: {message}\n".encode("utf-8")
+    return (json.dumps({"error": message, **(details or {})}) + "\n").encode("utf-8")
+
+
+def format_skipped(report: dict, output_format: str = "ndjson") -> bytes:
+    """Trailer listing the rows left out under invalid_rows=skip (a RowValidator report)"""
+    if output_format == "csv":
+        fields = "; ".join(f"{error['constraint']} ({error['count']} rows)" for error in report["errors"].values())
+        return f"# skipped {report['invalid_rows']} invalid rows: {fields}\n".encode("utf-8")
+    return (json.dumps({"invalid_rows": report["invalid_rows"], "errors": report["errors"]}) + "\n").encode("utf-8")
+
+
+def detect_input_format(content_type: Optional[str]) -> Optional[str]:
+    """Map a request Content-Type to an input format"""
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+        return "ndjson"
+    return None
@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class PredictionCache:
+    """Size-bounded LRU cache with an optional TTL, namespaced by model version.
+
+    Keys are `(namespace, key)` pairs, so entries computed by one model
+    version are never returned for another: swapping the model changes the
+    namespace and old entries simply age out of the LRU. Thread-safe, since
+    predictions are produced from executor threads.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds or None
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None, refreshing its LRU position"""
+        entry_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[entry_key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return value
+
+    def put(self, namespace: str, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries when full"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        entry_key = (namespace, key)
+        with self._lock:
+            self._entries[entry_key] = (value, expires_at)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries; counters are kept"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
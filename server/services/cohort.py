@@ -0,0 +1,106 @@
+from typing import Sequence
+
+import numpy as np
+
+from .prediction_service import FEATURE_NAMES, RISK_LEVELS, Scores
+
+# Lower bounds of every age band after the first, e.g. <30, 30-39, ..., 70+
+DEFAULT_AGE_BANDS = (30, 40, 50, 60, 70)
+DEFAULT_BINS = 20
+
+_AGE = FEATURE_NAMES.index("age")
+
+
+def parse_age_bands(text: str) -> tuple:
+    """'30,40,50' -> (30, 40, 50); raises ValueError unless strictly increasing positive integers"""
+    cuts = tuple(int(part) for part in text.split(",") if part.strip())
+    if any(cut <= 0 for cut in cuts) or any(a >= b for a, b in zip(cuts, cuts[1:])):
+        raise ValueError("age_bands must be strictly increasing positive integers, e.g. 30,40,50,60,70")
+    return cuts
+
+
+def _band_labels(cuts: Sequence[int]) -> list:
+    if not cuts:
+        return ["all"]
+    labels = [f"<{cuts[0]}"]
+    labels += [f"{low}-{high - 1}" for low, high in zip(cuts, cuts[1:])]
+    labels.append(f"{cuts[-1]}+")
+    return labels
+
+
+class CohortAggregator:
+    """Running risk-stratification aggregates over scored chunks.
+
+    Every row falls into one (age band, risk level) cell and one probability
+    bin; `add` folds a chunk into fixed-size count/sum arrays with a few
+    `np.bincount` calls, so memory does not grow with the cohort.
+    """
+
+    def __init__(self, bins: int = DEFAULT_BINS, age_bands: Sequence[int] = DEFAULT_AGE_BANDS):
+        self.bins = bins
+        self.age_cuts = np.asarray(age_bands, dtype=np.float64)
+        self.band_labels = _band_labels(age_bands)
+        n_cells = len(self.band_labels) * len(RISK_LEVELS)
+        self.rows = 0
+        self.counts = np.zeros(n_cells, dtype=np.int64)
+        self.diabetic = np.zeros(n_cells, dtype=np.int64)
+        self.probability_sums = np.zeros(n_cells, dtype=np.float64)
+        self.histograms = np.zeros(n_cells * bins, dtype=np.int64)
+
+    def add(self, input_array: np.ndarray, scores: Scores) -> None:
+        """Fold one scored chunk into the aggregates"""
+        n_cells = len(self.counts)
+        bands = np.searchsorted(self.age_cuts, input_array[:, _AGE], side="right")
+        cells = bands * len(RISK_LEVELS) + scores.risk_codes
+        probability = scores.probability_positive
+        # Probabilities are percentages; 100% lands in the last bin
+        bin_index = np.minimum((probability * (self.bins / 100.0)).astype(np.intp), self.bins - 1)
+
+        self.rows += len(cells)
+        self.counts += np.bincount(cells, minlength=n_cells)
+        self.diabetic += np.bincount(cells, weights=scores.predictions, minlength=n_cells).astype(np.int64)
+        self.probability_sums += np.bincount(cells, weights=probability, minlength=n_cells)
+        self.histograms += np.bincount(cells * self.bins + bin_index, minlength=n_cells * self.bins)
+
+    @staticmethod
+    def _mean(total: float, count: int):
+        return total / count if count else None
+
+    def summary(self) -> dict:
+        """JSON-ready summary: overall, per risk level and per age band"""
+        shape = (len(self.band_labels), len(RISK_LEVELS))
+        counts = self.counts.reshape(shape)
+        diabetic = self.diabetic.reshape(shape)
+        sums = self.probability_sums.reshape(shape)
+        histograms = self.histograms.reshape(shape + (self.bins,))
+        rows = self.rows
+
+        risk_levels = {
+            level.value: {
+                "count": int(counts[:, code].sum()),
+                "share": counts[:, code].sum() / rows if rows else 0.0,
+                "mean_probability": self._mean(sums[:, code].sum(), counts[:, code].sum()),
+                "histogram": histograms[:, code].sum(axis=0).tolist(),
+            }
+            for code, level in enumerate(RISK_LEVELS)
+        }
+        age_bands = [
+            {
+                "band": label,
+                "count": int(counts[band].sum()),
+                "diabetic": int(diabetic[band].sum()),
+                "mean_probability": self._mean(sums[band].sum(), counts[band].sum()),
+                "risk_levels": {level.value: int(counts[band, code]) for code, level in enumerate(RISK_LEVELS)},
+                "histogram": histograms[band].sum(axis=0).tolist(),
+            }
+            for band, label in enumerate(self.band_labels)
+        ]
+        return {
+            "rows": rows,
+            "diabetic": int(diabetic.sum()),
+            "mean_probability": self._mean(sums.sum(), rows),
+            "bin_edges": np.linspace(0, 100, self.bins + 1).tolist(),
+            "histogram": histograms.sum(axis=(0, 1)).tolist(),
+            "risk_levels": risk_levels,
+            "age_bands": age_bands,
+        }
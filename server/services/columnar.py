@@ -0,0 +1,117 @@
+"""Binary batch formats for high-volume clients.
+
+Request (`application/vnd.diabetes.matrix`): a 16-byte little-endian header,
+then the N x 8 feature matrix in row-major order, columns in FEATURE_NAMES
+order:
+
+    magic  4s   b"DBM1"
+    dtype  1s   b"f" (float32) or b"d" (float64)
+    -      3x   padding
+    rows   u4
+    cols   u4   always 8
+
+Response (`application/vnd.diabetes.scores`): a 16-byte header followed by
+one column after another:
+
+    magic  4s   b"DBS1"
+    rows   u4
+    -      8x   padding
+    probability_positive  float64[rows]   (percent)
+    prediction            uint8[rows]     (0/1)
+    risk_code             uint8[rows]     (0=LOW, 1=MODERATE, 2=HIGH)
+
+Rows skipped by validation (`invalid_rows=skip`) keep their position, with a
+NaN probability and 255 as prediction and risk code.
+
+The feature matrix is a read-only view of the request body (`np.frombuffer`),
+so no per-row parsing or copying happens before scaling; its values are
+checked by `validation.validate_matrix`.
+"""
+import struct
+from typing import Optional
+
+import numpy as np
+
+from .prediction_service import FEATURE_NAMES, Scores
+
+_MATRIX_HEADER = struct.Struct("<4s1s3xII")
+_SCORES_HEADER = struct.Struct("<4sI8x")
+_MATRIX_MAGIC = b"DBM1"
+_SCORES_MAGIC = b"DBS1"
+_DTYPES = {b"f": np.dtype("<f4"), b"d": np.dtype("<f8")}
+SKIPPED_CODE = 255
+
+
+class ColumnarFormatError(ValueError):
+    """Raised when a binary payload is malformed"""
+
+
+def encode_matrix(input_array: np.ndarray, dtype=np.float64) -> bytes:
+    """Client side: serialize an N x 8 feature matrix"""
+    dtype = np.dtype(dtype).newbyteorder("<")
+    code = next((code for code, known in _DTYPES.items() if known == dtype), None)
+    if code is None:
+        raise ColumnarFormatError("Only float32 and float64 matrices are supported")
+    matrix = np.ascontiguousarray(input_array, dtype=dtype)
+    if matrix.ndim != 2 or matrix.shape[1] != len(FEATURE_NAMES):
+        raise ColumnarFormatError(f"Expected an N x {len(FEATURE_NAMES)} matrix, got shape {matrix.shape}")
+    return _MATRIX_HEADER.pack(_MATRIX_MAGIC, code, matrix.shape[0], matrix.shape[1]) + matrix.tobytes()
+
+
+def decode_matrix(body: bytes) -> np.ndarray:
+    """Server side: a read-only N x 8 view of the payload, without copying"""
+    if len(body) < _MATRIX_HEADER.size:
+        raise ColumnarFormatError("Payload is shorter than the matrix header")
+    magic, code, rows, cols = _MATRIX_HEADER.unpack_from(body)
+    if magic != _MATRIX_MAGIC:
+        raise ColumnarFormatError("Not a diabetes feature matrix (bad magic)")
+    dtype = _DTYPES.get(code)
+    if dtype is None:
+        raise ColumnarFormatError("Matrix dtype must be 'f' (float32) or 'd' (float64)")
+    if cols != len(FEATURE_NAMES):
+        raise ColumnarFormatError(f"Matrix must have {len(FEATURE_NAMES)} columns ({', '.join(FEATURE_NAMES)})")
+    expected = _MATRIX_HEADER.size + rows * cols * dtype.itemsize
+    if len(body) != expected:
+        raise ColumnarFormatError(f"Payload is {len(body)} bytes, header describes {expected}")
+    return np.frombuffer(body, dtype=dtype, count=rows * cols, offset=_MATRIX_HEADER.size).reshape(rows, cols)
+
+
+def encode_scores(scores: Scores, valid: Optional[np.ndarray] = None) -> bytes:
+    """Column-wise scores: probabilities, predictions and risk codes
+
+    `scores` covers the rows where the `valid` mask is set, if one is given;
+    the other rows are encoded as skipped.
+    """
+    probability = np.ascontiguousarray(scores.probability_positive, dtype="<f8")
+    predictions = np.asarray(scores.predictions, dtype=np.uint8)
+    risk_codes = np.asarray(scores.risk_codes, dtype=np.uint8)
+    if valid is not None:
+        probability, predictions, risk_codes = (
+            _scatter(column, valid, fill) for column, fill in
+            ((probability, np.nan), (predictions, SKIPPED_CODE), (risk_codes, SKIPPED_CODE))
+        )
+    return b"".join((
+        _SCORES_HEADER.pack(_SCORES_MAGIC, len(predictions)),
+        probability.tobytes(), predictions.tobytes(), risk_codes.tobytes(),
+    ))
+
+
+def _scatter(column: np.ndarray, valid: np.ndarray, fill) -> np.ndarray:
+    full = np.full(len(valid), fill, dtype=column.dtype)
+    full[valid] = column
+    return full
+
+
+def decode_scores(body: bytes) -> Scores:
+    """Client side: parse a scores payload (views into `body`)"""
+    if len(body) < _SCORES_HEADER.size:
+        raise ColumnarFormatError("Payload is shorter than the scores header")
+    magic, rows = _SCORES_HEADER.unpack_from(body)
+    if magic != _SCORES_MAGIC or len(body) != _SCORES_HEADER.size + rows * 10:
+        raise ColumnarFormatError("Not a diabetes scores payload")
+    offset = _SCORES_HEADER.size
+    probability = np.frombuffer(body, dtype="<f8", count=rows, offset=offset)
+    predictions = np.frombuffer(body, dtype=np.uint8, count=rows, offset=offset + 8 * rows)
+    risk_codes = np.frombuffer(body, dtype=np.uint8, count=rows, offset=offset + 9 * rows)
+    return Scores(predictions, 100 - probability, probability, risk_codes)
+
@@ -0,0 +1,156 @@
+import threading
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from . import bulk
+from .prediction_service import FEATURE_NAMES
+
+# Population stability index thresholds commonly used for "investigate" / "act"
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+# Added to every bin share so empty bins keep PSI finite
+_EPSILON = 1e-4
+
+
+def _shares(counts: np.ndarray) -> np.ndarray:
+    total = counts.sum()
+    return counts / total if total else np.zeros(len(counts))
+
+
+def population_stability(expected: np.ndarray, actual: np.ndarray) -> float:
+    """PSI between two binned distributions given as bin shares"""
+    expected = expected + _EPSILON
+    actual = actual + _EPSILON
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Largest gap between the two cumulative distributions at the bin edges
+
+    A lower bound of the exact two-sample KS statistic, which would need
+    every observation.
+    """
+    return float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+
+def _status(psi: float) -> str:
+    if psi >= PSI_SIGNIFICANT:
+        return "significant"
+    if psi >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+class DriftMonitor:
+    """Fixed-size histograms of live inputs and predicted probabilities.
+
+    Feature bins are the deciles (by default) of the reference data, so each
+    holds about the same share of the training rows; probabilities use fixed
+    bins over 0-100%. Scored batches are queued as-is and folded into the
+    counts with one `np.bincount` once FLUSH_ROWS rows are pending (or when a
+    report is requested), so the prediction path only pays for a list append
+    and memory stays bounded however much traffic is observed.
+    """
+
+    FLUSH_ROWS = 4096
+
+    def __init__(self, reference: np.ndarray, reference_probability: np.ndarray,
+                 bins: int = 10, probability_bins: int = 10):
+        quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+        # Interior edges only; repeated quantiles (e.g. many zeros) collapse into one bin
+        self.edges = [np.unique(np.quantile(column, quantiles)) for column in reference.T]
+        self.edges.append(np.linspace(0, 100, probability_bins + 1)[1:-1])
+        sizes = [len(edges) + 1 for edges in self.edges]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        self.size = int(sum(sizes))
+
+        self.baseline = self._histogram(reference, reference_probability)
+        self.reference_rows = len(reference)
+        self.counts = np.zeros(self.size, dtype=np.int64)
+        self.rows = 0
+        self._pending: List[tuple] = []
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, path: Path, service, bins: int = 10) -> "DriftMonitor":
+        """Baseline from a training CSV, with probabilities from `service`'s model"""
+        reference = np.concatenate(list(bulk.iter_file_chunks(str(path), "csv")))
+        probability = service.score_matrix(reference, local=True).probability_positive
+        return cls(reference, probability, bins)
+
+    def _histogram(self, input_array: np.ndarray, probability: np.ndarray) -> np.ndarray:
+        columns = [*np.asarray(input_array, dtype=np.float64).T, probability]
+        indices = [
+            np.searchsorted(edges, column, side="right") + offset
+            for edges, column, offset in zip(self.edges, columns, self.offsets)
+        ]
+        return np.bincount(np.concatenate(indices), minlength=self.size)
+
+    def observe(self, input_array: np.ndarray, probability: np.ndarray) -> None:
+        """Record scored rows (raw N x 8 features and positive probabilities in %)"""
+        with self._lock:
+            self._pending.append((input_array, probability))
+            self._pending_rows += len(input_array)
+            if self._pending_rows < self.FLUSH_ROWS:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Fold queued rows into the histograms"""
+        with self._lock:
+            pending, self._pending, self._pending_rows = self._pending, [], 0
+        if not pending:
+            return
+        counts = self._histogram(
+            np.concatenate([rows for rows, _ in pending]),
+            np.concatenate([probability for _, probability in pending]),
+        )
+        with self._lock:
+            self.counts += counts
+            self.rows += int(counts[:self.offsets[1]].sum())
+
+    def reset(self) -> None:
+        """Start a new observation window"""
+        with self._lock:
+            self._pending, self._pending_rows = [], 0
+            self.counts = np.zeros(self.size, dtype=np.int64)
+            self.rows = 0
+
+    def report(self, min_rows: int = 0) -> dict:
+        """PSI and binned KS of every feature and of the predicted probability"""
+        self.flush()
+        with self._lock:
+            counts = self.counts.copy()
+            rows = self.rows
+        names = [*FEATURE_NAMES, "probability_positive"]
+        bounds = [*self.offsets, self.size]
+        distributions = {}
+        for index, name in enumerate(names):
+            window = slice(bounds[index], bounds[index + 1])
+            expected = _shares(self.baseline[window])
+            actual = _shares(counts[window])
+            psi = population_stability(expected, actual) if rows else None
+            distributions[name] = {
+                "psi": psi,
+                "ks": binned_ks(expected, actual) if rows else None,
+                "status": _status(psi) if rows else None,
+                "edges": self.edges[index].tolist(),
+                "baseline": expected.tolist(),
+                "live": actual.tolist(),
+            }
+
+        if rows < max(min_rows, 1):
+            status = "insufficient_data"
+        else:
+            worst = max(distribution["psi"] for distribution in distributions.values())
+            status = _status(worst)
+        return {
+            "status": status,
+            "rows": rows,
+            "reference_rows": self.reference_rows,
+            "features": {name: distributions[name] for name in FEATURE_NAMES},
+            "probability": distributions["probability_positive"],
+        }
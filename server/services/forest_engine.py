@@ -0,0 +1,206 @@
+import numpy as np
+from typing import Optional, Tuple
+
+
+class ArrayForest:
+    """Random forest flattened into contiguous NumPy arrays.
+
+    All trees share one set of node arrays (feature, threshold, left/right
+    child and per-node class probabilities); `roots` holds the index of each
+    tree's root node. Leaves point back to themselves with an infinite
+    threshold, so a batch can be evaluated for every tree at once with a fixed
+    number of vectorized level-by-level steps and no per-estimator Python loop.
+
+    Inputs are scaled with the same arithmetic as `StandardScaler.transform`
+    and rounded to float32 before comparing, exactly as sklearn's trees do, so
+    probabilities match `predict_proba` of the original model.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray,
+                 left: np.ndarray, right: np.ndarray, value: np.ndarray,
+                 roots: np.ndarray, max_depth: int, classes: np.ndarray,
+                 mean: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None,
+                 n_features: Optional[int] = None, children: Optional[np.ndarray] = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes = np.asarray(classes)
+        self.mean = mean
+        self.scale = scale
+        self.n_trees = len(roots)
+        self.n_features = int(n_features if n_features is not None else feature.max() + 1)
+        # Passed in by memory-mapped artifacts so the interleaved copy is shared too
+        self._children = children if children is not None else np.stack([right, left], axis=1).ravel()
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None) -> "ArrayForest":
+        """Flatten a fitted RandomForestClassifier (and optional StandardScaler)"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.intp)
+            is_leaf = tree.children_left == -1
+
+            feature = tree.feature.astype(np.intp)
+            threshold = tree.threshold.astype(np.float64)
+            left = tree.children_left.astype(np.intp) + offset
+            right = tree.children_right.astype(np.intp) + offset
+            # Leaves loop back to themselves so extra traversal steps are no-ops
+            feature[is_leaf] = 0
+            threshold[is_leaf] = np.inf
+            left[is_leaf] = node_ids[is_leaf]
+            right[is_leaf] = node_ids[is_leaf]
+
+            value = tree.value[:, 0, :].astype(np.float64)
+            value /= value.sum(axis=1, keepdims=True)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        mean = scale = None
+        if scaler is not None:
+            if getattr(scaler, "with_mean", True):
+                mean = np.asarray(scaler.mean_, dtype=np.float64)
+            if getattr(scaler, "with_std", True):
+                scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=model.classes_,
+            mean=mean,
+            scale=scale,
+            n_features=model.n_features_in_,
+        )
+
+    def reduced(self, n_trees: Optional[int] = None, max_depth: Optional[int] = None,
+                threshold_dtype=np.float64) -> "ArrayForest":
+        """A smaller forest: the first `n_trees` trees, each cut off at `max_depth`
+
+        Nodes at the depth limit become leaves and keep their own class
+        probabilities, i.e. what the training samples reaching them looked
+        like. Only reachable nodes are copied, laid out level by level.
+
+        With threshold_dtype=np.float32 every threshold is rounded down to the
+        largest float32 not above it. Inputs are float32 already, so every
+        comparison (and every prediction) is unchanged while traversal reads
+        half as many bytes.
+        """
+        roots = self.roots[:n_trees] if n_trees else self.roots
+        depth_limit = self.max_depth if max_depth is None else min(max_depth, self.max_depth)
+        is_leaf = self.left == np.arange(len(self.left))
+
+        levels = [roots]
+        frontier = roots
+        depth = 0
+        while depth < depth_limit:
+            parents = frontier[~is_leaf[frontier]]
+            if not len(parents):
+                break
+            frontier = np.concatenate([self.left[parents], self.right[parents]])
+            levels.append(frontier)
+            depth += 1
+        nodes = np.concatenate(levels)
+
+        remap = np.full(len(self.left), -1, dtype=np.intp)
+        remap[nodes] = np.arange(len(nodes), dtype=np.intp)
+        feature = self.feature[nodes]
+        threshold = self.threshold[nodes]
+        left = remap[self.left[nodes]]
+        right = remap[self.right[nodes]]
+        # Split nodes on the last level become leaves that loop back to themselves
+        cut = remap[frontier[~is_leaf[frontier]]]
+        feature[cut] = 0
+        threshold[cut] = np.inf
+        left[cut] = cut
+        right[cut] = cut
+
+        if threshold_dtype == np.float32:
+            rounded = threshold.astype(np.float32)
+            too_high = rounded > threshold
+            rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+            threshold = rounded
+
+        return ArrayForest(
+            feature=feature,
+            threshold=threshold,
+            left=left,
+            right=right,
+            value=self.value[nodes],
+            roots=remap[roots],
+            max_depth=depth,
+            classes=self.classes,
+            mean=self.mean,
+            scale=self.scale,
+            n_features=self.n_features,
+        )
+
+    def transform(self, input_array: np.ndarray) -> np.ndarray:
+        """Scale a raw feature matrix and round it to float32 precision"""
+        scaled = np.array(input_array, dtype=np.float64)
+        if self.mean is not None:
+            scaled -= self.mean
+        if self.scale is not None:
+            scaled /= self.scale
+        # sklearn trees compare float32 features against float64 thresholds;
+        # forests with float32 thresholds (see `reduced`) compare in float32
+        rounded = scaled.astype(np.float32)
+        return rounded if self.threshold.dtype == np.float32 else rounded.astype(np.float64)
+
+    def apply(self, input_array: np.ndarray) -> np.ndarray:
+        """Leaf node index reached in every tree, shape (n_samples, n_trees)"""
+        return self._apply_scaled(self.transform(input_array))
+
+    def _apply_scaled(self, scaled: np.ndarray) -> np.ndarray:
+        n_samples, n_features = scaled.shape
+        flat = scaled.ravel()
+        row_offsets = (np.arange(n_samples, dtype=np.intp) * n_features)[:, None]
+        nodes = np.repeat(self.roots[None, :], n_samples, axis=0)
+        for _ in range(self.max_depth):
+            feature_index = self.feature.take(nodes)
+            if n_samples > 1:
+                feature_index += row_offsets
+            go_left = flat.take(feature_index) <= self.threshold.take(nodes)
+            # children is interleaved (right, left), so 2 * node + go_left picks the branch
+            nodes *= 2
+            nodes += go_left
+            nodes = self._children.take(nodes)
+        return nodes
+
+    def predict_proba(self, input_array: np.ndarray) -> np.ndarray:
+        """Class probabilities averaged over all trees, like sklearn"""
+        leaves = self.apply(input_array)
+        return self.value[leaves].mean(axis=1)
+
+    def predict_scaled(self, scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (labels, probabilities) for a matrix already passed through `transform`"""
+        probabilities = self.value[self._apply_scaled(scaled)].mean(axis=1)
+        labels = self.classes[np.argmax(probabilities, axis=1)]
+        return labels, probabilities
+
+    def __call__(self, input_array: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (labels, probabilities) from a single traversal"""
+        return self.predict_scaled(self.transform(input_array))
+
+    def max_deviation(self, reference, input_array: np.ndarray) -> float:
+        """Largest absolute probability difference against a reference engine"""
+        expected = reference.predict_proba(input_array)
+        return float(np.max(np.abs(self.predict_proba(input_array) - expected)))
@@ -0,0 +1,78 @@
+import numpy as np
+from typing import Tuple
+from .forest_engine import ArrayForest
+
+
+class FusedInference:
+    """Scaler + classifier fused into one object, built once when the model loads.
+
+    Each call makes a single probability pass over the model and derives the
+    label as the argmax, instead of running `predict` and `predict_proba`
+    (which traverse every tree twice). The StandardScaler affine transform is
+    applied in place on one float64 buffer with the same arithmetic as
+    `StandardScaler.transform`, so results are identical to the unfused path.
+    """
+
+    def __init__(self, model, scaler=None):
+        self.model = model
+        self.scaler = scaler
+        self.classes = np.asarray(model.classes_)
+        self._has_proba = hasattr(model, "predict_proba")
+        self._mean = None
+        self._scale = None
+        if scaler is not None and hasattr(scaler, "scale_"):
+            # StandardScaler: keep only the affine coefficients it would use
+            if getattr(scaler, "with_mean", True):
+                self._mean = np.asarray(scaler.mean_, dtype=np.float64)
+            if getattr(scaler, "with_std", True):
+                self._scale = np.asarray(scaler.scale_, dtype=np.float64)
+            self._fused_scaler = True
+        else:
+            self._fused_scaler = False
+
+    def transform(self, input_array: np.ndarray) -> np.ndarray:
+        """Apply the scaler to a feature matrix"""
+        if self.scaler is None:
+            return np.asarray(input_array, dtype=np.float64)
+        if not self._fused_scaler:
+            return self.scaler.transform(input_array)
+        scaled = np.array(input_array, dtype=np.float64)
+        if self._mean is not None:
+            scaled -= self._mean
+        if self._scale is not None:
+            scaled /= self._scale
+        return scaled
+
+    def _proba_scaled(self, scaled: np.ndarray) -> np.ndarray:
+        if self._has_proba:
+            return self.model.predict_proba(scaled)
+        # Model doesn't support probability: one-hot encode its labels
+        labels = self.model.predict(scaled)
+        return (labels[:, None] == self.classes[None, :]).astype(np.float64)
+
+    def predict_proba(self, input_array: np.ndarray) -> np.ndarray:
+        """Class probabilities for a raw (unscaled) feature matrix"""
+        return self._proba_scaled(self.transform(input_array))
+
+    def predict_scaled(self, scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (labels, probabilities) for a matrix already passed through `transform`"""
+        probabilities = self._proba_scaled(scaled)
+        labels = self.classes[np.argmax(probabilities, axis=1)]
+        return labels, probabilities
+
+    def __call__(self, input_array: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (labels, probabilities) from a single model pass"""
+        return self.predict_scaled(self.transform(input_array))
+
+
+# Inference engines selectable through PredictionService(engine=...)
+ENGINES = ("fused", "forest")
+
+
+def build_engine(name: str, model, scaler=None):
+    """Build the named inference engine for a loaded model and scaler"""
+    if name == "fused":
+        return FusedInference(model, scaler)
+    if name == "forest":
+        return ArrayForest.from_sklearn(model, scaler)
+    raise ValueError(f"Unknown inference engine '{name}'. Expected one of: {', '.join(ENGINES)}")
@@ -0,0 +1,206 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Upper bounds in seconds: 50µs .. 2.5s, dense around the single-row latency range
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """A named metric family with a fixed set of label names"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Child for one label combination, created on first use; bind it once on hot paths"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, key: Tuple[str, ...], child) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._samples(key, child))
+        return lines
+
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonic counter, e.g. predictions served per risk level"""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+
+    def _samples(self, key, child) -> Iterable[str]:
+        yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        # One slot per bucket plus the +Inf overflow; cumulated only when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; observing is one bisect and two additions"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _samples(self, key, child) -> Iterable[str]:
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _format_labels(self.labelnames, key)
+        yield f"{self.name}_sum{labels} {_format_value(total)}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+
+class StageTimer:
+    """Times consecutive stages of one operation into a stage histogram
+
+        timer = StageTimer()
+        ... ; timer.lap(TRANSFORM)
+        ... ; timer.lap(INFERENCE)
+    """
+
+    __slots__ = ("last",)
+
+    def __init__(self):
+        self.last = time.perf_counter()
+
+    def lap(self, stage: _HistogramValue) -> None:
+        now = time.perf_counter()
+        stage.observe(now - self.last)
+        self.last = now
+
+
+REQUEST_DURATION = Histogram(
+    "diabetes_request_duration_seconds",
+    "Time spent handling an API request, by route",
+    ("route",),
+)
+STAGE_DURATION = Histogram(
+    "diabetes_stage_duration_seconds",
+    "Time spent in each stage of the prediction path (transform/inference/build_output are per scored batch)",
+    ("stage",),
+)
+PREDICTIONS = Counter(
+    "diabetes_predictions_total",
+    "Predictions served, by model version and risk level",
+    ("version", "model_version", "risk_level"),
+)
+ERRORS = Counter(
+    "diabetes_errors_total",
+    "API requests that ended in an error response, by route and status code",
+    ("route", "status"),
+)
+AUDIT_RECORDS = Counter(
+    "diabetes_audit_records_total",
+    "Prediction audit log records, by outcome (written, dropped, rejected, failed)",
+    ("outcome",),
+)
+ADMISSIONS = Counter(
+    "diabetes_admissions_total",
+    "Prediction requests by admission outcome (admitted, queue_full, queue_timeout, expired)",
+    ("outcome",),
+)
+
+# Pre-bound stage children for the hot path
+VALIDATION = STAGE_DURATION.labels("validation")
+TRANSFORM = STAGE_DURATION.labels("transform")
+INFERENCE = STAGE_DURATION.labels("inference")
+BUILD_OUTPUT = STAGE_DURATION.labels("build_output")
+SERIALIZATION = STAGE_DURATION.labels("serialization")
+
+METRICS = (REQUEST_DURATION, STAGE_DURATION, PREDICTIONS, ERRORS, AUDIT_RECORDS, ADMISSIONS)
+
+
+def reset_locks(metrics: Sequence[_Metric] = METRICS) -> None:
+    """Replace every lock, e.g. in a forked child where another thread may have held one"""
+    for metric in metrics:
+        metric._lock = threading.Lock()
+        for child in metric._children.values():
+            child._lock = threading.Lock()
+
+
+def render(metrics: Sequence[_Metric] = METRICS) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -1,8 +1,44 @@
-import joblib
+import hashlib
 import numpy as np
 from pathlib import Path
-from typing import Optional
-from ..schemas.diabetes import PatientInput, PredictionOutput, RiskLevel
+from operator import attrgetter
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+from pydantic_core import to_json
+from ..schemas.diabetes import Explanation, PatientInput, PredictionOutput, RiskLevel
+from . import metrics
+from .cache import PredictionCache
+from .artifacts import MANIFEST, is_artifact
+from .inference import FusedInference, build_engine
+from .metrics import StageTimer
+
+
+# Model input order; must match the column order used during training
+FEATURE_NAMES = (
+    "pregnancies",
+    "glucose",
+    "blood_pressure",
+    "skin_thickness",
+    "insulin",
+    "bmi",
+    "diabetes_pedigree_function",
+    "age",
+)
+
+# Risk levels indexed by the codes returned from _determine_risk_levels
+RISK_LEVELS = (RiskLevel.LOW, RiskLevel.MODERATE, RiskLevel.HIGH)
+
+_get_features = attrgetter(*FEATURE_NAMES)
+
+# PatientInput objects, or an already validated N x 8 feature matrix
+BatchInputs = Union[Sequence[PatientInput], np.ndarray]
+
+
+class Scores(NamedTuple):
+    """Column-wise scoring results for a feature matrix (probabilities in %)"""
+    predictions: np.ndarray
+    probability_negative: np.ndarray
+    probability_positive: np.ndarray
+    risk_codes: np.ndarray
 
 
 class PredictionService:
@@ -10,31 +46,164 @@ class PredictionService:
     
     LOW_RISK_THRESHOLD = 30.0
     HIGH_RISK_THRESHOLD = 70.0
+    # Maximum allowed probability difference between an engine and sklearn
+    # (tests/test_forest_engine.py checks the forest engine; parity_check=True re-checks at load)
+    PARITY_TOLERANCE = 1e-9
     
     def __init__(self, model_path: str = "aiModels/diabetes_model_v2.pkl", 
-                 scaler_path: str = "aiModels/scaler_rf_v2.pkl"):
+                 scaler_path: Optional[str] = "aiModels/scaler_rf_v2.pkl",
+                 engine: str = "fused", cache: Optional[PredictionCache] = None,
+                 explain: bool = False, parity_check: bool = False):
         self.model_path = Path(__file__).parent.parent / model_path
-        self.scaler_path = Path(__file__).parent.parent / scaler_path
+        # None when model_path holds a full pipeline (see server/training.py)
+        self.scaler_path = Path(__file__).parent.parent / scaler_path if scaler_path else None
+        self.engine = engine
+        self.cache = cache
+        self.model_version = None
         self.model = None
         self.scaler = None
+        # Pipeline steps that run before the scaler, e.g. zero-value imputation
+        self.preprocessor = None
+        self.inference = None
+        self.explain = explain
+        self.parity_check = parity_check
+        self.explainer = None
+        # Set by InferencePool.start when scoring runs in worker processes
+        self.pool = None
+        self.pool_key = None
+        # DriftMonitor attached by ServingState after warm-up, so only live traffic is observed
+        self.drift = None
         self._load_models()
+        # Messages only depend on (prediction, risk level), so build them once
+        self._message_table = np.array([
+            [self._generate_message(bool(prediction), level) for level in RISK_LEVELS]
+            for prediction in (0, 1)
+        ], dtype=object)
+        # JSON before and after the two probabilities, in PredictionOutput field order;
+        # values are encoded with pydantic's own serializer, so the bytes match model_dump_json
+        self._json_fragments = {
+            (prediction, level): (
+                b'{"prediction":%d,"is_diabetic":%s,"probability_negative":' % (prediction, to_json(bool(prediction))),
+                b',"risk_level":%s,"message":%s}' % (to_json(level.value), to_json(self._message_table[prediction, code])),
+            )
+            for prediction in (0, 1)
+            for code, level in enumerate(RISK_LEVELS)
+        }
     
     def _load_models(self) -> None:
         """Load the trained model and scaler"""
         try:
             if not self.model_path.exists():
                 raise FileNotFoundError(f"Model file not found: {self.model_path}")
-            if not self.scaler_path.exists():
+            if self.scaler_path is not None and not self.scaler_path.exists():
                 raise FileNotFoundError(f"Scaler file not found: {self.scaler_path}")
             
+            if is_artifact(self.model_path):
+                self._load_artifact()
+                return
+            
+            # Deferred so importing the service does not pull in joblib/sklearn
+            import joblib
+            
             self.model = joblib.load(self.model_path)
-            self.scaler = joblib.load(self.scaler_path)
+            if self.scaler_path is not None:
+                self.scaler = joblib.load(self.scaler_path)
+            else:
+                self._split_pipeline()
+            self.model_version = self._fingerprint()
+            self.inference = build_engine(self.engine, self.model, self.scaler)
             print(f"✓ Model loaded from {self.model_path}")
-            print(f"✓ Scaler loaded from {self.scaler_path}")
+            if self.scaler_path is not None:
+                print(f"✓ Scaler loaded from {self.scaler_path}")
+            else:
+                print(f"✓ Pipeline steps: {', '.join(self._pipeline_steps)}")
+            if self.parity_check and not isinstance(self.inference, FusedInference):
+                self._check_parity()
+                print(f"✓ Inference engine '{self.engine}' matches sklearn")
+            if self.explain:
+                from .explain import PathExplainer
+                
+                self.explainer = PathExplainer.from_model(self.model, self.scaler, self.inference)
+                print("✓ Path contributions precomputed for explanations")
         except Exception as e:
             print(f"✗ Error loading models: {e}")
             raise
     
+    def _load_artifact(self) -> None:
+        """Memory-map an exported array artifact (see services/artifacts.py)
+        
+        No pickle is loaded and sklearn is never imported: the arrays already
+        hold the flattened forest, the scaler coefficients and, if exported,
+        the imputation medians and explanation tables. Scoring always uses the
+        array engine.
+        """
+        from .artifacts import load_forest
+        
+        forest, self.preprocessor, explainer, manifest = load_forest(self.model_path)
+        self.model = forest
+        self.inference = forest
+        self.engine = "forest"
+        self.model_version = self._fingerprint()
+        print(f"✓ Model artifact memory-mapped from {self.model_path} "
+              f"(exported from {manifest['source'].get('model_version', 'unknown')})")
+        if self.explain:
+            from .explain import PathExplainer
+            
+            self.explainer = explainer or PathExplainer(forest)
+    
+    def _split_pipeline(self) -> None:
+        """Unpack an exported Pipeline into preprocessor, scaler and model
+        
+        The final estimator becomes `model` and a StandardScaler right before it
+        becomes `scaler`, so the fused engines keep working; any earlier steps
+        (such as ZeroMedianImputer) run first, as `preprocessor`.
+        """
+        pipeline = self.model
+        if not hasattr(pipeline, "steps"):
+            raise ValueError(f"{self.model_path} is not a pipeline; a scaler path is required")
+        self._pipeline_steps = [name for name, _ in pipeline.steps]
+        self.model = pipeline.steps[-1][1]
+        steps = pipeline[:-1]
+        if len(steps) and hasattr(steps[-1], "scale_"):
+            self.scaler = steps[-1]
+            steps = steps[:-1]
+        if len(steps):
+            self.preprocessor = steps
+    
+    def _preprocess(self, input_array: np.ndarray) -> np.ndarray:
+        """Apply the pipeline steps that precede scaling, if any"""
+        if self.preprocessor is None:
+            return input_array
+        return self.preprocessor.transform(input_array)
+    
+    def _fingerprint(self) -> str:
+        """Version tag derived from the artifact contents, e.g. 'diabetes_model_v2@1a2b3c4d5e6f'"""
+        digest = hashlib.sha256()
+        for path in (self.model_path, self.scaler_path):
+            if path is not None:
+                # Artifact directories are identified by their manifest, which lists every checksum
+                digest.update((path / MANIFEST).read_bytes() if path.is_dir() else path.read_bytes())
+        return f"{self.model_path.stem}@{digest.hexdigest()[:12]}"
+    
+    def _synthetic_inputs(self, n_rows: int, seed: int = 0) -> np.ndarray:
+        """Random feature rows spread over +-3 standard deviations of every feature"""
+        mean = getattr(self.scaler, "mean_", getattr(self.inference, "mean", None))
+        scale = getattr(self.scaler, "scale_", getattr(self.inference, "scale", None))
+        mean = np.zeros(len(FEATURE_NAMES)) if mean is None else mean
+        scale = np.ones(len(FEATURE_NAMES)) if scale is None else scale
+        rng = np.random.default_rng(seed)
+        return mean + rng.uniform(-3, 3, size=(n_rows, len(FEATURE_NAMES))) * scale
+    
+    def _check_parity(self) -> None:
+        """Verify the selected engine reproduces sklearn's predict_proba"""
+        reference = FusedInference(self.model, self.scaler)
+        probe = self._synthetic_inputs(256)
+        deviation = self.inference.max_deviation(reference, probe)
+        if deviation > self.PARITY_TOLERANCE:
+            raise RuntimeError(
+                f"Inference engine '{self.engine}' deviates from sklearn by {deviation:.3g}"
+            )
+    
     def _prepare_input(self, patient_data: PatientInput) -> np.ndarray:
         """Convert patient data to model input format"""
         return np.array([[
@@ -48,6 +217,12 @@ class PredictionService:
             patient_data.age
         ]])
     
+    def _prepare_batch(self, patients: BatchInputs) -> np.ndarray:
+        """Convert many patients to an N x 8 model input matrix"""
+        if isinstance(patients, np.ndarray):
+            return patients
+        return np.array([_get_features(patient) for patient in patients], dtype=np.float64)
+    
     def _determine_risk_level(self, probability_positive: float) -> RiskLevel:
         """Determine risk level based on positive probability"""
         if probability_positive < self.LOW_RISK_THRESHOLD:
@@ -69,43 +244,177 @@ class PredictionService:
             else:
                 return "Moderate to high risk - Patient is predicted to be diabetic. Please consult a healthcare professional"
     
-    def predict(self, patient_data: PatientInput) -> PredictionOutput:
-        """Make a prediction for given patient data"""
-        if self.model is None or self.scaler is None:
+    def _determine_risk_levels(self, probability_positive: np.ndarray) -> np.ndarray:
+        """Vectorized risk level codes (indices into RISK_LEVELS) for a batch"""
+        return np.where(
+            probability_positive < self.LOW_RISK_THRESHOLD, 0,
+            np.where(probability_positive > self.HIGH_RISK_THRESHOLD, 2, 1)
+        )
+    
+    def _score(self, input_array: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score a raw feature matrix, in a worker process when a pool is attached"""
+        if self.pool is not None:
+            # Stage timers in workers stay in the worker, so time the round trip here
+            timer = StageTimer()
+            result = self.pool.score(self.pool_key, input_array)
+            timer.lap(metrics.INFERENCE)
+            return result
+        return self._score_local(input_array)
+    
+    def _score_local(self, input_array: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score a raw feature matrix with a single fused inference pass"""
+        timer = StageTimer()
+        scaled = self.inference.transform(self._preprocess(input_array))
+        timer.lap(metrics.TRANSFORM)
+        predictions, probabilities = self.inference.predict_scaled(scaled)
+        timer.lap(metrics.INFERENCE)
+        prob_negative = probabilities[:, 0] * 100
+        prob_positive = probabilities[:, 1] * 100
+        return predictions.astype(int), prob_negative, prob_positive
+    
+    def score_matrix(self, input_array: np.ndarray, local: bool = False) -> Scores:
+        """Score a raw N x 8 feature matrix without building per-row outputs
+        
+        local=True always scores in this process, even when a pool is attached.
+        """
+        if self.inference is None:
+            raise RuntimeError("Models not loaded properly")
+        if not len(input_array):
+            empty = np.empty(0)
+            return Scores(empty.astype(np.uint8), empty, empty, empty.astype(np.uint8))
+        score = self._score_local if local else self._score
+        predictions, prob_negative, prob_positive = score(input_array)
+        if self.drift is not None:
+            self.drift.observe(input_array, prob_positive)
+        return Scores(predictions, prob_negative, prob_positive, self._determine_risk_levels(prob_positive))
+    
+    def _predict_matrix(self, input_array: np.ndarray) -> List[PredictionOutput]:
+        """Score a feature matrix and build outputs in row order"""
+        if self.inference is None:
             raise RuntimeError("Models not loaded properly")
         
         try:
-            # Prepare and scale input
-            input_array = self._prepare_input(patient_data)
-            input_scaled = self.scaler.transform(input_array)
-            
-            # Get prediction
-            prediction = int(self.model.predict(input_scaled)[0])
-            
-            # Get probabilities
-            try:
-                probabilities = self.model.predict_proba(input_scaled)[0]
-                prob_negative = float(probabilities[0] * 100)
-                prob_positive = float(probabilities[1] * 100)
-            except AttributeError:
-                # Model doesn't support probability
-                prob_positive = 100.0 if prediction == 1 else 0.0
-                prob_negative = 100.0 - prob_positive
+            predictions, prob_negative, prob_positive, risk_codes = self.score_matrix(input_array)
+            timer = StageTimer()
+            messages = self._message_table[predictions, risk_codes]
             
-            # Determine risk level
-            risk_level = self._determine_risk_level(prob_positive)
-            is_diabetic = prediction == 1
-            
-            # Generate message
-            message = self._generate_message(is_diabetic, risk_level)
-            
-            return PredictionOutput(
-                prediction=prediction,
-                is_diabetic=is_diabetic,
-                probability_negative=prob_negative,
-                probability_positive=prob_positive,
-                risk_level=risk_level,
-                message=message
-            )
+            # Every field already has its exact type, so skip re-validation
+            outputs = [
+                PredictionOutput.model_construct(
+                    prediction=prediction,
+                    is_diabetic=prediction == 1,
+                    probability_negative=negative,
+                    probability_positive=positive,
+                    risk_level=RISK_LEVELS[code],
+                    message=message
+                )
+                for prediction, negative, positive, code, message in zip(
+                    predictions.tolist(), prob_negative.tolist(), prob_positive.tolist(),
+                    risk_codes.tolist(), messages.tolist()
+                )
+            ]
+            timer.lap(metrics.BUILD_OUTPUT)
+            return outputs
         except Exception as e:
             raise RuntimeError(f"Prediction error: {str(e)}")
+    
+    def with_risk_factors(self, patients: BatchInputs,
+                          outputs: Sequence[PredictionOutput]) -> List[PredictionOutput]:
+        """Copies of `outputs` with `risk_factors` filled in from the rule table
+        
+        Outputs may be shared through the cache, so they are copied rather than modified.
+        """
+        from .risk_factors import risk_factor_table
+        
+        factors = risk_factor_table.factors(self._prepare_batch(patients))
+        return [
+            output.model_copy(update={"risk_factors": row_factors})
+            for output, row_factors in zip(outputs, factors)
+        ]
+    
+    def explain_matrix(self, input_array: np.ndarray) -> Tuple[float, np.ndarray]:
+        """(base probability, N x 8 per-feature contributions), both in percentage points"""
+        if self.explainer is None:
+            raise RuntimeError("Explanations are not enabled for this model")
+        bias, contributions = self.explainer.explain(self._preprocess(input_array))
+        return bias * 100, contributions * 100
+    
+    def with_explanations(self, patients: BatchInputs,
+                          outputs: Sequence[PredictionOutput]) -> List[PredictionOutput]:
+        """Copies of `outputs` with `explanation` filled in"""
+        base, contributions = self.explain_matrix(self._prepare_batch(patients))
+        return [
+            output.model_copy(update={"explanation": Explanation.model_construct(
+                base_probability=base, contributions=dict(zip(FEATURE_NAMES, row)),
+            )})
+            for output, row in zip(outputs, contributions.tolist())
+        ]
+    
+    def encode_output(self, output: PredictionOutput) -> bytes:
+        """JSON encoding of a prediction, equivalent to FastAPI's response serialization"""
+        fragments = self._json_fragments.get((output.prediction, output.risk_level))
+        if fragments is None or output.risk_factors is not None or output.explanation is not None:
+            return output.model_dump_json(exclude_none=True).encode()
+        head, tail = fragments
+        return b"".join((
+            head, to_json(output.probability_negative),
+            b',"probability_positive":', to_json(output.probability_positive), tail,
+        ))
+    
+    def encode_batch(self, outputs: Sequence[PredictionOutput], extra: Optional[dict] = None) -> bytes:
+        """JSON encoding of a BatchPredictionOutput for `outputs`, plus any `extra` fields"""
+        encode = self.encode_output
+        return b"".join((
+            b'{"count":', str(len(outputs)).encode(), b',"predictions":[',
+            b",".join([encode(output) for output in outputs]), b"]",
+            *(b",%s:%s" % (to_json(name), to_json(value)) for name, value in (extra or {}).items()),
+            b"}",
+        ))
+    
+    def warm_up(self, batch_size: int = 1) -> None:
+        """Run a synthetic inference to prime the engine and output code paths"""
+        self._predict_matrix(self._synthetic_inputs(batch_size, seed=batch_size))
+    
+    def lookup(self, patient_data: PatientInput) -> Optional[PredictionOutput]:
+        """Return a cached prediction for this exact feature vector, if any"""
+        if self.cache is None:
+            return None
+        input_array = self._prepare_input(patient_data)
+        result = self.cache.get(self.model_version, tuple(input_array[0].tolist()))
+        if result is not None and self.drift is not None:
+            self.drift.observe(input_array, np.array([result.probability_positive]))
+        return result
+    
+    def predict(self, patient_data: PatientInput) -> PredictionOutput:
+        """Make a prediction for given patient data, through the cache"""
+        result = self.lookup(patient_data)
+        if result is None:
+            result = self.predict_and_cache([patient_data])[0]
+        return result
+    
+    def predict_batch(self, patients: BatchInputs) -> List[PredictionOutput]:
+        """Make predictions for many patients with one scaling and inference pass
+        
+        Batches bypass the prediction cache: per-row lookups cost more than
+        scoring the rows, and storing them would evict the single-row
+        /predict entries the cache is for.
+        """
+        if not len(patients):
+            return []
+        return self._predict_matrix(self._prepare_batch(patients))
+    
+    def predict_and_cache(self, patients: BatchInputs) -> List[PredictionOutput]:
+        """predict_batch for single-row requests that already missed `lookup`, storing their results
+
+        Used by the /predict micro-batcher, whose batches are at most
+        BATCH_MAX_SIZE coalesced requests.
+        """
+        if not len(patients):
+            return []
+        input_array = self._prepare_batch(patients)
+        results = self._predict_matrix(input_array)
+        if self.cache is not None:
+            # Canonical key: the float64 feature vector the model actually sees
+            for row, result in zip(input_array.tolist(), results):
+                self.cache.put(self.model_version, tuple(row), result)
+        return results
@@ -0,0 +1,38 @@
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from .prediction_service import FEATURE_NAMES
+
+# Features where 0 is physiologically impossible and means "not measured"
+ZERO_AS_MISSING = ("glucose", "blood_pressure", "skin_thickness", "insulin", "bmi")
+
+
+class ZeroMedianImputer(TransformerMixin, BaseEstimator):
+    """Replace zeros in the given columns with that column's training median.
+
+    Medians are computed over the non-zero training values only, like the
+    notebook's cleaning step, but without splitting by Outcome: the label is
+    not available at prediction time, so the exported pipeline must impute the
+    same way for every row. `transform` is a single vectorized `np.where`.
+    """
+
+    def __init__(self, columns=tuple(FEATURE_NAMES.index(name) for name in ZERO_AS_MISSING)):
+        self.columns = columns
+
+    def fit(self, X, y=None):
+        X = np.asarray(X, dtype=np.float64)
+        columns = list(self.columns)
+        values = X[:, columns]
+        observed = np.where(values == 0, np.nan, values)
+        medians = np.nanmedian(observed, axis=0)
+        # A column with no observed values keeps its zeros
+        self.medians_ = np.where(np.isnan(medians), 0.0, medians)
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        columns = list(self.columns)
+        values = X[:, columns]
+        X[:, columns] = np.where(values == 0, self.medians_, values)
+        return X
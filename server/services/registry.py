@@ -0,0 +1,120 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+SERVER_DIR = Path(__file__).parent.parent
+
+
+class ModelPathError(ValueError):
+    """Raised when a reload names an artifact outside the allowed locations"""
+
+
+class ModelReloadConflict(RuntimeError):
+    """Raised when a reload could not be served by the running inference workers"""
+
+
+@dataclass
+class ModelSpec:
+    """Where to find one model version's artifacts (paths relative to server/)
+
+    scaler_path is None when model_path is an exported pipeline that
+    includes its own preprocessing.
+    """
+    version: str
+    model_path: str
+    scaler_path: Optional[str] = None
+
+
+@dataclass
+class ModelEntry:
+    """A loaded model version with everything needed to serve it"""
+    spec: ModelSpec
+    service: Any
+    batcher: Any
+    load_seconds: float = 0.0
+    warmup_seconds: float = 0.0
+    loaded_at: float = field(default_factory=time.time)
+
+    def describe(self) -> dict:
+        return {
+            "version": self.spec.version,
+            "model": type(self.service.model).__name__,
+            "model_version": self.service.model_version,
+            "model_path": self.spec.model_path,
+            "scaler_path": self.spec.scaler_path,
+            "engine": self.service.engine,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "loaded_at": self.loaded_at,
+        }
+
+
+def parse_model_specs(text: str) -> Dict[str, ModelSpec]:
+    """Parse 'v1=model.pkl:scaler.pkl,v3=pipeline.pkl,...' into specs keyed by version"""
+    specs = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        version, _, paths = item.partition("=")
+        model_path, _, scaler_path = paths.partition(":")
+        if not version.strip() or not model_path.strip():
+            raise ValueError(f"Invalid model spec '{item}', expected version=model_path[:scaler_path]")
+        specs[version.strip()] = ModelSpec(version.strip(), model_path.strip(), scaler_path.strip() or None)
+    return specs
+
+
+def check_model_path(path: str, model_dir: str, configured: Iterable[str] = ()) -> str:
+    """Validate an artifact path requested at runtime (relative to server/)
+
+    Only paths already configured in MODEL_VERSIONS, or paths that resolve
+    (symlinks included) inside `model_dir`, are accepted. Artifacts are
+    unpickled on load, so anything else could run arbitrary code.
+    """
+    if Path(path).is_absolute():
+        raise ModelPathError(f"Model paths must be relative to the server directory, got '{path}'")
+    resolved = (SERVER_DIR / path).resolve()
+    if any(resolved == (SERVER_DIR / known).resolve() for known in configured):
+        return path
+    if not resolved.is_relative_to((SERVER_DIR / model_dir).resolve()):
+        raise ModelPathError(f"Model paths must be inside {model_dir}/, got '{path}'")
+    return path
+
+
+class ModelRegistry:
+    """Loaded model versions, swapped atomically on reload.
+
+    Readers take a reference to a `ModelEntry` and keep using it for the rest
+    of their request, so replacing a version never interrupts in-flight work:
+    new requests see the new entry as soon as the mapping is swapped, and the
+    old entry is released once its last request completes.
+    """
+
+    def __init__(self, default_version: str):
+        self.default_version = default_version
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, version: Optional[str] = None) -> Optional[ModelEntry]:
+        """Entry for `version` (the default version when None), or None if unknown"""
+        return self._entries.get(version or self.default_version)
+
+    def swap(self, entry: ModelEntry) -> Optional[ModelEntry]:
+        """Install `entry` for its version and return the entry it replaced"""
+        with self._lock:
+            entries = dict(self._entries)
+            previous = entries.get(entry.spec.version)
+            entries[entry.spec.version] = entry
+            self._entries = entries
+        return previous
+
+    def versions(self) -> List[str]:
+        return sorted(self._entries)
+
+    def entries(self) -> Dict[str, ModelEntry]:
+        return dict(self._entries)
+
+    def describe(self) -> dict:
+        return {
+            "default_version": self.default_version,
+            "models": [self._entries[version].describe() for version in self.versions()],
+        }
@@ -0,0 +1,119 @@
+import operator
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..schemas.diabetes import RiskFactor, RiskFactorKind
+from .prediction_service import FEATURE_NAMES
+
+
+@dataclass(frozen=True)
+class RiskRule:
+    """One threshold on one feature.
+
+    `op` is a comparison (">", ">=", "<", "<=") against `threshold`, or
+    "between" with an inclusive (low, high) tuple. Rules on the same feature
+    behave like an if/elif chain: a row is matched by at most the first of
+    them, in table order.
+    """
+    code: str
+    feature: str
+    op: str
+    threshold: Union[float, Tuple[float, float]]
+    kind: RiskFactorKind
+    description: str
+
+
+RISK = RiskFactorKind.RISK
+POSITIVE = RiskFactorKind.POSITIVE
+
+RULES = (
+    RiskRule("high_glucose", "glucose", ">", 125, RISK,
+             "High Glucose Level (>125 mg/dL) - Indicates potential diabetes"),
+    RiskRule("normal_glucose", "glucose", "<", 100, POSITIVE,
+             "Normal Glucose Level (<100 mg/dL)"),
+    RiskRule("obesity", "bmi", ">=", 30, RISK,
+             "Obesity (BMI >= 30) - Significantly increases diabetes risk"),
+    RiskRule("overweight", "bmi", ">=", 25, RISK,
+             "Overweight (BMI 25-29.9) - Moderate risk factor"),
+    RiskRule("healthy_bmi", "bmi", "between", (18.5, 24.9), POSITIVE,
+             "Healthy BMI (18.5-24.9 kg/m2)"),
+    RiskRule("age", "age", ">=", 45, RISK,
+             "Age Factor (>= 45 years) - Increased risk with age"),
+    RiskRule("elevated_blood_pressure", "blood_pressure", ">", 80, RISK,
+             "Elevated Blood Pressure (>80 mm Hg)"),
+    RiskRule("normal_blood_pressure", "blood_pressure", "between", (60, 80), POSITIVE,
+             "Normal Blood Pressure (60-80 mm Hg)"),
+    RiskRule("genetic_predisposition", "diabetes_pedigree_function", ">", 0.5, RISK,
+             "Genetic Predisposition (DPF >0.5) - Family history indicates higher risk"),
+    RiskRule("elevated_insulin", "insulin", ">", 200, RISK,
+             "Elevated Insulin (>200 uU/mL) - May indicate insulin resistance"),
+)
+
+_COMPARISONS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+class RiskFactorTable:
+    """Evaluates a rule table over a whole N x 8 feature matrix with NumPy masks"""
+
+    def __init__(self, rules: Sequence[RiskRule] = RULES):
+        self.rules = tuple(rules)
+        for rule in self.rules:
+            if rule.feature not in FEATURE_NAMES:
+                raise ValueError(f"Rule '{rule.code}' uses unknown feature '{rule.feature}'")
+            if rule.op != "between" and rule.op not in _COMPARISONS:
+                raise ValueError(f"Rule '{rule.code}' has unknown operator '{rule.op}'")
+        self._columns = [FEATURE_NAMES.index(rule.feature) for rule in self.rules]
+        self._factors = [
+            RiskFactor(code=rule.code, kind=rule.kind, description=rule.description) for rule in self.rules
+        ]
+
+    def evaluate(self, input_array: np.ndarray) -> np.ndarray:
+        """Boolean matrix of shape (n_rows, n_rules): which rules each row matches"""
+        input_array = np.asarray(input_array, dtype=np.float64)
+        matched = np.zeros((len(input_array), len(self.rules)), dtype=bool)
+        # Rows already matched by an earlier rule on the same feature (the elif chain)
+        claimed = {}
+        for index, (rule, column) in enumerate(zip(self.rules, self._columns)):
+            values = input_array[:, column]
+            if rule.op == "between":
+                low, high = rule.threshold
+                mask = (values >= low) & (values <= high)
+            else:
+                mask = _COMPARISONS[rule.op](values, rule.threshold)
+            taken = claimed.get(rule.feature)
+            if taken is not None:
+                mask &= ~taken
+                taken |= mask
+            else:
+                claimed[rule.feature] = mask.copy()
+            matched[:, index] = mask
+        return matched
+
+    def factors(self, input_array: np.ndarray) -> List[List[RiskFactor]]:
+        """Matched factors per row, in table order
+
+        Rows with the same pattern of matches share one (read-only) list, so
+        the Python work is per distinct pattern rather than per row.
+        """
+        matched = self.evaluate(input_array)
+        if not len(matched):
+            return []
+        codes = matched.astype(np.int64) @ (1 << np.arange(len(self.rules), dtype=np.int64))
+        patterns, inverse = np.unique(codes, return_inverse=True)
+        lists = [
+            [factor for bit, factor in enumerate(self._factors) if pattern >> bit & 1]
+            for pattern in patterns.tolist()
+        ]
+        return [lists[index] for index in inverse.tolist()]
+
+    def describe(self, input_array: np.ndarray) -> Tuple[List[str], List[str]]:
+        """(risk factor descriptions, positive indicator descriptions) for a single row"""
+        row = self.evaluate(np.atleast_2d(input_array))[0]
+        risk = [rule.description for rule, hit in zip(self.rules, row) if hit and rule.kind == RISK]
+        positive = [rule.description for rule, hit in zip(self.rules, row) if hit and rule.kind == POSITIVE]
+        return risk, positive
+
+
+risk_factor_table = RiskFactorTable()
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+from ..config import ServerConfig
+from .registry import (
+    SERVER_DIR,
+    ModelEntry,
+    ModelReloadConflict,
+    ModelRegistry,
+    ModelSpec,
+    check_model_path,
+    parse_model_specs,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ServingState:
+    """Everything the prediction routes need, built during application startup.
+
+    Importing the routes is cheap: NumPy, joblib and sklearn are only imported
+    when `start()` loads the artifacts, which runs in the background from the
+    FastAPI lifespan so the server can bind its port (and answer liveness
+    probes) immediately. The service reports ready only once every configured
+    model version is loaded and a warm-up pass has exercised the inference
+    code paths.
+    """
+
+    WARMUP_BATCH_SIZES = (1, 8, 64)
+    WARMUP_ROUNDS = 3
+
+    def __init__(self, config: ServerConfig):
+        self.config = config
+        self.cache = None
+        self.registry = ModelRegistry(config.DEFAULT_MODEL_VERSION)
+        self.pool = None
+        self.audit = None
+        self.status = "starting"
+        self.error: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self._reload_lock = asyncio.Lock()
+        self._retiring = set()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def _build_entry(self, spec: ModelSpec) -> ModelEntry:
+        """Load, warm up and wrap one model version (blocking)"""
+        from .batcher import MicroBatcher
+        from .prediction_service import PredictionService
+
+        config = self.config
+        start = time.perf_counter()
+        service = PredictionService(
+            model_path=spec.model_path,
+            scaler_path=spec.scaler_path,
+            engine=config.INFERENCE_ENGINE,
+            cache=self.cache,
+            explain=config.EXPLANATIONS,
+            parity_check=config.PARITY_CHECK,
+        )
+        loaded = time.perf_counter()
+        for batch_size in self.WARMUP_BATCH_SIZES:
+            for _ in range(self.WARMUP_ROUNDS):
+                service.warm_up(batch_size)
+        warmed = time.perf_counter()
+        if config.DRIFT_MONITORING:
+            from .drift import DriftMonitor
+
+            baseline = Path(__file__).parent.parent / config.DRIFT_BASELINE
+            service.drift = DriftMonitor.from_csv(baseline, service, config.DRIFT_BINS)
+        logger.info("Model %s (%s) loaded in %.3fs, warmed up in %.3fs",
+                    spec.version, service.model_version, loaded - start, warmed - loaded)
+
+        # Concurrent /predict calls are coalesced and scored off the event loop
+        batcher = MicroBatcher(
+            service.predict_and_cache,
+            max_batch_size=config.BATCH_MAX_SIZE,
+            max_wait_us=config.BATCH_MAX_WAIT_US,
+            max_concurrent_batches=max(1, config.INFERENCE_WORKERS),
+        )
+        return ModelEntry(
+            spec=spec,
+            service=service,
+            batcher=batcher,
+            load_seconds=loaded - start,
+            warmup_seconds=warmed - loaded,
+        )
+
+    def _load(self) -> None:
+        from .cache import PredictionCache
+
+        config = self.config
+        # Shared across model versions; entries are namespaced by model version
+        self.cache = PredictionCache(
+            max_size=config.CACHE_MAX_SIZE,
+            ttl_seconds=config.CACHE_TTL_SECONDS,
+        ) if config.CACHE_MAX_SIZE > 0 else None
+        self.load_seconds = self.warmup_seconds = 0.0
+        for spec in parse_model_specs(config.MODEL_VERSIONS).values():
+            entry = self._build_entry(spec)
+            self.load_seconds += entry.load_seconds
+            self.warmup_seconds += entry.warmup_seconds
+            self.registry.swap(entry)
+        if self.registry.get() is None:
+            raise RuntimeError(f"Default model version '{self.registry.default_version}' is not configured")
+
+    def _start_pool(self, entries) -> None:
+        from .workers import InferencePool
+
+        # Forked once, after warm-up and before any traffic is admitted, so workers
+        # inherit loaded and primed models; reloads publish to these same workers
+        services = {version: entry.service for version, entry in entries.items()}
+        self.pool = InferencePool(self.config.INFERENCE_WORKERS).start(services)
+
+    def _start_audit(self) -> None:
+        from .audit import AuditLog
+
+        config = self.config
+        self.audit = AuditLog(
+            Path(config.AUDIT_LOG),
+            max_queue_rows=config.AUDIT_QUEUE_MAX_ROWS,
+            batch_rows=config.AUDIT_BATCH_ROWS,
+            flush_interval=config.AUDIT_FLUSH_INTERVAL_SECONDS,
+            full_policy=config.AUDIT_FULL_POLICY,
+        ).start()
+
+    async def start(self) -> None:
+        """Load, warm up and fork workers; failures are logged and reported by readiness"""
+        try:
+            self.status = "loading"
+            await asyncio.to_thread(self._load)
+            if self.config.INFERENCE_WORKERS > 0:
+                # Waiting for the workers (and gc.collect) must not block the event loop
+                await asyncio.to_thread(self._start_pool, self.registry.entries())
+            if self.config.AUDIT_LOG:
+                self._start_audit()
+            self.status = "ready"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            logger.exception("Failed to initialize prediction service")
+
+    async def reload(self, version: str, model_path: Optional[str] = None,
+                     scaler_path: Optional[str] = None) -> ModelEntry:
+        """Load a (new) artifact for `version` in the background and swap it in atomically
+
+        Requests already holding the previous entry finish on it; nothing is
+        dropped. Inference workers are never re-forked from the live process:
+        a memory-mapped artifact is published to the running workers, which
+        map it on their next batch. While workers are running, anything else
+        (a .pkl) raises ModelReloadConflict before loading, rather than
+        quietly losing the workers for that version.
+        """
+        async with self._reload_lock:
+            current = self.registry.get(version)
+            if current is None and not model_path:
+                raise ValueError(f"Unknown model version '{version}': model_path is required")
+            configured = [path for spec in parse_model_specs(self.config.MODEL_VERSIONS).values()
+                          for path in (spec.model_path, spec.scaler_path) if path]
+            for path in (model_path, scaler_path):
+                if path:
+                    check_model_path(path, self.config.MODEL_DIR, configured)
+            spec = ModelSpec(
+                version=version,
+                model_path=model_path or current.spec.model_path,
+                scaler_path=scaler_path or (current.spec.scaler_path if current is not None else None),
+            )
+            if self.pool is not None:
+                from .artifacts import is_artifact
+
+                if not is_artifact(SERVER_DIR / spec.model_path):
+                    raise ModelReloadConflict(
+                        f"'{spec.model_path}' is not a memory-mapped artifact, so the {self.pool.workers} "
+                        f"inference workers cannot load it; export it with `python -m server.cli export` "
+                        f"and reload the .forest directory"
+                    )
+            entry = await asyncio.to_thread(self._build_entry, spec)
+
+            if self.pool is not None:
+                self.pool.publish(version, entry.service)
+            previous = self.registry.swap(entry)
+            if previous is not None:
+                # The workers now serve the new release under this version, so
+                # anything still queued for the old model is scored in-process,
+                # then its batcher stops once drained
+                previous.service.pool = None
+                retiring = asyncio.create_task(previous.batcher.close())
+                self._retiring.add(retiring)
+                retiring.add_done_callback(self._retiring.discard)
+            logger.info("Model version %s now serves %s", version, entry.service.model_version)
+            return entry
+
+    async def stop(self) -> None:
+        """Stop worker processes and flush the audit log"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+        if self.audit is not None:
+            await asyncio.to_thread(self.audit.close)
+            self.audit = None
+
+    def health(self) -> dict:
+        """Readiness details, including load and warm-up timings"""
+        default = self.registry.get()
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "model_version": default.service.model_version if default is not None else None,
+            "model_versions": self.registry.versions(),
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "uptime_seconds": time.monotonic() - self.started_at,
+            "error": self.error,
+        }
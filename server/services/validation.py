@@ -0,0 +1,106 @@
+"""Array-level validation of batch inputs against the PatientInput constraints.
+
+The bounds are read once from the PatientInput field metadata, so the schema
+stays the single source of truth; a whole N x 8 matrix is then checked with
+a few NumPy comparisons instead of one pydantic model per row. Failures are
+reported per field as lists of row indices.
+"""
+from operator import itemgetter
+from typing import Dict, NamedTuple
+
+import numpy as np
+
+from ..schemas.diabetes import BatchPredictionInput, PatientInput
+from .prediction_service import FEATURE_NAMES, _get_features
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+# Row indices listed per field in a report; `count` always has the full number
+MAX_REPORTED_ROWS = 1000
+
+_get_items = itemgetter(*FEATURE_NAMES)
+
+
+def field_bounds() -> np.ndarray:
+    """(2, 8) array of the PatientInput ge/le bounds in model feature order"""
+    bounds = np.empty((2, len(FEATURE_NAMES)))
+    for index, name in enumerate(FEATURE_NAMES):
+        for constraint in PatientInput.model_fields[name].metadata:
+            if hasattr(constraint, "ge"):
+                bounds[0, index] = constraint.ge
+            if hasattr(constraint, "le"):
+                bounds[1, index] = constraint.le
+    return bounds
+
+
+BOUNDS = field_bounds()
+# Columns declared as int, which (like pydantic) must not have a fractional part
+INTEGER_COLUMNS = np.array([PatientInput.model_fields[name].annotation is int for name in FEATURE_NAMES])
+CONSTRAINTS = {
+    name: f"{'integer ' if integer else ''}{low:g} <= {name} <= {high:g}"
+    for name, low, high, integer in zip(FEATURE_NAMES, BOUNDS[0], BOUNDS[1], INTEGER_COLUMNS)
+}
+
+
+class MatrixValidation(NamedTuple):
+    """Outcome of `validate_matrix`"""
+    valid: np.ndarray
+    errors: Dict[str, np.ndarray]
+
+    @property
+    def invalid_rows(self) -> int:
+        return len(self.valid) - int(np.count_nonzero(self.valid))
+
+    def report(self, max_rows: int = MAX_REPORTED_ROWS, first_row: int = 0) -> dict:
+        """JSON-ready summary: the failed constraint, count and (first) row indices per field
+
+        `first_row` is added to the row indices, for matrices that are one
+        chunk of a larger input.
+        """
+        return {
+            "rows": len(self.valid),
+            "invalid_rows": self.invalid_rows,
+            "errors": {
+                name: {"constraint": CONSTRAINTS[name], "count": len(rows),
+                       "rows": (rows[:max_rows] + first_row).tolist()}
+                for name, rows in self.errors.items()
+            },
+        }
+
+
+def validate_matrix(matrix: np.ndarray) -> MatrixValidation:
+    """Check every value of an N x 8 feature matrix against the schema bounds
+
+    NaN and infinite values fail the range check of their field.
+    """
+    ok = (matrix >= BOUNDS[0]) & (matrix <= BOUNDS[1])
+    integers = matrix[:, INTEGER_COLUMNS]
+    ok[:, INTEGER_COLUMNS] &= integers == np.floor(integers)
+    valid = ok.all(axis=1)
+    errors = {}
+    if not valid.all():
+        for column in np.flatnonzero(~ok.all(axis=0)).tolist():
+            errors[FEATURE_NAMES[column]] = np.flatnonzero(~ok[:, column])
+    return MatrixValidation(valid, errors)
+
+
+def parse_batch(body: bytes) -> np.ndarray:
+    """N x 8 matrix from a BatchPredictionInput JSON body, without per-row models
+
+    Value ranges are left to `validate_matrix`. Bodies that do not have the
+    expected shape (missing fields, strings, nulls, malformed JSON, ...) are
+    re-parsed with BatchPredictionInput, so they fail with the same
+    pydantic.ValidationError as before.
+    """
+    try:
+        matrix = np.array([_get_items(patient) for patient in _loads(body)["patients"]], dtype=np.float64)
+        # NumPy turns null into NaN, which pydantic would reject as a type error
+        if matrix.ndim == 2 and len(matrix) and not np.isnan(matrix).any():
+            return matrix
+    except (ValueError, TypeError, KeyError):
+        pass
+    batch = BatchPredictionInput.model_validate_json(body)
+    return np.array([_get_features(patient) for patient in batch.patients], dtype=np.float64)
@@ -0,0 +1,139 @@
+import gc
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from . import metrics
+from .artifacts import is_artifact
+
+
+# Services visible to worker processes. Set in the parent before forking, so
+# every worker inherits the already-loaded models through copy-on-write pages
+# instead of unpickling its own copy.
+_services: Dict[str, object] = {}
+# Release (generation, artifact path) each worker has loaded per key since the fork
+_loaded: Dict[str, Tuple[int, str]] = {}
+_started = None
+
+
+def _init_worker() -> None:
+    """Runs first in every forked worker
+
+    Locks held by other parent threads at fork time stay locked forever in the
+    child, so give the metrics fresh ones. The cache and drift monitor belong
+    to the parent; workers only score.
+    """
+    metrics.reset_locks()
+    for service in _services.values():
+        service.cache = None
+        service.drift = None
+        service.pool = None
+
+
+def _worker_pid() -> int:
+    # Every worker must reach the barrier, so each one reports its pid exactly once
+    _started.wait(timeout=30)
+    return os.getpid()
+
+
+def _service(key: str, release: Optional[Tuple[int, str]]):
+    """The service for `key`, memory-mapping a newly published artifact on first use"""
+    if release is not None and _loaded.get(key) != release:
+        from .prediction_service import PredictionService
+
+        _services[key] = PredictionService(model_path=release[1], scaler_path=None)
+        _loaded[key] = release
+    return _services[key]
+
+
+def _score_in_worker(key: str, release, input_array: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return _service(key, release)._score_local(input_array)
+
+
+def _score_matrix_in_worker(key: str, release, input_array: np.ndarray):
+    return _service(key, release).score_matrix(input_array, local=True)
+
+
+class InferencePool:
+    """Process pool for inference, forked once after the models are loaded.
+
+    Workers share the parent's model arrays read-only: the parent freezes its
+    heap (`gc.freeze`) right before forking, so garbage collection in the
+    workers does not write to, and thereby copy, the inherited pages. Only the
+    feature matrix and the result arrays cross the process boundary.
+
+    The pool is never re-forked. A model reloaded later is `publish`ed as a
+    memory-mapped artifact path; each worker maps it on its next batch, so
+    all processes share the new arrays through the page cache.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.services: Dict[str, object] = {}
+        self.releases: Dict[str, Tuple[int, str]] = {}
+        self.pids = []
+        self._generation = 0
+
+    def start(self, services: Dict[str, object]) -> "InferencePool":
+        """Publish `services` to the workers and fork them"""
+        global _started
+        context = multiprocessing.get_context("fork")
+        self.services = dict(services)
+        _services.clear()
+        _services.update(services)
+        _started = context.Barrier(self.workers)
+        gc.collect()
+        gc.freeze()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                            initializer=_init_worker)
+        # Fork every worker now, while the parent holds nothing but the models
+        futures = [self.executor.submit(_worker_pid) for _ in range(self.workers)]
+        self.pids = sorted({future.result() for future in futures})
+        for key, service in services.items():
+            service.pool = self
+            service.pool_key = key
+        return self
+
+    def publish(self, key: str, service) -> bool:
+        """Serve `service` under `key` from the running workers, without re-forking
+
+        Only memory-mapped artifacts (see services/artifacts.py) can be handed
+        over; returns False for anything else (ServingState.reload refuses
+        those while the pool runs).
+        """
+        if not is_artifact(service.model_path):
+            return False
+        self._generation += 1
+        self.releases[key] = (self._generation, str(Path(service.model_path).resolve()))
+        self.services[key] = service
+        service.pool = self
+        service.pool_key = key
+        return True
+
+    def submit(self, key: str, input_array: np.ndarray) -> Future:
+        """Queue a feature matrix for scoring in a worker; the future yields `Scores`"""
+        return self.executor.submit(_score_matrix_in_worker, key, self.releases.get(key), input_array)
+
+    def score(self, key: str, input_array: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score a feature matrix in a worker process"""
+        executor = self.executor
+        if executor is not None:
+            try:
+                future = executor.submit(_score_in_worker, key, self.releases.get(key), input_array)
+            except RuntimeError:
+                # Pool shut down (server stopping) while this batch was in flight
+                future = None
+            if future is not None:
+                return future.result()
+        return self.services[key]._score_local(input_array)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers after in-flight batches complete"""
+        executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,177 @@
+"""Scripted training for the diabetes model.
+
+Reproduces the notebook's tuned random forest as one exported sklearn
+Pipeline: zero-value imputation -> StandardScaler -> RandomForestClassifier.
+The grid search runs on all cores. Fitted preprocessing steps are cached on
+disk with joblib.Memory, so every candidate (and every later run on the same
+data) reuses them instead of refitting. Each run writes a versioned pipeline
+plus a JSON metadata file with the features, metrics and training time.
+
+Usage (from the repository root):
+    python -m server.cli train --version v3
+    DIABETES_MODEL_VERSIONS="...,v3=aiModels/diabetes_pipeline_v3.pkl" uvicorn server.main:app
+"""
+import hashlib
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .services.bulk import feature_columns
+from .services.prediction_service import FEATURE_NAMES
+
+SERVER_DIR = Path(__file__).parent
+DATASET_PATH = SERVER_DIR / "AI" / "diabetes.csv"
+OUTPUT_DIR = SERVER_DIR / "aiModels"
+CACHE_DIR = Path(tempfile.gettempdir()) / "diabetes-training-cache"
+TARGET_COLUMN = "Outcome"
+
+# Same search space as the notebook
+PARAM_GRID = {
+    "model__n_estimators": [50, 100, 200],
+    "model__max_depth": [None, 10, 20, 30],
+    "model__min_samples_split": [2, 5, 10],
+    "model__min_samples_leaf": [1, 2, 4],
+}
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+
+
+def load_dataset(path: Path = DATASET_PATH):
+    """(X, y) from the training CSV, with X columns in FEATURE_NAMES order"""
+    with open(path, encoding="utf-8") as handle:
+        header = handle.readline().strip().split(",")
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    X = data[:, feature_columns(header)]
+    y = data[:, header.index(TARGET_COLUMN)].astype(int)
+    return X, y
+
+
+def build_pipeline(cache_dir: Optional[Path] = CACHE_DIR):
+    from joblib import Memory
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    from .services.preprocessing import ZeroMedianImputer
+
+    return Pipeline(
+        [
+            ("impute", ZeroMedianImputer()),
+            ("scale", StandardScaler()),
+            ("model", RandomForestClassifier(random_state=RANDOM_STATE)),
+        ],
+        memory=Memory(cache_dir, verbose=0) if cache_dir is not None else None,
+    )
+
+
+def evaluate(model, X, y) -> dict:
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+
+    predicted = model.predict(X)
+    probability = model.predict_proba(X)[:, 1]
+    return {
+        "accuracy": accuracy_score(y, predicted),
+        "precision": precision_score(y, predicted),
+        "recall": recall_score(y, predicted),
+        "f1": f1_score(y, predicted),
+        "roc_auc": roc_auc_score(y, probability),
+    }
+
+
+def train(version: str, dataset_path: Path = DATASET_PATH, output_dir: Path = OUTPUT_DIR,
+          cache_dir: Optional[Path] = CACHE_DIR, n_jobs: int = -1, cv: int = 5,
+          param_grid: Optional[dict] = None, force: bool = False) -> dict:
+    """Run the search, export the best pipeline and return its metadata"""
+    import joblib
+    import sklearn
+    from sklearn.model_selection import GridSearchCV, train_test_split
+
+    output_dir = Path(output_dir)
+    pipeline_path = output_dir / f"diabetes_pipeline_{version}.pkl"
+    metadata_path = pipeline_path.with_suffix(".json")
+    if pipeline_path.exists() and not force:
+        raise FileExistsError(f"{pipeline_path} already exists; choose another version or pass --force")
+
+    X, y = load_dataset(dataset_path)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y,
+    )
+
+    search = GridSearchCV(
+        build_pipeline(cache_dir),
+        param_grid or PARAM_GRID,
+        cv=cv,
+        scoring="roc_auc",
+        n_jobs=n_jobs,
+    )
+    start = time.perf_counter()
+    search.fit(X_train, y_train)
+    search_seconds = time.perf_counter() - start
+
+    best = search.best_estimator_
+    # The exported pipeline must not point at the training cache
+    best.set_params(memory=None)
+    test_metrics = evaluate(best, X_test, y_test)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump(best, pipeline_path)
+    metadata = {
+        "version": version,
+        "artifact": pipeline_path.name,
+        "sha256": hashlib.sha256(pipeline_path.read_bytes()).hexdigest(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "features": list(FEATURE_NAMES),
+        "steps": [name for name, _ in best.steps],
+        "imputed_medians": dict(zip(
+            [FEATURE_NAMES[column] for column in best.named_steps["impute"].columns],
+            best.named_steps["impute"].medians_.tolist(),
+        )),
+        "best_params": {name.split("__", 1)[1]: value for name, value in search.best_params_.items()},
+        "cv_folds": cv,
+        "cv_roc_auc": search.best_score_,
+        "candidates": len(search.cv_results_["params"]),
+        "test_metrics": test_metrics,
+        "train_rows": len(X_train),
+        "test_rows": len(X_test),
+        "dataset": {
+            "path": str(dataset_path),
+            "sha256": hashlib.sha256(Path(dataset_path).read_bytes()).hexdigest(),
+        },
+        "training_seconds": search_seconds,
+        "n_jobs": n_jobs,
+        "python": platform.python_version(),
+        "sklearn": sklearn.__version__,
+    }
+    metadata_path.write_text(json.dumps(metadata, indent=2) + "\n")
+    return metadata
+
+
+def main(args) -> int:
+    """Entry point for `python -m server.cli train`"""
+    version = args.version or time.strftime("v%Y%m%d%H%M%S")
+    try:
+        metadata = train(
+            version=version,
+            dataset_path=Path(args.data),
+            output_dir=Path(args.output_dir),
+            cache_dir=None if args.no_cache else Path(args.cache_dir or CACHE_DIR),
+            n_jobs=args.n_jobs,
+            cv=args.cv,
+            force=args.force,
+        )
+    except FileExistsError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+
+    print(f"✓ Trained {version} in {metadata['training_seconds']:.1f}s "
+          f"({metadata['candidates']} candidates x {metadata['cv_folds']} folds)", file=sys.stderr)
+    print(f"✓ CV ROC-AUC {metadata['cv_roc_auc']:.4f}, test ROC-AUC {metadata['test_metrics']['roc_auc']:.4f}",
+          file=sys.stderr)
+    print(f"✓ Pipeline saved to {Path(args.output_dir) / metadata['artifact']}", file=sys.stderr)
+    return 0
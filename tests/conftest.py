@@ -0,0 +1,58 @@
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVER_DIR = ROOT / "server"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+MODEL_PATH = SERVER_DIR / "aiModels" / "diabetes_model_v2.pkl"
+SCALER_PATH = SERVER_DIR / "aiModels" / "scaler_rf_v2.pkl"
+DATASET_PATH = SERVER_DIR / "AI" / "diabetes.csv"
+
+
+@pytest.fixture(scope="session")
+def sklearn_model():
+    """The shipped v2 RandomForestClassifier and its StandardScaler"""
+    joblib = pytest.importorskip("joblib")
+    with warnings.catch_warnings():
+        # The artifacts were pickled with an older scikit-learn
+        warnings.simplefilter("ignore")
+        return joblib.load(MODEL_PATH), joblib.load(SCALER_PATH)
+
+
+@pytest.fixture(scope="session")
+def dataset() -> np.ndarray:
+    """The 8 feature columns of the training CSV"""
+    return np.loadtxt(DATASET_PATH, delimiter=",", skiprows=1, usecols=range(8))
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient for the app, once the models are loaded"""
+    from fastapi.testclient import TestClient
+    from server.main import app
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with TestClient(app) as test_client:
+            started = time.monotonic()
+            while test_client.get("/api/diabetes/health/ready").status_code != 200:
+                assert time.monotonic() - started < 60, "models did not load"
+                time.sleep(0.05)
+            yield test_client
+
+
+@pytest.fixture(scope="session")
+def service():
+    """PredictionService for the default v2 model (fused engine, no cache)"""
+    from server.services.prediction_service import PredictionService
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return PredictionService()
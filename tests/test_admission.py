@@ -0,0 +1,185 @@
+import asyncio
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from server.services.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    DeadlineMiddleware,
+    current_deadline,
+)
+
+PREFIX = "/api/diabetes/predict"
+
+
+def _app(controller=None):
+    """Small app with the server's middleware stack, a blocking predict route and a health probe"""
+    gate = asyncio.Event()
+
+    async def slow(request):
+        await gate.wait()
+        return JSONResponse({"deadline": current_deadline() is not None})
+
+    async def deadline(request):
+        return JSONResponse({"deadline": current_deadline() is not None})
+
+    async def stream(request):
+        async def chunks():
+            for index in range(5):
+                await asyncio.sleep(0)
+                yield f"{index}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    async def live(request):
+        return JSONResponse({"status": "alive"})
+
+    app = Starlette(routes=[
+        Route(f"{PREFIX}/slow", slow),
+        Route(f"{PREFIX}/deadline", deadline),
+        Route(f"{PREFIX}/stream", stream),
+        Route("/api/diabetes/health/live", live),
+    ])
+    if controller is not None:
+        app.add_middleware(AdmissionMiddleware, controller=controller, path_prefix=PREFIX)
+    app.add_middleware(DeadlineMiddleware, path_prefix=PREFIX)
+    return app, gate
+
+
+def _run(scenario, controller=None):
+    async def main():
+        app, gate = _app(controller)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await scenario(client, gate)
+    return asyncio.run(main())
+
+
+async def _until(condition):
+    for _ in range(1000):
+        if condition():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("condition never became true")
+
+
+def test_queue_full_is_rejected_with_429():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5, retry_after=3)
+
+    async def scenario(client, gate):
+        running = asyncio.create_task(client.get(f"{PREFIX}/slow"))
+        await _until(lambda: controller.active == 1)
+        queued = asyncio.create_task(client.get(f"{PREFIX}/slow"))
+        await _until(lambda: controller.stats()["queued"] == 1)
+        rejected = await client.get(f"{PREFIX}/slow")
+        gate.set()
+        return rejected, await running, await queued
+
+    rejected, running, queued = _run(scenario, controller)
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == "3"
+    assert running.status_code == queued.status_code == 200
+    assert controller.rejected_queue_full == 1
+    assert controller.active == 0
+
+
+def test_queue_timeout_is_rejected_with_503():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05, retry_after=2)
+
+    async def scenario(client, gate):
+        running = asyncio.create_task(client.get(f"{PREFIX}/slow"))
+        await _until(lambda: controller.active == 1)
+        timed_out = await client.get(f"{PREFIX}/slow")
+        gate.set()
+        await running
+        return timed_out
+
+    timed_out = _run(scenario, controller)
+    assert timed_out.status_code == 503
+    assert timed_out.headers["retry-after"] == "2"
+    assert controller.rejected_timeout == 1
+    assert controller.active == 0
+    assert controller.stats()["queued"] == 0
+
+
+def test_deadline_expiring_in_queue_is_rejected_with_504():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5)
+
+    async def scenario(client, gate):
+        running = asyncio.create_task(client.get(f"{PREFIX}/slow"))
+        await _until(lambda: controller.active == 1)
+        expired = await client.get(f"{PREFIX}/slow", headers={"X-Request-Timeout-Ms": "50"})
+        gate.set()
+        await running
+        return expired
+
+    expired = _run(scenario, controller)
+    assert expired.status_code == 504
+    assert "retry-after" not in expired.headers
+
+
+def test_health_probe_bypasses_admission():
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+
+    async def scenario(client, gate):
+        running = asyncio.create_task(client.get(f"{PREFIX}/slow"))
+        await _until(lambda: controller.active == 1)
+        shed = await client.get(f"{PREFIX}/deadline")
+        probe = await client.get("/api/diabetes/health/live")
+        gate.set()
+        await running
+        return shed, probe
+
+    shed, probe = _run(scenario, controller)
+    assert shed.status_code == 429
+    assert probe.status_code == 200
+    assert controller.admitted == 1
+
+
+def test_slot_released_after_streaming_response():
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+
+    async def scenario(client, gate):
+        responses = [await client.get(f"{PREFIX}/stream") for _ in range(3)]
+        return responses, controller.active
+
+    responses, active = _run(scenario, controller)
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert responses[0].text == "0\n1\n2\n3\n4\n"
+    assert active == 0
+    assert controller.admitted == 3
+
+
+def test_deadline_applies_without_admission_control():
+    async def scenario(client, gate):
+        return (
+            await client.get(f"{PREFIX}/deadline", headers={"X-Request-Timeout-Ms": "1000"}),
+            await client.get(f"{PREFIX}/deadline"),
+            await client.get(f"{PREFIX}/deadline", headers={"X-Request-Timeout-Ms": "0"}),
+            await client.get(f"{PREFIX}/deadline", headers={"X-Request-Timeout-Ms": "soon"}),
+        )
+
+    with_deadline, without, expired, malformed = _run(scenario)
+    assert with_deadline.json() == {"deadline": True}
+    assert without.json() == {"deadline": False}
+    assert expired.status_code == 504
+    assert malformed.status_code == 400
+
+
+def test_server_installs_deadline_middleware_when_admission_is_disabled(monkeypatch):
+    import importlib
+
+    import server.main
+    from server import config
+
+    monkeypatch.setattr(config.config, "ADMISSION_MAX_CONCURRENT", 0)
+    try:
+        app = importlib.reload(server.main).app
+        classes = [middleware.cls for middleware in app.user_middleware]
+        assert DeadlineMiddleware in classes
+        assert AdmissionMiddleware not in classes
+    finally:
+        monkeypatch.undo()
+        importlib.reload(server.main)
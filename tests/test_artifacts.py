@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from server.services import artifacts
+from server.services.artifacts import ArtifactError, export_forest, load_forest
+from server.services.forest_engine import ArrayForest
+
+
+@pytest.fixture
+def exported(tmp_path, sklearn_model):
+    model, scaler = sklearn_model
+    forest = ArrayForest.from_sklearn(model, scaler)
+    path = tmp_path / "model.forest"
+    export_forest(path, forest)
+    return path, forest
+
+
+def test_round_trip_is_memory_mapped_and_exact(exported, dataset):
+    path, forest = exported
+    loaded, _, _, _ = load_forest(path)
+    assert isinstance(loaded.threshold, np.memmap)
+    np.testing.assert_array_equal(loaded.predict_proba(dataset), forest.predict_proba(dataset))
+
+
+def test_load_does_not_hash_files(exported, monkeypatch):
+    path, _ = exported
+
+    def fail(_):
+        raise AssertionError("load_forest read a file in full to hash it")
+
+    monkeypatch.setattr(artifacts, "_sha256", fail)
+    load_forest(path)
+
+
+def test_verify_detects_changed_bytes(exported):
+    path, _ = exported
+    file_path = path / "threshold.npy"
+    data = bytearray(file_path.read_bytes())
+    data[-1] ^= 0xFF
+    file_path.write_bytes(bytes(data))
+    load_forest(path)
+    with pytest.raises(ArtifactError, match="Checksum mismatch"):
+        load_forest(path, verify=True)
+
+
+def test_load_rejects_truncated_files(exported):
+    path, _ = exported
+    file_path = path / "value.npy"
+    file_path.write_bytes(file_path.read_bytes()[:-8])
+    with pytest.raises(ArtifactError, match="bytes"):
+        load_forest(path)
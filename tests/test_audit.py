@@ -0,0 +1,111 @@
+import csv
+import threading
+import warnings
+
+import numpy as np
+import pytest
+
+from server.services.audit import AuditLog, AuditQueueFull, iter_audit
+from server.services.prediction_service import RISK_LEVELS
+
+
+def _record_scores(log, service, rows, route="/predict/stream", block=False):
+    scores = service.score_matrix(rows)
+    return log.record(route, "v2", service.model_version, 0.001, rows, scores, block=block), scores
+
+
+def test_records_are_flushed_and_read_back(tmp_path, service, dataset):
+    path = tmp_path / "audit.db"
+    log = AuditLog(path, batch_rows=100, flush_interval=60).start()
+    rows = dataset[:250]
+    expected = []
+    for start in range(0, len(rows), 50):
+        _, scores = _record_scores(log, service, rows[start:start + 50])
+        expected.append(scores.probability_positive)
+    # PredictionOutput objects from /predict and /predict/batch
+    predictions = service.predict_batch(dataset[250:260])
+    log.record("/predict/batch", "v2", service.model_version, None, dataset[250:260], predictions)
+    log.close()
+
+    assert log.stats()["written"] == 260
+    assert log.stats()["queued_rows"] == 0
+    chunks = list(iter_audit(path, chunk_size=64))
+    assert [len(chunk.ids) for chunk in chunks] == [64, 64, 64, 64, 4]
+    ids = np.concatenate([chunk.ids for chunk in chunks])
+    assert ids.tolist() == list(range(1, 261))
+    np.testing.assert_array_equal(np.concatenate([chunk.features for chunk in chunks]), dataset[:260])
+    np.testing.assert_array_equal(
+        np.concatenate([chunk.probability_positive for chunk in chunks]),
+        np.concatenate([*expected, [prediction.probability_positive for prediction in predictions]]),
+    )
+    levels = [level for chunk in chunks for level in chunk.risk_levels]
+    assert set(levels) <= {level.value for level in RISK_LEVELS}
+    assert {version for chunk in chunks for version in chunk.model_versions} == {service.model_version}
+
+
+def test_drop_policy_discards_when_full(tmp_path, service, dataset):
+    log = AuditLog(tmp_path / "audit.db", max_queue_rows=10, full_policy="drop")
+    assert _record_scores(log, service, dataset[:8])[0] is True
+    assert _record_scores(log, service, dataset[8:13])[0] is False
+    assert _record_scores(log, service, dataset[8:10])[0] is True
+    assert (log.stats()["dropped"], log.stats()["queued_rows"]) == (5, 10)
+
+
+def test_reject_policy_raises_when_full(tmp_path, service, dataset):
+    log = AuditLog(tmp_path / "audit.db", max_queue_rows=10, full_policy="reject")
+    _record_scores(log, service, dataset[:8])
+    with pytest.raises(AuditQueueFull):
+        _record_scores(log, service, dataset[8:13])
+    assert (log.stats()["rejected"], log.stats()["queued_rows"]) == (5, 8)
+
+
+def test_blocking_record_waits_for_the_writer(tmp_path, service, dataset):
+    path = tmp_path / "audit.db"
+    log = AuditLog(path, max_queue_rows=10, batch_rows=10, flush_interval=0.05, full_policy="reject").start()
+    _record_scores(log, service, dataset[:8])
+    waiter = threading.Thread(target=_record_scores, args=(log, service, dataset[8:13]), kwargs={"block": True})
+    waiter.start()
+    waiter.join(10)
+    assert not waiter.is_alive()
+    log.close()
+    assert (log.stats()["written"], log.stats()["rejected"]) == (13, 0)
+    assert sum(len(chunk.ids) for chunk in iter_audit(path)) == 13
+
+
+def test_full_policy_is_validated(tmp_path):
+    with pytest.raises(ValueError):
+        AuditLog(tmp_path / "audit.db", full_policy="block")
+
+
+def test_replay_reproduces_logged_predictions(tmp_path, service, dataset):
+    from server import cli
+
+    path = tmp_path / "audit.db"
+    log = AuditLog(path).start()
+    for start in range(0, 300, 100):
+        _record_scores(log, service, dataset[start:start + 100])
+    log.close()
+
+    output = tmp_path / "replay.csv"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        assert cli.main(["replay", str(path), "-o", str(output), "--model-version", "v2",
+                         "--engine", "fused", "--chunk-size", "128"]) == 0
+    with open(output, newline="") as handle:
+        replayed = list(csv.DictReader(handle))
+    assert [int(row["id"]) for row in replayed] == list(range(1, 301))
+    assert all(row["risk_level"] == row["new_risk_level"] for row in replayed)
+    np.testing.assert_array_equal([float(row["new_probability_positive"]) for row in replayed],
+                                  [float(row["probability_positive"]) for row in replayed])
+
+    since = tmp_path / "since.csv"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        assert cli.main(["replay", str(path), "-o", str(since), "--since-id", "250"]) == 0
+    assert len(since.read_text().splitlines()) == 1 + 50
+
+
+def test_replay_of_a_missing_log_fails(tmp_path):
+    from server import cli
+
+    assert cli.main(["replay", str(tmp_path / "missing.db")]) == 1
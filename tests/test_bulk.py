@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pytest
+
+from server.services import bulk
+from server.services.prediction_service import FEATURE_NAMES
+
+CSV_HEADER = b"Pregnancies,Glucose,BloodPressure,SkinThickness,Insulin,BMI,DiabetesPedigreeFunction,Age,Outcome\n"
+ROW = b"6,148,72,35,0,33.6,0.627,50,1\n"
+
+
+def _feed_all(chunker, data: bytes, block_size: int):
+    chunks = []
+    for start in range(0, len(data), block_size):
+        chunks.extend(chunker.feed(data[start:start + block_size]))
+    chunks.extend(chunker.close())
+    return chunks
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1 << 20])
+def test_chunks_do_not_depend_on_block_boundaries(block_size):
+    chunks = _feed_all(bulk.RowChunker("csv", chunk_size=4), CSV_HEADER + ROW * 10, block_size)
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    np.testing.assert_array_equal(np.concatenate(chunks)[0], [6, 148, 72, 35, 0, 33.6, 0.627, 50])
+
+
+def test_ndjson_keys_may_use_api_names():
+    record = dict(zip(FEATURE_NAMES, [6, 148, 72, 35, 0, 33.6, 0.627, 50]))
+    data = b"".join(json.dumps(record).encode() + b"\n" for _ in range(3))
+    (chunk,) = _feed_all(bulk.RowChunker("ndjson"), data, 16)
+    assert chunk.shape == (3, len(FEATURE_NAMES))
+
+
+def test_missing_columns_are_reported():
+    with pytest.raises(bulk.BulkInputError, match="Missing feature columns: glucose"):
+        _feed_all(bulk.RowChunker("csv"), b"Pregnancies,BloodPressure\n1,2\n", 1 << 20)
+
+
+def test_upload_without_newlines_is_cut_off():
+    chunker = bulk.RowChunker("csv")
+    block = b"1," * 4096
+    with pytest.raises(bulk.BulkInputError, match="longer than"):
+        for _ in range(bulk.MAX_LINE_BYTES // len(block) + 2):
+            list(chunker.feed(block))
+    assert len(chunker._partial) <= bulk.MAX_LINE_BYTES + len(block)
+
+
+def test_overlong_line_inside_one_block_is_rejected():
+    data = CSV_HEADER + ROW + b"9" * (bulk.MAX_LINE_BYTES + 1) + b"\n" + ROW
+    with pytest.raises(bulk.BulkInputError, match="Row 1 is longer than"):
+        _feed_all(bulk.RowChunker("csv"), data, 1 << 20)
+
+
+def test_lines_up_to_the_limit_are_accepted():
+    padding = b" " * (bulk.MAX_LINE_BYTES - len(ROW))
+    (chunk,) = _feed_all(bulk.RowChunker("csv"), CSV_HEADER + padding + ROW, 1024)
+    assert chunk.shape == (1, len(FEATURE_NAMES))
+
+
+def test_stream_endpoint_reports_overlong_lines(client):
+    response = client.post("/api/diabetes/predict/stream", content=CSV_HEADER + b"1," * bulk.MAX_LINE_BYTES,
+                           headers={"content-type": "text/csv"})
+    assert response.status_code == 200
+    assert "longer than" in json.loads(response.text.splitlines()[-1])["error"]
@@ -0,0 +1,142 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from server.services import cache as cache_module
+from server.services.cache import PredictionCache
+
+from conftest import SERVER_DIR
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = PredictionCache(max_size=3)
+    for key in "abc":
+        cache.put("v1", key, key.upper())
+    assert cache.get("v1", "a") == "A"
+    cache.put("v1", "d", "D")
+    assert cache.get("v1", "b") is None
+    assert [cache.get("v1", key) for key in "acd"] == ["A", "C", "D"]
+    cache.put("v1", "e", "E")
+    assert cache.get("v1", "a") is None
+    assert cache.stats()["evictions"] == 2
+    assert cache.stats()["size"] == 3
+
+
+def test_put_refreshes_an_existing_entry():
+    cache = PredictionCache(max_size=2)
+    cache.put("v1", "a", 1)
+    cache.put("v1", "b", 2)
+    cache.put("v1", "a", 3)
+    cache.put("v1", "c", 4)
+    assert cache.get("v1", "a") == 3
+    assert cache.get("v1", "b") is None
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache = PredictionCache(max_size=10, ttl_seconds=5)
+    cache.put("v1", "a", 1)
+    clock.now += 4.9
+    assert cache.get("v1", "a") == 1
+    clock.now += 0.1
+    assert cache.get("v1", "a") is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["size"], stats["hits"], stats["misses"]) == (1, 0, 1, 1)
+
+
+def test_zero_ttl_never_expires(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache = PredictionCache(max_size=10, ttl_seconds=0)
+    cache.put("v1", "a", 1)
+    clock.now += 1e9
+    assert cache.get("v1", "a") == 1
+
+
+def test_zero_size_disables_the_cache():
+    cache = PredictionCache(max_size=0)
+    cache.put("v1", "a", 1)
+    assert cache.get("v1", "a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_keys_are_namespaced():
+    cache = PredictionCache(max_size=10)
+    cache.put("diabetes_model_v2@aaaa", (1.0, 2.0), "old")
+    assert cache.get("diabetes_model_v2@bbbb", (1.0, 2.0)) is None
+    cache.put("diabetes_model_v2@bbbb", (1.0, 2.0), "new")
+    assert cache.get("diabetes_model_v2@aaaa", (1.0, 2.0)) == "old"
+    assert cache.get("diabetes_model_v2@bbbb", (1.0, 2.0)) == "new"
+
+
+def _load_service(model_path, scaler_path, cache):
+    from server.services.prediction_service import PredictionService
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return PredictionService(model_path=model_path, scaler_path=scaler_path, cache=cache)
+
+
+def _patient(row):
+    from server.schemas.diabetes import PatientInput
+    from server.services.prediction_service import FEATURE_NAMES
+
+    return PatientInput(**{name: value for name, value in zip(FEATURE_NAMES, row.tolist())})
+
+
+def test_reload_with_a_different_fingerprint_misses_the_cache(dataset):
+    cache = PredictionCache(max_size=100)
+    models = SERVER_DIR / "aiModels"
+    patient = _patient(dataset[0])
+    old = _load_service(models / "diabetes_model_v2.pkl", models / "scaler_rf_v2.pkl", cache)
+    cached = old.predict(patient)
+
+    # The same artifacts again: same fingerprint, so the entry is reused
+    same = _load_service(models / "diabetes_model_v2.pkl", models / "scaler_rf_v2.pkl", cache)
+    assert same.model_version == old.model_version
+    assert same.lookup(patient) is cached
+
+    # Different artifacts behind the same version name
+    new = _load_service(models / "diabetes_model.pkl", models / "scaler_svm.pkl", cache)
+    assert new.model_version != old.model_version
+    assert new.lookup(patient) is None
+    assert new.predict(patient) is not cached
+    assert old.lookup(patient) is cached
+    assert cache.stats()["size"] == 2
+
+
+@pytest.fixture
+def cached_service():
+    """PredictionService for the default v2 model with a small prediction cache"""
+    from server.services.prediction_service import PredictionService
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return PredictionService(cache=PredictionCache(max_size=100))
+
+
+def test_batches_bypass_the_cache(cached_service, dataset):
+    cached_service.predict_batch(dataset[:500])
+    stats = cached_service.cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (0, 0, 0)
+
+
+def test_single_row_predictions_are_cached(cached_service, dataset):
+    patient = _patient(dataset[0])
+    first = cached_service.predict(patient)
+    assert cached_service.predict(patient) is first
+    assert cached_service.cache.stats()["hits"] == 1
+    np.testing.assert_allclose(first.probability_positive,
+                               cached_service.predict_batch(dataset[:1])[0].probability_positive)
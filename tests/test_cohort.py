@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from server.services.cohort import CohortAggregator, parse_age_bands
+from server.services.prediction_service import FEATURE_NAMES, RISK_LEVELS, Scores
+
+AGE = FEATURE_NAMES.index("age")
+
+
+def _cohort(n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    input_array = np.zeros((n_rows, len(FEATURE_NAMES)))
+    input_array[:, AGE] = rng.integers(18, 90, n_rows)
+    probability = rng.uniform(0, 100, n_rows)
+    # Exact bin edges and both ends of the range
+    probability[:4] = (0.0, 5.0, 50.0, 100.0)
+    predictions = (probability >= 50).astype(np.int64)
+    risk_codes = np.digitize(probability, (30, 70))
+    return input_array, Scores(predictions, 100 - probability, probability, risk_codes)
+
+
+def _naive_summary(input_array, scores, bins, cuts):
+    """Per-row reference for CohortAggregator.summary()"""
+    labels = [f"<{cuts[0]}"] + [f"{low}-{high - 1}" for low, high in zip(cuts, cuts[1:])] + [f"{cuts[-1]}+"]
+    cells = {}
+    for age, prediction, probability, code in zip(input_array[:, AGE].tolist(), scores.predictions.tolist(),
+                                                   scores.probability_positive.tolist(), scores.risk_codes.tolist()):
+        band = sum(age >= cut for cut in cuts)
+        bin_index = min(int(probability / (100 / bins)), bins - 1)
+        cells.setdefault((band, code), []).append((prediction, probability, bin_index))
+
+    def aggregate(selected):
+        rows = [row for key, cell in cells.items() if selected(*key) for row in cell]
+        histogram = [0] * bins
+        for _, _, bin_index in rows:
+            histogram[bin_index] += 1
+        mean = sum(probability for _, probability, _ in rows) / len(rows) if rows else None
+        return len(rows), sum(prediction for prediction, _, _ in rows), mean, histogram
+
+    total, diabetic, mean, histogram = aggregate(lambda band, code: True)
+    risk_levels = {}
+    for code, level in enumerate(RISK_LEVELS):
+        count, _, level_mean, level_histogram = aggregate(lambda band, c: c == code)
+        risk_levels[level.value] = {"count": count, "share": count / total if total else 0.0,
+                                    "mean_probability": level_mean, "histogram": level_histogram}
+    age_bands = []
+    for band, label in enumerate(labels):
+        count, band_diabetic, band_mean, band_histogram = aggregate(lambda b, code: b == band)
+        age_bands.append({
+            "band": label, "count": count, "diabetic": band_diabetic, "mean_probability": band_mean,
+            "risk_levels": {level.value: aggregate(lambda b, c: b == band and c == code)[0]
+                            for code, level in enumerate(RISK_LEVELS)},
+            "histogram": band_histogram,
+        })
+    return {"rows": total, "diabetic": diabetic, "mean_probability": mean, "histogram": histogram,
+            "risk_levels": risk_levels, "age_bands": age_bands}
+
+
+def _assert_summary_equal(actual, expected):
+    assert actual.keys() >= expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value, rel=1e-12), key
+        elif isinstance(value, dict):
+            _assert_summary_equal(actual[key], value)
+        elif isinstance(value, list) and value and isinstance(value[0], dict):
+            assert len(actual[key]) == len(value)
+            for actual_item, expected_item in zip(actual[key], value):
+                _assert_summary_equal(actual_item, expected_item)
+        else:
+            assert actual[key] == value, key
+
+
+@pytest.mark.parametrize("bins,cuts", [(20, (30, 40, 50, 60, 70)), (7, (45,)), (1, (25, 65))])
+def test_summary_matches_naive_per_row_loop(bins, cuts):
+    input_array, scores = _cohort(2000)
+    aggregator = CohortAggregator(bins, cuts)
+    aggregator.add(input_array, scores)
+    _assert_summary_equal(aggregator.summary(), _naive_summary(input_array, scores, bins, cuts))
+
+
+def test_chunks_add_up_to_the_whole_cohort():
+    input_array, scores = _cohort(1000, seed=1)
+    whole = CohortAggregator()
+    whole.add(input_array, scores)
+    chunked = CohortAggregator()
+    for start in range(0, 1000, 128):
+        part = slice(start, start + 128)
+        chunked.add(input_array[part], Scores(*(column[part] for column in scores)))
+    _assert_summary_equal(chunked.summary(), whole.summary())
+
+
+def test_empty_cohort():
+    aggregator = CohortAggregator(bins=4)
+    aggregator.add(np.empty((0, len(FEATURE_NAMES))),
+                   Scores(*(np.empty(0, dtype=dtype) for dtype in (np.int64, float, float, np.int64))))
+    summary = aggregator.summary()
+    assert (summary["rows"], summary["diabetic"], summary["mean_probability"]) == (0, 0, None)
+    assert summary["histogram"] == [0, 0, 0, 0]
+    assert summary["bin_edges"] == [0.0, 25.0, 50.0, 75.0, 100.0]
+    assert all(level["share"] == 0.0 and level["mean_probability"] is None
+               for level in summary["risk_levels"].values())
+    assert [band["count"] for band in summary["age_bands"]] == [0] * 6
+
+
+@pytest.mark.parametrize("text", ["40,30", "0,10", "30,30", "a"])
+def test_parse_age_bands_rejects_invalid_cuts(text):
+    with pytest.raises(ValueError):
+        parse_age_bands(text)
@@ -0,0 +1,88 @@
+import struct
+
+import numpy as np
+import pytest
+
+from server.services import columnar
+from server.services.prediction_service import FEATURE_NAMES, Scores
+
+MATRIX_URL = "/api/diabetes/predict/batch"
+MATRIX_TYPE = "application/vnd.diabetes.matrix"
+SCORES_TYPE = "application/vnd.diabetes.scores"
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_matrix_round_trip(dataset, dtype):
+    body = columnar.encode_matrix(dataset, dtype)
+    assert len(body) == 16 + dataset.size * np.dtype(dtype).itemsize
+    decoded = columnar.decode_matrix(body)
+    assert decoded.dtype == dtype
+    assert not decoded.flags.writeable
+    np.testing.assert_array_equal(decoded, dataset.astype(dtype))
+
+
+def test_scores_round_trip_with_skipped_rows():
+    scores = Scores(np.array([1, 0]), np.array([12.5, 90.0]), np.array([87.5, 10.0]), np.array([2, 0]))
+    valid = np.array([True, False, True])
+    decoded = columnar.decode_scores(columnar.encode_scores(scores, valid))
+    np.testing.assert_array_equal(decoded.probability_positive, [87.5, np.nan, 10.0])
+    assert decoded.predictions.tolist() == [1, columnar.SKIPPED_CODE, 0]
+    assert decoded.risk_codes.tolist() == [2, columnar.SKIPPED_CODE, 0]
+
+
+def _header(magic=b"DBM1", code=b"d", rows=2, cols=len(FEATURE_NAMES)) -> bytes:
+    return struct.pack("<4s1s3xII", magic, code, rows, cols)
+
+
+@pytest.mark.parametrize("body,message", [
+    (b"DBM1", "shorter than the matrix header"),
+    (_header() + bytes(8 * 15), "header describes"),
+    (_header() + bytes(8 * 17), "header describes"),
+    (_header(magic=b"XXXX") + bytes(8 * 16), "bad magic"),
+    (_header(magic=b"DBM2") + bytes(8 * 16), "bad magic"),
+    (_header(code=b"i") + bytes(8 * 16), "dtype"),
+    (_header(cols=7) + bytes(8 * 14), "columns"),
+])
+def test_malformed_matrices_are_rejected(body, message):
+    with pytest.raises(columnar.ColumnarFormatError, match=message):
+        columnar.decode_matrix(body)
+
+
+def test_encode_rejects_wrong_shapes_and_dtypes():
+    with pytest.raises(columnar.ColumnarFormatError):
+        columnar.encode_matrix(np.zeros((3, 7)))
+    with pytest.raises(columnar.ColumnarFormatError):
+        columnar.encode_matrix(np.zeros((3, 8)), np.int32)
+
+
+@pytest.mark.parametrize("body", [b"DBS1", struct.pack("<4sI8x", b"DBS1", 3) + bytes(29)])
+def test_malformed_scores_are_rejected(body):
+    with pytest.raises(columnar.ColumnarFormatError):
+        columnar.decode_scores(body)
+
+
+def test_binary_batch_matches_json(client, dataset):
+    from server.services.validation import validate_matrix
+
+    rows = dataset[validate_matrix(dataset).valid][:200]
+    patients = [dict(zip(FEATURE_NAMES, row)) for row in rows.tolist()]
+    expected = client.post(MATRIX_URL, json={"patients": patients})
+    assert expected.status_code == 200
+
+    response = client.post(MATRIX_URL, content=columnar.encode_matrix(rows), headers={"content-type": MATRIX_TYPE})
+    assert response.status_code == 200
+    assert response.json() == expected.json()
+
+    scores = client.post(MATRIX_URL, content=columnar.encode_matrix(rows),
+                         headers={"content-type": MATRIX_TYPE, "accept": SCORES_TYPE})
+    assert scores.headers["content-type"] == SCORES_TYPE
+    decoded = columnar.decode_scores(scores.content)
+    predictions = expected.json()["predictions"]
+    np.testing.assert_array_equal(decoded.probability_positive,
+                                  [prediction["probability_positive"] for prediction in predictions])
+    assert decoded.predictions.tolist() == [prediction["prediction"] for prediction in predictions]
+
+
+def test_malformed_binary_batch_is_400(client):
+    response = client.post(MATRIX_URL, content=_header(cols=7), headers={"content-type": MATRIX_TYPE})
+    assert response.status_code == 400
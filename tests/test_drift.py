@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from server.services.drift import (
+    PSI_SIGNIFICANT,
+    DriftMonitor,
+    binned_ks,
+    population_stability,
+)
+from server.services.prediction_service import FEATURE_NAMES
+from server.services.validation import validate_matrix
+
+from conftest import DATASET_PATH
+
+GLUCOSE = FEATURE_NAMES.index("glucose")
+
+
+@pytest.fixture(scope="module")
+def reference(service, dataset):
+    return dataset, service.score_matrix(dataset, local=True).probability_positive
+
+
+@pytest.fixture
+def monitor(reference):
+    return DriftMonitor(*reference)
+
+
+def test_identical_distributions_have_zero_psi_and_ks():
+    shares = np.array([0.1, 0.2, 0.3, 0.4])
+    assert population_stability(shares, shares) == 0.0
+    assert binned_ks(shares, shares) == 0.0
+    assert population_stability(shares, shares[::-1]) > 0
+    assert binned_ks(shares, shares[::-1]) == pytest.approx(0.4)
+
+
+def test_reference_data_is_stable(monitor, reference):
+    monitor.observe(*reference)
+    report = monitor.report()
+    assert report["status"] == "stable"
+    assert report["rows"] == len(reference[0])
+    for distribution in [*report["features"].values(), report["probability"]]:
+        assert distribution["psi"] == pytest.approx(0, abs=1e-9)
+        assert distribution["ks"] == pytest.approx(0, abs=1e-12)
+
+
+def test_shifted_distribution_raises_the_alert(monitor, reference, service):
+    shifted = reference[0].copy()
+    shifted[:, GLUCOSE] += 40
+    monitor.observe(shifted, service.score_matrix(shifted, local=True).probability_positive)
+    report = monitor.report()
+    glucose = report["features"]["glucose"]
+    assert glucose["psi"] > PSI_SIGNIFICANT
+    assert glucose["status"] == "significant"
+    assert glucose["ks"] > 0.3
+    assert report["features"]["age"]["psi"] == pytest.approx(0, abs=1e-9)
+    assert report["status"] == "significant"
+
+
+def test_no_rows_is_insufficient_data(monitor):
+    report = monitor.report(min_rows=100)
+    assert report["status"] == "insufficient_data"
+    assert report["features"]["glucose"]["psi"] is None
+    monitor.observe(np.zeros((10, len(FEATURE_NAMES))), np.zeros(10))
+    assert monitor.report(min_rows=100)["status"] == "insufficient_data"
+
+
+def test_rows_below_the_flush_size_reach_the_report(monitor, reference):
+    rows, probability = reference
+    monitor.observe(rows[:10], probability[:10])
+    assert monitor.rows == 0
+    assert monitor.report()["rows"] == 10
+
+    monitor.reset()
+    assert monitor.report()["rows"] == 0
+    monitor.observe(rows[:7], probability[:7])
+    report = monitor.report()
+    assert report["rows"] == 7
+    assert sum(report["features"]["glucose"]["live"]) == pytest.approx(1)
+
+
+def test_pending_rows_are_folded_in_at_the_flush_size(monitor, reference):
+    rows, probability = reference
+    batch = DriftMonitor.FLUSH_ROWS // len(rows)
+    for _ in range(batch):
+        monitor.observe(rows, probability)
+    assert monitor.rows == 0
+    monitor.observe(rows, probability)
+    assert monitor.rows == (batch + 1) * len(rows)
+    assert monitor._pending_rows == 0
+
+
+def test_drift_endpoint_sees_unflushed_rows_after_reset(client, monkeypatch, dataset):
+    from server.routes.diabetes import serving
+
+    entry = serving.registry.get()
+    monkeypatch.setattr(entry.service, "drift", DriftMonitor.from_csv(DATASET_PATH, entry.service))
+    rows = dataset[validate_matrix(dataset).valid]
+    patients = [dict(zip(FEATURE_NAMES, row)) for row in rows[:20].tolist()]
+
+    assert client.post("/api/diabetes/predict/batch", json={"patients": patients}).status_code == 200
+    assert client.get("/api/diabetes/drift").json()["rows"] == 20
+    assert client.post("/api/diabetes/drift/reset").json()["status"] == "reset"
+    assert client.get("/api/diabetes/drift").json()["rows"] == 0
+    assert client.post("/api/diabetes/predict/batch", json={"patients": patients[:5]}).status_code == 200
+    report = client.get("/api/diabetes/drift").json()
+    assert report["rows"] == 5
+    assert report["status"] == "insufficient_data"
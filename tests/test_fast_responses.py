@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from server.schemas.diabetes import BatchPredictionOutput, PredictionOutput
+from server.services.prediction_service import RISK_LEVELS
+
+# Probabilities (%) whose shortest repr differs between encoders: exponents,
+# tiny and huge magnitudes, float noise around the bounds
+EDGE_PROBABILITIES = (
+    0.0, 100.0, 50.0, 30.0, 70.0, 5e-05, 2.5e-07, 1e-16, 5e-324, 0.1, 1 / 3,
+    99.99995, 99.99999999999999, 1e-05, 0.0001, 1e+16, 1e+22, 6.267083130212347,
+)
+
+
+def _outputs(service, probabilities):
+    outputs = []
+    for index, positive in enumerate(probabilities):
+        prediction = index % 2
+        level = RISK_LEVELS[index % len(RISK_LEVELS)]
+        outputs.append(PredictionOutput.model_construct(
+            prediction=prediction,
+            is_diabetic=prediction == 1,
+            probability_negative=100 - positive,
+            probability_positive=positive,
+            risk_level=level,
+            message=service._message_table[prediction, index % len(RISK_LEVELS)],
+        ))
+    return outputs
+
+
+def _random_probabilities(n_rows: int = 2000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # Uniform values plus tree-average style values (k / n_trees)
+    return np.concatenate([rng.uniform(0, 100, n_rows), rng.integers(0, 101, n_rows) / 100 * 100]).tolist()
+
+
+@pytest.mark.parametrize("positive", EDGE_PROBABILITIES)
+def test_encode_output_matches_pydantic(service, positive):
+    for output in _outputs(service, [positive] * 6):
+        assert service.encode_output(output) == output.model_dump_json(exclude_none=True).encode()
+
+
+def test_encode_output_matches_pydantic_on_random_scores(service):
+    for output in _outputs(service, _random_probabilities()):
+        assert service.encode_output(output) == output.model_dump_json(exclude_none=True).encode()
+
+
+def test_encode_output_matches_pydantic_on_scored_rows(service, dataset):
+    for output in service.predict_batch(dataset):
+        assert service.encode_output(output) == output.model_dump_json(exclude_none=True).encode()
+
+
+def test_encode_batch_matches_pydantic(service):
+    outputs = _outputs(service, list(EDGE_PROBABILITIES) + _random_probabilities(200))
+    expected = BatchPredictionOutput(count=len(outputs), predictions=outputs)
+    assert service.encode_batch(outputs) == expected.model_dump_json(exclude_none=True).encode()
+
+
+def test_encode_batch_extra_fields_match_pydantic(service):
+    outputs = _outputs(service, EDGE_PROBABILITIES[:3])
+    extra = {
+        "skipped_rows": [1, 4],
+        "errors": {"glucose": {"constraint": "0 <= glucose <= 200", "count": 2, "rows": [1, 4]}},
+    }
+    expected = BatchPredictionOutput(count=len(outputs), predictions=outputs, **extra)
+    assert service.encode_batch(outputs, extra) == expected.model_dump_json(exclude_none=True).encode()
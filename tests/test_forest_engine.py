@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from server.services.forest_engine import ArrayForest
+
+# The scaler was fitted on a DataFrame; the engines are fed plain arrays
+pytestmark = pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+
+# Same bound PredictionService.PARITY_TOLERANCE enforces when the check is enabled
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(scope="module")
+def forest(sklearn_model):
+    model, scaler = sklearn_model
+    return ArrayForest.from_sklearn(model, scaler)
+
+
+@pytest.fixture(scope="module")
+def unscaled_forest(sklearn_model):
+    model, _ = sklearn_model
+    return ArrayForest.from_sklearn(model)
+
+
+def _sklearn_proba(sklearn_model, input_array: np.ndarray) -> np.ndarray:
+    model, scaler = sklearn_model
+    return model.predict_proba(scaler.transform(input_array))
+
+
+def _edge_rows(forest: ArrayForest, base: np.ndarray, n_splits: int = 2000, seed: int = 0) -> np.ndarray:
+    """Rows (in the trees' scaled input space) on and around sampled split thresholds
+
+    Besides the threshold itself, this covers the float32 neighbours around
+    it and float64 values that only round onto or across the threshold once
+    cast to float32, which is how sklearn compares features.
+    """
+    is_split = np.isfinite(forest.threshold)
+    nodes = np.random.default_rng(seed).choice(np.flatnonzero(is_split), size=n_splits, replace=False)
+    rows = []
+    for feature, threshold in zip(forest.feature[nodes].tolist(), forest.threshold[nodes].tolist()):
+        single = np.float32(threshold)
+        candidates = (
+            threshold,
+            float(single),
+            float(np.nextafter(single, np.float32(np.inf))),
+            float(np.nextafter(single, np.float32(-np.inf))),
+            threshold + 1e-9,
+            threshold - 1e-9,
+        )
+        for value in candidates:
+            row = base.copy()
+            row[feature] = value
+            rows.append(row)
+    return np.array(rows)
+
+
+def test_matches_sklearn_on_training_data(forest, sklearn_model, dataset):
+    expected = _sklearn_proba(sklearn_model, dataset)
+    np.testing.assert_allclose(forest.predict_proba(dataset), expected, rtol=0, atol=TOLERANCE)
+
+
+def test_matches_sklearn_on_random_rows(forest, sklearn_model, dataset):
+    rng = np.random.default_rng(1)
+    mean, std = dataset.mean(axis=0), dataset.std(axis=0)
+    rows = mean + rng.uniform(-4, 4, size=(5000, dataset.shape[1])) * std
+    expected = _sklearn_proba(sklearn_model, rows)
+    np.testing.assert_allclose(forest.predict_proba(rows), expected, rtol=0, atol=TOLERANCE)
+
+
+def test_labels_are_argmax_of_probabilities(forest, sklearn_model, dataset):
+    model, scaler = sklearn_model
+    labels, probabilities = forest(dataset)
+    np.testing.assert_array_equal(labels, model.predict(scaler.transform(dataset)))
+    np.testing.assert_allclose(probabilities, forest.predict_proba(dataset), rtol=0, atol=0)
+
+
+def test_matches_sklearn_on_split_thresholds(unscaled_forest, sklearn_model, dataset):
+    model, scaler = sklearn_model
+    rows = _edge_rows(unscaled_forest, scaler.transform(np.median(dataset, axis=0, keepdims=True))[0])
+    np.testing.assert_allclose(unscaled_forest.predict_proba(rows), model.predict_proba(rows),
+                               rtol=0, atol=TOLERANCE)
+
+
+def test_matches_sklearn_on_raw_inputs_near_thresholds(forest, sklearn_model, dataset):
+    _, scaler = sklearn_model
+    scaled = _edge_rows(forest, scaler.transform(np.median(dataset, axis=0, keepdims=True))[0], n_splits=500)
+    rows = scaler.inverse_transform(scaled)
+    expected = _sklearn_proba(sklearn_model, rows)
+    np.testing.assert_allclose(forest.predict_proba(rows), expected, rtol=0, atol=TOLERANCE)
+
+
+def test_single_row_matches_batch(forest, dataset):
+    batch = forest.predict_proba(dataset[:50])
+    for index in range(50):
+        np.testing.assert_array_equal(forest.predict_proba(dataset[index:index + 1])[0], batch[index])
+
+
+@pytest.mark.parametrize("n_trees,max_depth", [(None, None), (25, None), (50, 6)])
+def test_float32_thresholds_do_not_change_predictions(unscaled_forest, sklearn_model, dataset, n_trees, max_depth):
+    _, scaler = sklearn_model
+    rows = _edge_rows(unscaled_forest, scaler.transform(np.median(dataset, axis=0, keepdims=True))[0])
+    exact = unscaled_forest.reduced(n_trees, max_depth)
+    single = unscaled_forest.reduced(n_trees, max_depth, threshold_dtype=np.float32)
+    assert single.threshold.dtype == np.float32
+    np.testing.assert_array_equal(single.predict_proba(rows), exact.predict_proba(rows))
+
+
+def test_reduced_forest_keeps_full_forest_when_not_cut(forest, dataset):
+    np.testing.assert_allclose(forest.reduced().predict_proba(dataset), forest.predict_proba(dataset),
+                               rtol=0, atol=TOLERANCE)
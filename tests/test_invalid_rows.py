@@ -0,0 +1,220 @@
+import json
+import warnings
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from server.services import bulk
+from server.services.prediction_service import FEATURE_NAMES
+from server.services.validation import BOUNDS, parse_batch, validate_matrix
+
+from conftest import DATASET_PATH
+
+PATIENT = {"pregnancies": 2, "glucose": 120, "blood_pressure": 70, "skin_thickness": 20, "insulin": 80,
+           "bmi": 25.5, "diabetes_pedigree_function": 0.5, "age": 30}
+CSV_HEADER = "Pregnancies,Glucose,BloodPressure,SkinThickness,Insulin,BMI,DiabetesPedigreeFunction,Age\n"
+# Rows 1 (fractional age) and 2 (NaN glucose) are invalid
+CSV_ROWS = ["2,120,70,20,80,25.5,0.5,30", "2,120,70,20,80,25.5,0.5,30.5",
+            "2,nan,70,20,80,25.5,0.5,30", "6,148,72,35,0,33.6,0.627,50"]
+CSV_BODY = CSV_HEADER + "\n".join(CSV_ROWS) + "\n"
+
+
+def _body(*patients) -> bytes:
+    return json.dumps({"patients": list(patients)}).encode()
+
+
+def _row(**changes) -> np.ndarray:
+    return np.array([[{**PATIENT, **changes}[name] for name in FEATURE_NAMES]], dtype=np.float64)
+
+
+# parse_batch
+
+def test_parse_batch_reads_feature_matrix():
+    matrix = parse_batch(_body(PATIENT, {**PATIENT, "age": 61}))
+    np.testing.assert_array_equal(matrix, np.vstack([_row(), _row(age=61)]))
+
+
+def test_parse_batch_accepts_numeric_strings_like_pydantic():
+    matrix = parse_batch(_body({**PATIENT, "glucose": "120", "bmi": "25.5"}))
+    np.testing.assert_array_equal(matrix, _row())
+
+
+@pytest.mark.parametrize("body", [
+    _body({name: value for name, value in PATIENT.items() if name != "glucose"}),
+    _body({**PATIENT, "glucose": "high"}),
+    _body({**PATIENT, "glucose": None}),
+    _body(),
+    b'{"patients": {}}',
+    b'{"patients": [',
+    b"[]",
+], ids=["missing-field", "string", "null", "empty", "not-a-list", "malformed", "no-patients"])
+def test_parse_batch_falls_back_to_pydantic_errors(body):
+    with pytest.raises(ValidationError):
+        parse_batch(body)
+
+
+# validate_matrix
+
+def test_validate_matrix_accepts_bounds_inclusively():
+    rows = np.vstack([BOUNDS[0], BOUNDS[1]])
+    assert validate_matrix(rows).valid.all()
+
+
+@pytest.mark.parametrize("field,value", [
+    ("glucose", BOUNDS[1, FEATURE_NAMES.index("glucose")] + 0.5),
+    ("age", BOUNDS[0, FEATURE_NAMES.index("age")] - 1),
+    ("age", 30.5),
+    ("pregnancies", 2.5),
+    ("bmi", np.nan),
+    ("insulin", np.inf),
+])
+def test_validate_matrix_reports_invalid_values(field, value):
+    matrix = np.vstack([_row(), _row(**{field: value}), _row()])
+    checked = validate_matrix(matrix)
+    assert checked.valid.tolist() == [True, False, True]
+    assert list(checked.errors) == [field]
+    report = checked.report(first_row=100)
+    assert report["invalid_rows"] == 1
+    assert report["errors"][field]["rows"] == [101]
+
+
+# RowValidator
+
+def test_row_validator_reject_raises_with_absolute_rows():
+    matrix = np.vstack([_row(), _row(age=30.5)])
+    with pytest.raises(bulk.InvalidRowsError) as raised:
+        bulk.RowValidator("reject").check(matrix, first_row=10)
+    assert raised.value.report["errors"]["age"]["rows"] == [11]
+    assert "rows 10-11" in str(raised.value)
+
+
+def test_row_validator_skip_keeps_valid_rows_and_tallies_chunks():
+    validator = bulk.RowValidator("skip")
+    first = np.vstack([_row(), _row(age=30.5), _row()])
+    valid, rows = validator.check(first, first_row=0)
+    assert rows.tolist() == [0, 2]
+    np.testing.assert_array_equal(valid, first[[0, 2]])
+    valid, rows = validator.check(np.vstack([_row(glucose=np.nan), _row(age=0)]), first_row=3)
+    assert len(valid) == 0 and rows.tolist() == []
+    valid, rows = validator.check(_row(), first_row=5)
+    assert rows is None
+    report = validator.report()
+    assert (report["rows"], report["invalid_rows"]) == (6, 3)
+    assert report["errors"]["age"] == {"constraint": report["errors"]["age"]["constraint"], "count": 2, "rows": [1, 4]}
+    assert report["errors"]["glucose"]["rows"] == [3]
+    assert list(report["errors"]) == ["glucose", "age"]
+
+
+def test_row_validator_rejects_unknown_policy():
+    with pytest.raises(bulk.BulkInputError):
+        bulk.RowValidator("ignore")
+
+
+# Endpoints and CLI
+
+def _upload(client, path, query=""):
+    return client.post(f"/api/diabetes/predict/{path}{query}", content=CSV_BODY,
+                       headers={"content-type": "text/csv"})
+
+
+def test_batch_skip_reports_rows(client):
+    response = client.post("/api/diabetes/predict/batch?invalid_rows=skip",
+                           json={"patients": [PATIENT, {**PATIENT, "age": 30.5}, PATIENT]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+    assert body["skipped_rows"] == [1]
+    assert body["errors"]["age"]["rows"] == [1]
+
+
+def test_batch_reject_is_422(client):
+    response = client.post("/api/diabetes/predict/batch", json={"patients": [PATIENT, {**PATIENT, "age": 30.5}]})
+    assert response.status_code == 422
+    assert response.json()["detail"]["errors"]["age"]["rows"] == [1]
+
+
+def test_stream_reject_ends_with_error_trailer(client):
+    response = _upload(client, "stream", "?invalid_rows=reject")
+    assert response.status_code == 200
+    trailer = json.loads(response.text.splitlines()[-1])
+    assert trailer["invalid_rows"] == 2
+    assert trailer["errors"]["age"]["rows"] == [1]
+    assert trailer["errors"]["glucose"]["rows"] == [2]
+    assert "2 invalid rows" in trailer["error"]
+
+    csv = _upload(client, "stream", "?invalid_rows=reject&output_format=csv").text.splitlines()
+    assert csv[-1].startswith("# error: 2 invalid rows")
+
+
+@pytest.mark.parametrize("query", ["", "?invalid_rows=skip&chunk_size=2"])
+def test_stream_skips_by_default_keeping_input_row_indices(client, query):
+    response = _upload(client, "stream", query)
+    *lines, trailer = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["row"] for line in lines] == [0, 3]
+    assert trailer["invalid_rows"] == 2
+    assert trailer["errors"]["age"]["rows"] == [1]
+    assert trailer["errors"]["glucose"]["rows"] == [2]
+
+    csv = _upload(client, "stream", f"{query}{'&' if query else '?'}output_format=csv").text.splitlines()
+    assert [line.split(",")[0] for line in csv[1:-1]] == ["0", "3"]
+    assert csv[-1].startswith("# skipped 2 invalid rows")
+
+
+def test_stream_scores_the_training_csv_by_default(client):
+    response = client.post("/api/diabetes/predict/stream", content=DATASET_PATH.read_bytes(),
+                           headers={"content-type": "text/csv"})
+    *lines, trailer = response.text.splitlines()
+    total = sum(1 for _ in DATASET_PATH.open()) - 1
+    assert len(lines) == total - json.loads(trailer)["invalid_rows"] > 0
+
+
+def test_stream_rejects_unknown_policy(client):
+    assert _upload(client, "stream", "?invalid_rows=ignore").status_code == 400
+
+
+def test_cohort_reject_is_422(client):
+    response = _upload(client, "cohort", "?invalid_rows=reject")
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert detail["invalid_rows"] == 2
+    assert "invalid_rows=reject" in detail["message"]
+
+
+@pytest.mark.parametrize("query", ["", "?invalid_rows=skip&chunk_size=3"])
+def test_cohort_skips_by_default(client, query):
+    body = _upload(client, "cohort", query).json()
+    assert body["rows"] == 2
+    assert body["invalid_rows"] == 2
+    assert body["errors"]["age"]["rows"] == [1]
+    assert body["errors"]["glucose"]["rows"] == [2]
+
+
+@pytest.mark.parametrize("options,status,rows", [
+    ([], 0, [0, 3]),
+    (["--invalid-rows", "skip"], 0, [0, 3]),
+    (["--invalid-rows", "reject"], 1, None),
+])
+def test_cli_score_invalid_rows(tmp_path, options, status, rows):
+    from server import cli
+
+    source = tmp_path / "cohort.csv"
+    source.write_text(CSV_BODY)
+    output = tmp_path / "scores.ndjson"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        assert cli.main(["score", str(source), "-o", str(output), *options]) == status
+    if rows is not None:
+        assert [json.loads(line)["row"] for line in output.read_text().splitlines()] == rows
+
+
+def test_cli_score_documented_example_runs_on_the_training_csv(tmp_path):
+    from server import cli
+
+    output = tmp_path / "scores.csv"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        assert cli.main(["score", str(DATASET_PATH), "-o", str(output)]) == 0
+    lines = output.read_text().splitlines()
+    assert lines[0] == "row,prediction,probability_positive,risk_level"
+    assert len(lines) > 700
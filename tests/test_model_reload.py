@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.config import ServerConfig, config
+from server.main import app
+from server.services import registry
+from server.services.registry import ModelPathError, ModelReloadConflict, check_model_path
+from server.services.serving import ServingState
+
+RELOAD_URL = "/api/diabetes/models/v2/reload"
+
+
+@pytest.mark.parametrize("path", [
+    "/tmp/v2.forest",
+    "../requirements.txt",
+    "aiModels/../../requirements.txt",
+    "AI/diabetes.csv",
+])
+def test_paths_outside_the_model_directory_are_rejected(path):
+    with pytest.raises(ModelPathError):
+        check_model_path(path, "aiModels")
+
+
+def test_paths_inside_the_model_directory_or_configured_are_accepted():
+    assert check_model_path("aiModels/diabetes_model_v2.forest", "aiModels") == "aiModels/diabetes_model_v2.forest"
+    assert check_model_path("models/custom.pkl", "aiModels", ["models/custom.pkl"]) == "models/custom.pkl"
+
+
+def test_symlinks_are_resolved_before_checking(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "SERVER_DIR", tmp_path)
+    (tmp_path / "aiModels").mkdir()
+    (tmp_path / "aiModels" / "escape.pkl").symlink_to(tmp_path.parent / "payload.pkl")
+    with pytest.raises(ModelPathError):
+        check_model_path("aiModels/escape.pkl", "aiModels")
+
+
+def test_reload_checks_paths_before_loading_anything():
+    serving = ServingState(ServerConfig())
+    with pytest.raises(ModelPathError):
+        asyncio.run(serving.reload("v3", model_path="/tmp/v2.forest"))
+    assert serving.registry.get("v3") is None
+
+
+def test_reload_is_disabled_without_an_admin_token(monkeypatch):
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "")
+    response = TestClient(app).post(RELOAD_URL, json={"model_path": "/tmp/v2.forest"})
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}, {"Authorization": "secret"}])
+def test_reload_requires_the_admin_token(monkeypatch, headers):
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    response = TestClient(app).post(RELOAD_URL, json={}, headers=headers)
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+def test_reload_with_the_admin_token_reaches_the_endpoint(monkeypatch):
+    from server.routes import diabetes
+
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    # Whether or not another test started the models, the path check answers first
+    monkeypatch.setattr(diabetes, "_require_ready", lambda: None)
+    response = TestClient(app).post(RELOAD_URL, json={"model_path": "/tmp/v2.forest"},
+                                    headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 400
+
+
+class _RunningPool:
+    workers = 4
+
+    def publish(self, key, service):
+        raise AssertionError("nothing should be published")
+
+
+def test_pickle_reload_is_refused_while_workers_run():
+    serving = ServingState(ServerConfig())
+    serving.pool = _RunningPool()
+    with pytest.raises(ModelReloadConflict, match="memory-mapped"):
+        asyncio.run(serving.reload("v3", model_path="aiModels/diabetes_model_v2.pkl",
+                                   scaler_path="aiModels/scaler_rf_v2.pkl"))
+    assert serving.registry.get("v3") is None
+
+
+def test_reload_route_answers_409_for_pickles_while_workers_run(monkeypatch):
+    from server.routes import diabetes
+
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(diabetes, "_require_ready", lambda: None)
+    monkeypatch.setattr(diabetes.serving, "pool", _RunningPool())
+    response = TestClient(app).post(RELOAD_URL, json={"model_path": "aiModels/diabetes_model_v2.pkl"},
+                                    headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 409
+    assert "server.cli export" in response.json()["detail"]
@@ -0,0 +1,97 @@
+import itertools
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from server.schemas.diabetes import RiskFactorKind
+from server.services.prediction_service import FEATURE_NAMES
+from server.services.risk_factors import RiskFactorTable, RiskRule, risk_factor_table
+
+# Values on, just inside and just outside every rule threshold
+BOUNDARIES = {
+    "glucose": (99, 99.9, 100, 124.9, 125, 125.1, 126),
+    "bmi": (18.4, 18.5, 24.9, 24.95, 25, 29.9, 30),
+    "age": (44, 45),
+    "blood_pressure": (59, 60, 80, 80.5, 81),
+    "diabetes_pedigree_function": (0.5, 0.50001, 0.51),
+    "insulin": (200, 200.5, 201),
+}
+BASE = {"pregnancies": 2, "skin_thickness": 20}
+
+
+def analyze_risk_factors(patient_data):
+    """The if/elif chain app.py used before the rule table, kept verbatim as the reference"""
+    risk_factors = []
+    positive_factors = []
+
+    if patient_data.glucose > 125:
+        risk_factors.append("High Glucose Level (>125 mg/dL) - Indicates potential diabetes")
+    elif patient_data.glucose < 100:
+        positive_factors.append("Normal Glucose Level (<100 mg/dL)")
+
+    if patient_data.bmi >= 30:
+        risk_factors.append("Obesity (BMI >= 30) - Significantly increases diabetes risk")
+    elif patient_data.bmi >= 25:
+        risk_factors.append("Overweight (BMI 25-29.9) - Moderate risk factor")
+    elif 18.5 <= patient_data.bmi <= 24.9:
+        positive_factors.append("Healthy BMI (18.5-24.9 kg/m2)")
+
+    if patient_data.age >= 45:
+        risk_factors.append("Age Factor (>= 45 years) - Increased risk with age")
+
+    if patient_data.blood_pressure > 80:
+        risk_factors.append("Elevated Blood Pressure (>80 mm Hg)")
+    elif 60 <= patient_data.blood_pressure <= 80:
+        positive_factors.append("Normal Blood Pressure (60-80 mm Hg)")
+
+    if patient_data.diabetes_pedigree_function > 0.5:
+        risk_factors.append("Genetic Predisposition (DPF >0.5) - Family history indicates higher risk")
+
+    if patient_data.insulin > 200:
+        risk_factors.append("Elevated Insulin (>200 uU/mL) - May indicate insulin resistance")
+
+    return risk_factors, positive_factors
+
+
+@pytest.fixture(scope="module")
+def patients():
+    names = list(BOUNDARIES)
+    return [{**BASE, **dict(zip(names, values))} for values in itertools.product(*BOUNDARIES.values())]
+
+
+@pytest.fixture(scope="module")
+def input_array(patients):
+    return np.array([[patient[name] for name in FEATURE_NAMES] for patient in patients], dtype=np.float64)
+
+
+def test_describe_matches_the_if_chain_on_boundaries(patients, input_array):
+    for patient, row in zip(patients, input_array):
+        assert risk_factor_table.describe(row) == analyze_risk_factors(SimpleNamespace(**patient)), patient
+
+
+def test_batch_factors_match_the_if_chain_on_boundaries(patients, input_array):
+    for patient, factors in zip(patients, risk_factor_table.factors(input_array)):
+        risk, positive = analyze_risk_factors(SimpleNamespace(**patient))
+        assert [factor.description for factor in factors if factor.kind == RiskFactorKind.RISK] == risk
+        assert [factor.description for factor in factors if factor.kind == RiskFactorKind.POSITIVE] == positive
+
+
+def test_rules_on_one_feature_match_at_most_once():
+    table = RiskFactorTable([
+        RiskRule("high", "glucose", ">", 100, RiskFactorKind.RISK, "high"),
+        RiskRule("higher", "glucose", ">", 150, RiskFactorKind.RISK, "higher"),
+        RiskRule("normal", "glucose", "between", (50, 100), RiskFactorKind.POSITIVE, "normal"),
+    ])
+    rows = np.zeros((4, len(FEATURE_NAMES)))
+    rows[:, FEATURE_NAMES.index("glucose")] = (40, 100, 120, 200)
+    assert table.evaluate(rows).tolist() == [
+        [False, False, False],
+        [False, False, True],
+        [True, False, False],
+        [True, False, False],
+    ]
+
+
+def test_empty_input_has_no_factors():
+    assert risk_factor_table.factors(np.empty((0, len(FEATURE_NAMES)))) == []